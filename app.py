@@ -6,7 +6,8 @@ import os
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 import webbrowser
-from typing import Callable, Sequence
+from itertools import groupby, islice
+from typing import IO, Callable, Iterable, Iterator, Sequence
 from tkinter import font
 
 from constants import ASSET_STATUSES, ASSET_TYPES, BUSINESSES, DEFAULT_LOW_STOCK_LEVEL
@@ -25,6 +26,7 @@ from db import (
     delete_user,
     add_asset_status,
     add_in_breakdown,
+    close_pool,
     delete_asset_status,
     delete_in_breakdown,
     list_assets_for_export,
@@ -35,8 +37,19 @@ from db import (
     list_in_logs_report,
     list_out_logs_report,
     get_perishable_report,
+    count_assets,
+    copy_report_csv,
+    list_airbnb_inspection_items,
+    count_perishable_stock,
+    get_insights_snapshot,
+    get_asset,
     get_perishable_stock,
+    get_product,
     init_db,
+    iter_asset_acquisitions_report,
+    iter_expiry_dates_report,
+    iter_in_logs_report,
+    iter_out_logs_report,
     list_assets,
     list_asset_statuses,
     list_in_breakdown,
@@ -45,7 +58,9 @@ from db import (
     list_products,
     list_users,
     record_in,
+    record_in_batch,
     record_out,
+    record_out_batch,
     update_asset,
     update_asset_acquisition,
     update_in_log,
@@ -54,7 +69,17 @@ from db import (
     update_user,
     verify_user,
 )
-from export_utils import export_to_excel
+from db_executor import get_db_executor
+from export_utils import (
+    export_airbnb_inspection_batch_pdf,
+    export_copy_csv,
+    export_to_csv,
+    export_to_excel,
+)
+from filter_index import FilterIndex
+from migrations import MigrationError
+from records import Record
+from thumbnails import ThumbnailCache
 
 try:
     from tkcalendar import DateEntry  # type: ignore
@@ -122,6 +147,9 @@ GITHUB_RELEASES_URL = "https://github.com/amanerdc/aman-inventory/releases"
 
 AIRBNB_AREAS = ["Living & Dining Area", "Toilet & Bath", "Loft Area"]
 AIRBNB_ROOMS = ["Room 1", "Room 2", "Room 3"]
+AIRBNB_ALL_ROOMS = "All Rooms"
+# Save-dialog label for the COPY dump of the log and acquisition reports.
+RAW_CSV_FILETYPE = "Raw CSV"
 
 UI_COLORS = {
     "bg": "#F5F7FB",
@@ -340,6 +368,13 @@ def make_date_entry(parent: tk.Widget, textvariable: tk.StringVar) -> tk.Widget:
 
 
 PHOTO_THUMBNAIL_SIZE = (64, 64)
+TREE_THUMBNAILS = ThumbnailCache(PHOTO_THUMBNAIL_SIZE)
+# Rows decoded beyond the visible ones, and rows whose photos are kept once scrolled away.
+LAZY_IMAGE_PREFETCH = 20
+LAZY_IMAGE_KEEP = 200
+LAZY_IMAGE_DELAY_MS = 30
+# Rows fetched per keyset page in the product and asset tabs.
+PAGE_SIZE = 200
 PHOTO_ROW_HEIGHT = 72
 
 
@@ -370,7 +405,12 @@ def build_treeview(
 
     yscroll = ttk.Scrollbar(container, orient="vertical", command=tree.yview)
     xscroll = ttk.Scrollbar(container, orient="horizontal", command=tree.xview)
-    tree.configure(yscrollcommand=yscroll.set, xscrollcommand=xscroll.set)
+
+    def _on_yview(first: str, last: str) -> None:
+        yscroll.set(first, last)
+        tree.event_generate("<<TreeviewYView>>")
+
+    tree.configure(yscrollcommand=_on_yview, xscrollcommand=xscroll.set)
 
     tree.grid(row=0, column=0, sticky="nsew")
     yscroll.grid(row=0, column=1, sticky="ns")
@@ -448,21 +488,283 @@ def configure_context_menu(root: tk.Tk) -> None:
         root.bind_class(class_name, "<Button-2>", _show, add="+")
 
 
-def set_tree_image(tree: ttk.Treeview, iid: str, path: str | None) -> None:
-    if not path:
+def set_tree_images_lazy(tree: ttk.Treeview, paths: dict[str, str | None], append: bool = False) -> None:
+    # Photos are decoded only for rows in (or near) the viewport, on a worker
+    # thread, and applied as the user scrolls. append=True adds a loaded page.
+    if not append or not hasattr(tree, "_image_order"):
+        tree._img_refs = {}
+        tree._img_failed = set()
+        tree._image_paths = {}
+        tree._image_order = []
+        tree._image_index = {}
+    for iid, path in paths.items():
+        tree._image_index[iid] = len(tree._image_order)
+        tree._image_order.append(iid)
+        if path:
+            tree._image_paths[iid] = path
+    if Image is None or ImageTk is None or not tree._image_paths:
         return
-    if Image is None or ImageTk is None:
+    if not getattr(tree, "_lazy_images_bound", False):
+        tree.bind("<<TreeviewYView>>", lambda _e: _schedule_visible_images(tree), add="+")
+        tree.bind("<Configure>", lambda _e: _schedule_visible_images(tree), add="+")
+        tree.bind("<Map>", lambda _e: _schedule_visible_images(tree), add="+")
+        tree._lazy_images_bound = True
+    _schedule_visible_images(tree)
+
+
+def _schedule_visible_images(tree: ttk.Treeview) -> None:
+    if not getattr(tree, "_image_paths", None) or getattr(tree, "_image_after", None):
         return
-    try:
-        img = Image.open(path)
-        img.thumbnail(PHOTO_THUMBNAIL_SIZE)
-        photo = ImageTk.PhotoImage(img)
-    except Exception:
+    tree._image_after = tree.after(LAZY_IMAGE_DELAY_MS, lambda: _load_visible_images(tree))
+
+
+def _visible_row_range(tree: ttk.Treeview, margin: int) -> tuple[int, int]:
+    total = len(tree._image_order)
+    first, last = tree.yview()
+    top = int(first * total)
+    # yview reports the whole list before the first layout; cap by the widget height.
+    visible = min(int(last * total) + 1 - top, tree.winfo_height() // PHOTO_ROW_HEIGHT + 1)
+    return max(0, top - margin), min(total, top + visible + margin)
+
+
+def _load_visible_images(tree: ttk.Treeview) -> None:
+    tree._image_after = None
+    if not tree.winfo_exists() or not tree.winfo_ismapped():
         return
-    if not hasattr(tree, "_img_refs"):
-        tree._img_refs = {}
-    tree._img_refs[iid] = photo
-    tree.item(iid, image=photo)
+    start, end = _visible_row_range(tree, LAZY_IMAGE_PREFETCH)
+    order = tree._image_order
+    refs = tree._img_refs
+
+    # Drop photos far outside the viewport so a long scroll does not pin them all.
+    keep_start, keep_end = _visible_row_range(tree, LAZY_IMAGE_KEEP)
+    index = tree._image_index
+    for iid in [iid for iid in refs if not keep_start <= index.get(iid, -1) < keep_end]:
+        del refs[iid]
+        if tree.exists(iid):
+            tree.item(iid, image="")
+
+    pending: list[tuple[str, str]] = []
+    for iid in order[start:end]:
+        path = tree._image_paths.get(iid)
+        if not path or iid in refs or iid in tree._img_failed:
+            continue
+        photo = TREE_THUMBNAILS.cached_photo(path)
+        if photo is not None:
+            refs[iid] = photo
+            tree.item(iid, image=photo)
+        else:
+            pending.append((iid, path))
+    if not pending:
+        return
+    paths = tree._image_paths
+    get_db_executor(tree).submit(
+        f"thumbnails:{id(tree)}",
+        _decode_thumbnails,
+        pending,
+        on_done=lambda decoded: _apply_thumbnails(tree, paths, decoded),
+        on_error=lambda _exc: None,
+        owner=tree,
+    )
+
+
+def _decode_thumbnails(pending: list[tuple[str, str]]) -> list[tuple[str, str, object]]:
+    return [(iid, path, TREE_THUMBNAILS.load_pil(path)) for iid, path in pending]
+
+
+def _apply_thumbnails(
+    tree: ttk.Treeview, paths: dict[str, str], decoded: list[tuple[str, str, object]]
+) -> None:
+    if getattr(tree, "_image_paths", None) is not paths:
+        return  # The tree was refreshed while decoding.
+    for iid, path, img in decoded:
+        photo = TREE_THUMBNAILS.put_pil(path, img) if img is not None else None
+        if photo is None:
+            tree._img_failed.add(iid)
+            continue
+        if tree.exists(iid):
+            tree._img_refs[iid] = photo
+            tree.item(iid, image=photo)
+    # The viewport may have moved while the batch was decoding.
+    _schedule_visible_images(tree)
+
+
+def load_tree_pages(
+    tree: ttk.Treeview,
+    key: str,
+    fetch_page: Callable[[tuple | None], list[dict]],
+    render_page: Callable[[list[dict], int], None],
+    local: bool = False,
+) -> None:
+    # Keyset paging: fetch_page(after) returns up to PAGE_SIZE rows past the
+    # (sort_key, id) cursor; render_page(rows, offset) replaces the tree when
+    # offset is 0 and appends otherwise. Further pages load near the bottom.
+    # local=True pages from memory on the main thread.
+    tree._pager = {
+        "key": key,
+        "fetch": fetch_page,
+        "render": render_page,
+        "after": None,
+        "offset": 0,
+        "done": False,
+        "local": local,
+    }
+    if not getattr(tree, "_pager_bound", False):
+        tree.bind("<<TreeviewYView>>", lambda _e: _maybe_load_next_page(tree), add="+")
+        tree.bind("<Map>", lambda _e: _maybe_load_next_page(tree), add="+")
+        tree._pager_bound = True
+    _load_next_page(tree)
+
+
+def _load_next_page(tree: ttk.Treeview) -> None:
+    pager = tree._pager
+    if pager["local"]:
+        _apply_page(tree, pager, pager["fetch"](pager["after"]))
+        return
+    pager["loading"] = True
+    if pager["offset"] == 0:
+        set_tree_loading(tree, True)
+    get_db_executor(tree).submit(
+        pager["key"],
+        pager["fetch"],
+        pager["after"],
+        on_done=lambda rows: _apply_page(tree, pager, rows),
+        on_error=lambda exc: show_load_error(tree, exc),
+        owner=tree,
+    )
+
+
+def _apply_page(tree: ttk.Treeview, pager: dict, rows: list[dict]) -> None:
+    if getattr(tree, "_pager", None) is not pager:
+        return
+    set_tree_loading(tree, False)
+    pager["loading"] = False
+    pager["render"](rows, pager["offset"])
+    pager["offset"] += len(rows)
+    if len(rows) < PAGE_SIZE:
+        pager["done"] = True
+    else:
+        pager["after"] = (rows[-1]["sort_key"], rows[-1]["id"])
+        # A short first page may not fill the viewport; keep going until it does.
+        tree.after_idle(lambda: _maybe_load_next_page(tree))
+
+
+def _maybe_load_next_page(tree: ttk.Treeview) -> None:
+    pager = getattr(tree, "_pager", None)
+    if not pager or pager["done"] or pager.get("loading") or not tree.winfo_ismapped():
+        return
+    _first, last = tree.yview()
+    if last >= 0.9:
+        _load_next_page(tree)
+
+
+def build_filter_index(
+    fetch_all: Callable[[], list[dict]], text_columns: Sequence[str], facet_column: str | None
+) -> FilterIndex:
+    return FilterIndex(fetch_all(), text_columns, facet_column)
+
+
+def show_local_matches(
+    tree: ttk.Treeview,
+    key: str,
+    index: FilterIndex,
+    positions: list[int],
+    render_page: Callable[[list[dict], int], None],
+) -> None:
+    matches = iter(positions)
+    load_tree_pages(tree, key, lambda _after: index.rows(list(islice(matches, PAGE_SIZE))), render_page, local=True)
+
+
+def _summary_log_report(
+    inv_type: str, start_date: str, end_date: str, stream: bool = False
+) -> tuple[list[str], Iterator[tuple]] | None:
+    # The reports that grow with history. Load lists them for the view;
+    # export streams them (stream=True) from a server-side cursor.
+    if inv_type == "Unica Perishable Expiry Dates":
+        rows = (iter_expiry_dates_report if stream else list_expiry_dates_report)("Unica", start_date, end_date)
+        columns = ["No.", "Product Id", "Product", "Delivery Date", "Expiry Date", "Quantity"]
+        return columns, (
+            (idx, r["product_id"], r["name"], r["delivery_date"], r.get("expiry_date") or "", r["quantity"])
+            for idx, r in enumerate(rows, start=1)
+        )
+    if inv_type == "Unica Perishable IN Logs":
+        rows = (iter_in_logs_report if stream else list_in_logs_report)("Unica", start_date, end_date)
+        columns = ["No.", "Product Id", "Product", "Delivery Date", "Quantity"]
+        return columns, (
+            (idx, r["product_id"], r["name"], r["delivery_date"], r["quantity"]) for idx, r in enumerate(rows, start=1)
+        )
+    if inv_type == "Unica Perishable OUT Logs":
+        rows = (iter_out_logs_report if stream else list_out_logs_report)("Unica", start_date, end_date)
+        columns = ["No.", "Product Id", "Product", "Out Date", "Out Time", "Quantity"]
+        return columns, (
+            (idx, r["product_id"], r["name"], r["out_date"], r["out_time"], r["quantity"])
+            for idx, r in enumerate(rows, start=1)
+        )
+    if inv_type in ("Unica Non-Perishable Acquisitions", "HDN Warehouse Acquisitions"):
+        biz = "Unica" if inv_type.startswith("Unica") else "HDN Integrated Farm"
+        inv_label = "Unica Non-Perishable" if inv_type.startswith("Unica") else "HDN Warehouse"
+        fetch = iter_asset_acquisitions_report if stream else list_asset_acquisitions_report
+        rows = fetch(biz, inv_label, start_date or None, end_date or None)
+        columns = [
+            "Asset Id",
+            "Name",
+            "Type",
+            "Acquisition Date",
+            "Acquisition Cost",
+            "Delivery Cost",
+            "Quantity",
+            "Shop",
+        ]
+        return columns, (
+            (
+                r["asset_id"],
+                r.get("name") or "",
+                r.get("type") or "",
+                r.get("acquisition_date") or "",
+                _format_php(r.get("acquisition_cost")),
+                _format_php(r.get("delivery_cost")) if r.get("delivery_cost") is not None else "",
+                r["quantity"],
+                r.get("shop_link") or "",
+            )
+            for r in rows
+        )
+    return None
+
+
+def _summary_copy_report(inv_type: str, start_date: str, end_date: str) -> Callable[[IO[bytes]], None] | None:
+    # The "Raw CSV" export: the report copied straight out of PostgreSQL with
+    # its database column names and values as stored (no title lines, costs
+    # unformatted, no type group rows). Plain CSV matches the Excel export.
+    if inv_type == "Unica Perishable Expiry Dates":
+        return lambda out: copy_report_csv(out, "expiry_dates", "Unica", start_date, end_date)
+    if inv_type == "Unica Perishable IN Logs":
+        return lambda out: copy_report_csv(out, "in_logs", "Unica", start_date, end_date)
+    if inv_type == "Unica Perishable OUT Logs":
+        return lambda out: copy_report_csv(out, "out_logs", "Unica", start_date, end_date)
+    if inv_type in ("Unica Non-Perishable Acquisitions", "HDN Warehouse Acquisitions"):
+        biz = "Unica" if inv_type.startswith("Unica") else "HDN Integrated Farm"
+        inv_label = "Unica Non-Perishable" if inv_type.startswith("Unica") else "HDN Warehouse"
+        return lambda out: copy_report_csv(
+            out, "asset_acquisitions", biz, inv_label, start_date or None, end_date or None
+        )
+    return None
+
+
+def set_tree_loading(tree: ttk.Treeview, loading: bool) -> None:
+    label = getattr(tree, "_loading_label", None)
+    if not loading:
+        if label is not None:
+            label.place_forget()
+        return
+    if label is None:
+        label = ttk.Label(tree.master, text="Loading...", padding=(12, 6), relief="solid")
+        tree._loading_label = label
+    label.place(in_=tree, relx=0.5, rely=0.5, anchor="center")
+    label.lift()
+
+
+def show_load_error(tree: ttk.Treeview, exc: Exception) -> None:
+    set_tree_loading(tree, False)
+    messagebox.showerror("Database Error", str(exc), parent=tree.winfo_toplevel())
 
 
 def make_readonly_text(parent: tk.Widget, content: str, height: int = 8) -> tk.Text:
@@ -764,6 +1066,133 @@ class InOutForm(tk.Toplevel):
         self.destroy()
 
 
+class BulkInOutForm(tk.Toplevel):
+    def __init__(
+        self,
+        parent: tk.Widget,
+        title: str,
+        products: Sequence[dict],
+        on_save: Callable[[list[dict]], None],
+    ) -> None:
+        super().__init__(parent)
+        self.title(title)
+        self.geometry("640x560")
+        self.on_save = on_save
+        self.transient(parent)
+        self.grab_set()
+        self.is_in = "IN" in title.upper()
+
+        top = ttk.Frame(self, padding=12)
+        top.pack(fill="x")
+        self.date_var = tk.StringVar(value=date.today().strftime("%Y-%m-%d"))
+        self.time_var = tk.StringVar(value=datetime.now().strftime("%H:%M"))
+        self.filter_var = tk.StringVar()
+        ttk.Label(top, text="Delivery Date" if self.is_in else "Out Date").grid(row=0, column=0, sticky="w", pady=4)
+        make_date_entry(top, self.date_var).grid(row=0, column=1, sticky="w", padx=6)
+        if not self.is_in:
+            ttk.Label(top, text="Out Time (HH:MM)").grid(row=0, column=2, sticky="w", padx=(8, 0))
+            ttk.Entry(top, textvariable=self.time_var, width=8).grid(row=0, column=3, sticky="w", padx=6)
+        ttk.Label(top, text="Filter").grid(row=1, column=0, sticky="w", pady=4)
+        filter_entry = ttk.Entry(top, textvariable=self.filter_var, width=32)
+        filter_entry.grid(row=1, column=1, columnspan=3, sticky="w", padx=6)
+        filter_entry.bind("<KeyRelease>", lambda _e: self._apply_filter(), add="+")
+
+        body = ttk.Frame(self, padding=(12, 0))
+        body.pack(fill="both", expand=True)
+        canvas = tk.Canvas(body, background=UI_COLORS["panel"], highlightthickness=0)
+        yscroll = ttk.Scrollbar(body, orient="vertical", command=canvas.yview)
+        canvas.configure(yscrollcommand=yscroll.set)
+        canvas.pack(side="left", fill="both", expand=True)
+        yscroll.pack(side="right", fill="y")
+        self.grid_frame = ttk.Frame(canvas, style="Card.TFrame", padding=6)
+        canvas.create_window((0, 0), window=self.grid_frame, anchor="nw")
+        self.grid_frame.bind("<Configure>", lambda _e: canvas.configure(scrollregion=canvas.bbox("all")))
+
+        headings = ["Product", "Category", "Unit", "Quantity"]
+        if self.is_in:
+            headings.append("Expiry (YYYY-MM-DD)")
+        for col, head in enumerate(headings):
+            ttk.Label(self.grid_frame, text=head, style="Panel.TLabel", font=("Segoe UI", 10, "bold")).grid(
+                row=0, column=col, sticky="w", padx=4, pady=(0, 4)
+            )
+
+        # One row of widgets per product: (product, [widgets], qty_var, expiry_var)
+        self.rows: list[tuple[dict, list[tk.Widget], tk.StringVar, tk.StringVar]] = []
+        for product in products:
+            qty_var = tk.StringVar()
+            expiry_var = tk.StringVar()
+            widgets: list[tk.Widget] = [
+                ttk.Label(self.grid_frame, text=product.get("name") or "", style="Panel.TLabel"),
+                ttk.Label(self.grid_frame, text=product.get("category") or "", style="PanelMuted.TLabel"),
+                ttk.Label(self.grid_frame, text=product.get("unit") or "", style="PanelMuted.TLabel"),
+                ttk.Entry(self.grid_frame, textvariable=qty_var, width=10),
+            ]
+            if self.is_in:
+                widgets.append(ttk.Entry(self.grid_frame, textvariable=expiry_var, width=14))
+            self.rows.append((product, widgets, qty_var, expiry_var))
+        self._apply_filter()
+        # The wheel scrolls the list only while the pointer is over it; bound
+        # per widget so other windows keep their own wheel handling.
+        for widget in (canvas, self.grid_frame, *self.grid_frame.winfo_children()):
+            widget.bind("<MouseWheel>", lambda e: canvas.yview_scroll(int(-e.delta / 120), "units"), add="+")
+
+        bottom = ttk.Frame(self, padding=12)
+        bottom.pack(fill="x")
+        ttk.Button(bottom, text="Save All", style="Accent.TButton", command=self._save).pack(side="right")
+
+    def _apply_filter(self) -> None:
+        value = self.filter_var.get().strip().lower()
+        grid_row = 1
+        for product, widgets, _qty_var, _expiry_var in self.rows:
+            text = f"{product.get('name') or ''} {product.get('category') or ''}".lower()
+            if value and value not in text:
+                for widget in widgets:
+                    widget.grid_remove()
+                continue
+            for col, widget in enumerate(widgets):
+                widget.grid(row=grid_row, column=col, sticky="w", padx=4, pady=2)
+            grid_row += 1
+
+    def _save(self) -> None:
+        date_val = self.date_var.get().strip()
+        if not date_val:
+            messagebox.showwarning("Missing", "Date is required.", parent=self)
+            return
+        time_val = self.time_var.get().strip()
+        if not self.is_in and not time_val:
+            messagebox.showwarning("Missing", "Out time is required for OUT.", parent=self)
+            return
+        entries: list[dict] = []
+        for product, _widgets, qty_var, expiry_var in self.rows:
+            qty = qty_var.get().strip()
+            if not qty:
+                continue
+            try:
+                qty_val = float(qty)
+            except ValueError:
+                messagebox.showwarning("Invalid", f"Quantity for {product['name']} must be a number.", parent=self)
+                return
+            if qty_val <= 0:
+                messagebox.showwarning("Invalid", f"Quantity for {product['name']} must be greater than zero.", parent=self)
+                return
+            entry = {"product_id": product["id"], "date": date_val, "quantity": qty_val}
+            if self.is_in:
+                expiry = expiry_var.get().strip()
+                if expiry:
+                    if _safe_date(expiry) is None:
+                        messagebox.showwarning("Invalid", f"Expiry for {product['name']} must be YYYY-MM-DD.", parent=self)
+                        return
+                    entry["expiries"] = [(expiry, qty_val)]
+            else:
+                entry["time"] = time_val
+            entries.append(entry)
+        if not entries:
+            messagebox.showwarning("Missing", "Enter a quantity for at least one product.", parent=self)
+            return
+        self.on_save(entries)
+        self.destroy()
+
+
 class LogEditForm(tk.Toplevel):
     def __init__(self, parent: tk.Widget, kind: str, log: dict, on_save: Callable[[dict], None]) -> None:
         super().__init__(parent)
@@ -1074,6 +1503,7 @@ class SummaryWindow(tk.Toplevel):
         configure_photo_treeview_style(self)
         self.image_enabled = False
         self.image_paths: list[str | None] = []
+        self._report_args: tuple[str, str, str, str] | None = None
 
         top = ttk.Frame(self, padding=8)
         top.pack(fill="x")
@@ -1101,7 +1531,9 @@ class SummaryWindow(tk.Toplevel):
 
         self.room_label = ttk.Label(top, text="Room No.")
         self.room_var = tk.StringVar(value=AIRBNB_ROOMS[0])
-        self.room_combo = ttk.Combobox(top, textvariable=self.room_var, values=AIRBNB_ROOMS, state="readonly")
+        self.room_combo = ttk.Combobox(
+            top, textvariable=self.room_var, values=[*AIRBNB_ROOMS, AIRBNB_ALL_ROOMS], state="readonly"
+        )
         self.room_label.grid(row=2, column=0, sticky="w")
         self.room_combo.grid(row=2, column=1, sticky="w", padx=6)
 
@@ -1224,55 +1656,49 @@ class SummaryWindow(tk.Toplevel):
 
         start_date = self.start_var.get().strip()
         end_date = self.end_var.get().strip()
+        room_no = self.room_var.get().strip()
+        date_required = {
+            "Unica Perishable": "Unica Perishable",
+            "Unica Perishable Expiry Dates": "Expiry Dates",
+            "Unica Perishable IN Logs": "IN Logs",
+            "Unica Perishable OUT Logs": "OUT Logs",
+        }
+        if inv_type in date_required and (not start_date or not end_date):
+            messagebox.showwarning("Missing", f"From and To dates are required for {date_required[inv_type]}.")
+            return
+        if inv_type == "Airbnb Inspection Checklist" and not room_no:
+            messagebox.showwarning("Missing", "Select a room number.")
+            return
+
+        # Queries run on a worker thread; a second Load supersedes a pending one.
+        set_tree_loading(self.tree, True)
+        get_db_executor(self).submit(
+            f"summary:{id(self)}",
+            self._build_report,
+            inv_type,
+            start_date,
+            end_date,
+            room_no,
+            on_done=lambda report: self._apply_report(report, (inv_type, start_date, end_date, room_no)),
+            on_error=lambda exc: show_load_error(self.tree, exc),
+            owner=self,
+        )
 
+    def _build_report(
+        self, inv_type: str, start_date: str, end_date: str, room_no: str
+    ) -> tuple[list[str], list[tuple], bool, list[str | None]]:
+        log_report = _summary_log_report(inv_type, start_date, end_date)
+        if log_report is not None:
+            columns, rows = log_report
+            return columns, list(rows), False, []
         if inv_type == "Unica Perishable":
-            if not start_date or not end_date:
-                messagebox.showwarning("Missing", "From and To dates are required for Unica Perishable.")
-                return
             rows = get_perishable_report("Unica", start_date, end_date)
-            self.columns = ["No.", "Id.", "Product", "Category", "Unit", "In (Range)", "Out (Range)"]
-            self.data = [
-                [idx, r["product_id"], r["name"], r["category"], r["unit"], r["in_qty"], r["out_qty"]]
-                for idx, r in enumerate(rows, start=1)
-            ]
-            self.image_enabled = False
-            self.image_paths = []
-        elif inv_type == "Unica Perishable Expiry Dates":
-            if not start_date or not end_date:
-                messagebox.showwarning("Missing", "From and To dates are required for Expiry Dates.")
-                return
-            rows = list_expiry_dates_report("Unica", start_date, end_date)
-            self.columns = ["No.", "Product Id", "Product", "Delivery Date", "Expiry Date", "Quantity"]
-            self.data = [
-                [idx, r["product_id"], r["name"], r["delivery_date"], r.get("expiry_date") or "", r["quantity"]]
-                for idx, r in enumerate(rows, start=1)
-            ]
-            self.image_enabled = False
-            self.image_paths = []
-        elif inv_type == "Unica Perishable IN Logs":
-            if not start_date or not end_date:
-                messagebox.showwarning("Missing", "From and To dates are required for IN Logs.")
-                return
-            rows = list_in_logs_report("Unica", start_date, end_date)
-            self.columns = ["No.", "Product Id", "Product", "Delivery Date", "Quantity"]
-            self.data = [
-                [idx, r["product_id"], r["name"], r["delivery_date"], r["quantity"]]
+            columns = ["No.", "Id.", "Product", "Category", "Unit", "In (Range)", "Out (Range)"]
+            data = [
+                (idx, r["product_id"], r["name"], r["category"], r["unit"], r["in_qty"], r["out_qty"])
                 for idx, r in enumerate(rows, start=1)
             ]
-            self.image_enabled = False
-            self.image_paths = []
-        elif inv_type == "Unica Perishable OUT Logs":
-            if not start_date or not end_date:
-                messagebox.showwarning("Missing", "From and To dates are required for OUT Logs.")
-                return
-            rows = list_out_logs_report("Unica", start_date, end_date)
-            self.columns = ["No.", "Product Id", "Product", "Out Date", "Out Time", "Quantity"]
-            self.data = [
-                [idx, r["product_id"], r["name"], r["out_date"], r["out_time"], r["quantity"]]
-                for idx, r in enumerate(rows, start=1)
-            ]
-            self.image_enabled = False
-            self.image_paths = []
+            return columns, data, False, []
         elif inv_type in ("Unica Non-Perishable", "HDN Warehouse", "Airbnb Inventory"):
             if inv_type == "Unica Non-Perishable":
                 biz = "Unica"
@@ -1323,7 +1749,7 @@ class SummaryWindow(tk.Toplevel):
                 ]
                 use_airbnb_labels = True
             rows = list_assets_for_export(biz, inv_label, start_date or None, end_date or None)
-            self.columns = [
+            columns = [
                 "No.",
                 "Id.",
                 "Name",
@@ -1335,8 +1761,8 @@ class SummaryWindow(tk.Toplevel):
                 "Total Spent",
                 "Location",
             ]
-            self.data = [
-                [
+            data = [
+                (
                     idx,
                     r["id"],
                     r.get("name") or "",
@@ -1347,85 +1773,49 @@ class SummaryWindow(tk.Toplevel):
                     r["quantity"],
                     _format_php(r.get("total_spent")),
                     r.get("location") or "",
-                ]
+                )
                 for idx, r in enumerate(rows, start=1)
             ]
-            self.image_enabled = True
-            self.image_paths = [r.get("picture_path") for r in rows]
+            return columns, data, True, [r.get("picture_path") for r in rows]
         elif inv_type == "Airbnb Inspection Checklist":
-            room_no = self.room_var.get().strip()
-            if not room_no:
-                messagebox.showwarning("Missing", "Select a room number.")
-                return
             rows = self._get_airbnb_inspection_items(room_no)
-            self.columns = ["Area", "Item", "Qty", "Turn-over"]
-            self.data = [
-                [
+            columns = ["Area", "Item", "Qty", "Turn-over"]
+            data = [
+                (
                     r.get("brand") or "",
                     r.get("name") or "",
                     r.get("quantity") or "",
                     "",
-                ]
+                )
                 for r in rows
             ]
-            self.image_enabled = False
-            self.image_paths = []
+            if room_no == AIRBNB_ALL_ROOMS:
+                columns.insert(0, "Room No.")
+                data = [(r["room"], *row) for r, row in zip(rows, data)]
+            return columns, data, False, []
         elif inv_type in ("Unica Non-Perishable Statuses", "HDN Warehouse Statuses"):
             biz = "Unica" if inv_type.startswith("Unica") else "HDN Integrated Farm"
             inv_label = "Unica Non-Perishable" if inv_type.startswith("Unica") else "HDN Warehouse"
             rows = list_asset_statuses_report(biz, inv_label)
-            self.columns = ["Asset Id", "Name", "Type", "Status", "Quantity"]
-            self.data = [[r["asset_id"], r.get("name") or "", r.get("type") or "", r["status"], r["quantity"]] for r in rows]
-            self.image_enabled = False
-            self.image_paths = []
-        elif inv_type in ("Unica Non-Perishable Acquisitions", "HDN Warehouse Acquisitions"):
-            biz = "Unica" if inv_type.startswith("Unica") else "HDN Integrated Farm"
-            inv_label = "Unica Non-Perishable" if inv_type.startswith("Unica") else "HDN Warehouse"
-            rows = list_asset_acquisitions_report(biz, inv_label, start_date or None, end_date or None)
-            self.columns = [
-                "Asset Id",
-                "Name",
-                "Type",
-                "Acquisition Date",
-                "Acquisition Cost",
-                "Delivery Cost",
-                "Quantity",
-                "Shop",
-            ]
-            self.data = [
-                [
-                    r["asset_id"],
-                    r.get("name") or "",
-                    r.get("type") or "",
-                    r.get("acquisition_date") or "",
-                    _format_php(r.get("acquisition_cost")),
-                    _format_php(r.get("delivery_cost")) if r.get("delivery_cost") is not None else "",
-                    r["quantity"],
-                    r.get("shop_link") or "",
-                ]
-                for r in rows
-            ]
-            self.image_enabled = False
-            self.image_paths = []
+            columns = ["Asset Id", "Name", "Type", "Status", "Quantity"]
+            data = [(r["asset_id"], r.get("name") or "", r.get("type") or "", r["status"], r["quantity"]) for r in rows]
+            return columns, data, False, []
         else:
-            self.columns = ["Message"]
-            self.data = [["No data yet for HDN Plants."]]
-            self.image_enabled = False
-            self.image_paths = []
+            columns = ["Message"]
+            data = [("No data yet for HDN Plants.",)]
+            return columns, data, False, []
 
+    def _apply_report(
+        self, report: tuple[list[str], list[tuple], bool, list[str | None]], report_args: tuple[str, str, str, str]
+    ) -> None:
+        self.columns, self.data, self.image_enabled, self.image_paths = report
+        self._report_args = report_args
+        set_tree_loading(self.tree, False)
         self._refresh_tree()
 
-    def _get_airbnb_inspection_items(self, room_no: str) -> list[dict]:
-        rows = list_assets("Airbnb", "Airbnb")
-        room_items = [r for r in rows if (r.get("model") or "") == room_no]
-        area_order = {name: idx for idx, name in enumerate(AIRBNB_AREAS)}
-        room_items.sort(
-            key=lambda r: (
-                area_order.get(r.get("brand") or "", 99),
-                (r.get("name") or "").lower(),
-            )
-        )
-        return room_items
+    def _get_airbnb_inspection_items(self, room_no: str) -> list[Record]:
+        rooms = AIRBNB_ROOMS if room_no == AIRBNB_ALL_ROOMS else [room_no]
+        return list_airbnb_inspection_items(rooms, AIRBNB_AREAS)
 
     def _refresh_tree(self) -> None:
         self.tree.delete(*self.tree.get_children())
@@ -1441,38 +1831,45 @@ class SummaryWindow(tk.Toplevel):
         for col in self.columns:
             self.tree.heading(col, text=col)
             self.tree.column(col, width=140, anchor="w")
+        image_paths: dict[str, str | None] = {}
         for idx, row in enumerate(self.data):
             iid = str(idx)
             self.tree.insert("", "end", iid=iid, values=row)
             if self.image_enabled:
-                path = self.image_paths[idx] if idx < len(self.image_paths) else None
-                set_tree_image(self.tree, iid, path)
+                image_paths[iid] = self.image_paths[idx] if idx < len(self.image_paths) else None
+        set_tree_images_lazy(self.tree, image_paths)
+
+    def _iter_type_headers(
+        self, columns: Sequence[str], rows: Iterable[Sequence[object]]
+    ) -> Iterator[tuple[Sequence[object], bool]]:
+        # Yields (row, is_group_header); rows pass through untouched.
+        if "Type" not in columns:
+            for row in rows:
+                yield row, False
+            return
+        type_idx = columns.index("Type")
+        blank = ("",) * len(columns)
+        last_type: str | None = None
+        for row in rows:
+            row_type = str(row[type_idx] or "").strip()
+            if row_type != last_type:
+                yield blank[:type_idx] + (row_type or "Uncategorized",) + blank[type_idx + 1 :], True
+                last_type = row_type
+            yield row, False
 
     def _with_type_headers(
         self,
         columns: Sequence[str],
         rows: Sequence[Sequence[object]],
         image_paths: Sequence[str | None] | None = None,
-    ) -> tuple[list[list[object]], list[str | None] | None]:
-        if "Type" not in columns:
-            return [list(row) for row in rows], list(image_paths) if image_paths is not None else None
-        type_idx = columns.index("Type")
-        grouped_rows: list[list[object]] = []
+    ) -> tuple[list[Sequence[object]], list[str | None] | None]:
+        grouped_rows: list[Sequence[object]] = []
         grouped_images: list[str | None] | None = [] if image_paths is not None else None
-        last_type: str | None = None
-        for idx, row in enumerate(rows):
-            row_list = list(row)
-            row_type = str(row_list[type_idx] or "").strip()
-            if row_type != last_type:
-                header_row = [""] * len(columns)
-                header_row[type_idx] = row_type or "Uncategorized"
-                grouped_rows.append(header_row)
-                if grouped_images is not None:
-                    grouped_images.append(None)
-                last_type = row_type
-            grouped_rows.append(row_list)
+        images = iter(image_paths or ())
+        for row, is_header in self._iter_type_headers(columns, rows):
+            grouped_rows.append(row)
             if grouped_images is not None:
-                grouped_images.append(image_paths[idx] if idx < len(image_paths) else None)
+                grouped_images.append(None if is_header else next(images, None))
         return grouped_rows, grouped_images
 
     def _export(self, kind: str) -> None:
@@ -1482,34 +1879,88 @@ class SummaryWindow(tk.Toplevel):
         if not self.data or not self.columns:
             messagebox.showwarning("Empty", "Load a report before exporting.")
             return
-        filetypes = [("Excel", "*.xlsx"), ("CSV", "*.csv")]
-        path = filedialog.asksaveasfilename(defaultextension=".xlsx", filetypes=filetypes)
+        report_args = self._report_args[:3] if self._report_args else None
+        copy_rows = _summary_copy_report(*report_args) if report_args else None
+        filetypes = [("Excel", "*.xlsx"), ("CSV", "*.csv"), ("CSV (gzip)", "*.csv.gz")]
+        if copy_rows is not None:
+            filetypes += [(RAW_CSV_FILETYPE, "*.csv"), (f"{RAW_CSV_FILETYPE} (gzip)", "*.csv.gz")]
+        if self._report_args and self._report_args[0] == "Airbnb Inspection Checklist":
+            filetypes.insert(0, ("PDF checklist", "*.pdf"))
+        chosen_type = tk.StringVar(self)
+        path = filedialog.asksaveasfilename(
+            parent=self, defaultextension=".xlsx", filetypes=filetypes, typevariable=chosen_type
+        )
         if not path:
             return
+        raw_csv = copy_rows is not None and chosen_type.get().startswith(RAW_CSV_FILETYPE)
         header_lines = [
             f"{self.business_var.get()} Inventory",
             f"{self.type_var.get()}",
             f"As of {date.today().strftime('%Y-%m-%d')}",
         ]
+        exported = 0
+
+        def _counted(rows: Iterable[tuple]) -> Iterator[tuple]:
+            nonlocal exported
+            for row in rows:
+                exported += 1
+                yield row
+
         try:
-            export_rows, export_images = self._with_type_headers(
-                self.columns,
-                self.data,
-                self.image_paths if self.image_enabled else None,
-            )
-            export_to_excel(
-                path,
-                self.columns,
-                export_rows,
-                image_paths=export_images if self.image_enabled else None,
-                image_height=PHOTO_THUMBNAIL_SIZE[1],
-                header_lines=header_lines,
-                image_column=1,
-            )
-            messagebox.showinfo("Exported", f"Saved to {path}")
+            streamed = None
+            if path.lower().endswith(".pdf"):
+                self._export_inspection_pdf(path)
+            elif raw_csv:
+                export_copy_csv(path, copy_rows)
+            else:
+                # Log and acquisition reports are re-read through a server-side
+                # cursor and streamed into the file instead of copying
+                # self.data, so the file reflects the database at export time.
+                streamed = _summary_log_report(*report_args, stream=True) if report_args else None
+                if streamed is not None:
+                    columns, rows = streamed
+                    header_lines[-1] = f"As of {datetime.now().strftime('%Y-%m-%d %H:%M')}"
+                    export_rows: Iterable[Sequence[object]] = (
+                        row for row, _header in self._iter_type_headers(columns, _counted(rows))
+                    )
+                    export_images = None
+                else:
+                    columns = self.columns
+                    export_rows, export_images = self._with_type_headers(
+                        self.columns,
+                        self.data,
+                        self.image_paths if self.image_enabled else None,
+                    )
+                if path.lower().endswith((".csv", ".csv.gz")):
+                    export_to_csv(path, columns, export_rows, header_lines=header_lines)
+                else:
+                    export_to_excel(
+                        path,
+                        columns,
+                        export_rows,
+                        image_paths=export_images if self.image_enabled else None,
+                        image_height=PHOTO_THUMBNAIL_SIZE[1],
+                        header_lines=header_lines,
+                        image_column=1,
+                    )
+            message = f"Saved to {path}"
+            if streamed is not None and exported != len(self.data):
+                message += (
+                    f"\n\nThe report was re-read from the database for the export and now has {exported:,} rows;"
+                    f" the loaded view shows {len(self.data):,}. Load the report again to see the current rows."
+                )
+            messagebox.showinfo("Exported", message)
         except Exception as exc:
             messagebox.showerror("Export failed", str(exc))
 
+    def _export_inspection_pdf(self, path: str) -> None:
+        # Printable two-copy checklists, one page per room.
+        if not self._report_args or self._report_args[0] != "Airbnb Inspection Checklist":
+            raise ValueError("PDF export is available for the Airbnb Inspection Checklist.")
+        items = self._get_airbnb_inspection_items(self._report_args[3])
+        rooms = [(room, list(room_items)) for room, room_items in groupby(items, key=lambda r: r["room"])]
+        export_airbnb_inspection_batch_pdf(path, date.today(), rooms)
+
     def export_excel(self) -> None:
         self._export("excel")
 
@@ -1532,6 +1983,8 @@ class InsightsWindow(tk.Toplevel):
 
         ttk.Button(top, text="Refresh", command=self.load).grid(row=0, column=2, padx=6)
         ttk.Button(top, text="Export Excel", command=self.export_excel).grid(row=0, column=3, padx=6)
+        self.updated_var = tk.StringVar()
+        ttk.Label(top, textvariable=self.updated_var, style="Muted.TLabel").grid(row=0, column=4, sticky="w", padx=6)
 
         self.tree = build_treeview(self, columns=("metric", "value"), headings=("Metric", "Value"))
         self.columns = ["Metric", "Value"]
@@ -1568,7 +2021,22 @@ class InsightsWindow(tk.Toplevel):
 
     def load(self) -> None:
         business = self.business_var.get()
-        self.data = self._build_insights(business)
+        set_tree_loading(self.tree, True)
+        get_db_executor(self).submit(
+            f"insights:{id(self)}",
+            self._build_insights,
+            business,
+            on_done=self._apply_insights,
+            on_error=lambda exc: show_load_error(self.tree, exc),
+            owner=self,
+        )
+
+    def _apply_insights(
+        self, result: tuple[list[list[object]], list[tuple[str, float]], list[tuple[str, float]], datetime]
+    ) -> None:
+        self.data, self._status_chart, self._expiry_chart, computed_at = result
+        self.updated_var.set(f"Updated {computed_at.strftime('%Y-%m-%d %H:%M')}")
+        set_tree_loading(self.tree, False)
         self._refresh_tree()
         self._draw_charts()
 
@@ -1581,110 +2049,60 @@ class InsightsWindow(tk.Toplevel):
         for idx, row in enumerate(self.data, start=1):
             self.tree.insert("", "end", iid=str(idx), values=row)
 
-    def _build_insights(self, business: str) -> list[list[object]]:
+    def _build_insights(
+        self, business: str
+    ) -> tuple[list[list[object]], list[tuple[str, float]], list[tuple[str, float]], datetime]:
+        # Runs on a worker thread: no widget access here. The figures come
+        # from the stored snapshot, recomputed only after writes.
         rows: list[list[object]] = []
-        asset_business = business
+        status_chart: list[tuple[str, float]] = []
+        expiry_chart: list[tuple[str, float]] = []
         if business == "Unica":
             inventory_type = "Unica Non-Perishable"
         elif business == "Airbnb":
             inventory_type = "Airbnb"
         else:
             inventory_type = "HDN Warehouse"
-        assets = list_assets(asset_business, inventory_type)
-        total_assets = len(assets)
-        total_qty = 0.0
-        total_spent = 0.0
-        for asset in assets:
-            try:
-                total_qty += float(asset.get("quantity") or 0)
-            except ValueError:
-                pass
-            try:
-                total_spent += float(asset.get("total_spent") or 0)
-            except ValueError:
-                pass
+        totals, computed_at = get_insights_snapshot(
+            business, inventory_type, date.today(), "Unica" if business == "Unica" else None
+        )
 
-        rows.append(["Asset items", _format_number(total_assets)])
-        rows.append(["Asset qty total", _format_number(total_qty)])
-        rows.append(["Total spent (assets)", _format_php(total_spent)])
+        rows.append(["Asset items", _format_number(totals["asset_items"])])
+        rows.append(["Asset qty total", _format_number(totals["asset_qty"])])
+        rows.append(["Total spent (assets)", _format_php(totals["total_spent"])])
 
-        acquisitions = list_asset_acquisitions_report(asset_business, inventory_type)
-        rows.append(["Acquisition entries", _format_number(len(acquisitions))])
+        acquisitions = totals["acquisition_entries"]
+        rows.append(["Acquisition entries", _format_number(acquisitions)])
         if acquisitions:
-            total_acq_qty = 0.0
-            dates: list[date] = []
-            for acq in acquisitions:
-                try:
-                    total_acq_qty += float(acq.get("quantity") or 0)
-                except ValueError:
-                    pass
-                acq_date = _safe_date(acq.get("acquisition_date"))
-                if acq_date:
-                    dates.append(acq_date)
-            avg_qty = total_acq_qty / len(acquisitions)
-            rows.append(["Avg acquisition qty", _format_number(avg_qty)])
-            if dates:
-                span_days = (max(dates) - min(dates)).days
-                span_months = max(1, round(span_days / 30))
-                rows.append(
-                    ["Acquisitions per month (approx)", _format_number(len(acquisitions) / span_months)]
-                )
+            rows.append(["Avg acquisition qty", _format_number(totals["acquisition_qty"] / acquisitions)])
+            span_months = max(1, round(totals["acquisition_span_days"] / 30))
+            rows.append(["Acquisitions per month (approx)", _format_number(acquisitions / span_months)])
 
-        statuses = list_asset_statuses_report(asset_business, inventory_type)
-        status_totals: dict[str, float] = {}
-        total_status_qty = 0.0
-        for entry in statuses:
-            status = entry.get("status") or "Unknown"
-            try:
-                qty = float(entry.get("quantity") or 0)
-            except ValueError:
-                qty = 0.0
-            status_totals[status] = status_totals.get(status, 0.0) + qty
-            total_status_qty += qty
+        status_totals = totals["statuses"] or {}
+        total_status_qty = sum(float(qty) for qty in status_totals.values())
         if status_totals:
             rows.append(["Status qty total", _format_number(total_status_qty)])
-            self._status_chart = []
             for status, qty in sorted(status_totals.items()):
+                qty = float(qty)
                 pct = (qty / total_status_qty * 100) if total_status_qty else 0
                 rows.append([f"Status: {status}", f"{pct:.1f}% (qty {_format_number(qty)})"])
-                self._status_chart.append((status, pct))
-        else:
-            self._status_chart = []
+                status_chart.append((status, pct))
 
         if business == "Unica":
-            products = list_products("Unica")
-            rows.append(["Perishable products", _format_number(len(products))])
-
-            expiry_rows = list_expiry_dates_report("Unica")
-            rows.append(["Expiry date entries", _format_number(len(expiry_rows))])
-            today = date.today()
-            expiring_7 = 0
-            expired = 0
-            for entry in expiry_rows:
-                exp = _safe_date(entry.get("expiry_date"))
-                if not exp:
-                    continue
-                delta = (exp - today).days
-                if delta < 0:
-                    expired += 1
-                elif delta <= 7:
-                    expiring_7 += 1
+            rows.append(["Perishable products", _format_number(totals["perishable_products"])])
+            rows.append(["Expiry date entries", _format_number(totals["expiry_entries"])])
+            expired = totals["expired_entries"]
+            expiring_7 = totals["expiring_entries"]
             rows.append(["Expired entries", _format_number(expired)])
             rows.append(["Expiring in 7 days", _format_number(expiring_7)])
-            self._expiry_chart = [("Expired", float(expired)), ("Expiring <=7d", float(expiring_7))]
-
-            in_logs = list_in_logs_report("Unica")
-            out_logs = list_out_logs_report("Unica")
-            rows.append(["IN logs", _format_number(len(in_logs))])
-            rows.append(["OUT logs", _format_number(len(out_logs))])
-            in_qty = sum(float(r.get("quantity") or 0) for r in in_logs)
-            out_qty = sum(float(r.get("quantity") or 0) for r in out_logs)
-            rows.append(["IN qty total", _format_number(in_qty)])
-            rows.append(["OUT qty total", _format_number(out_qty)])
-        else:
-            self._expiry_chart = []
+            expiry_chart = [("Expired", float(expired)), ("Expiring <=7d", float(expiring_7))]
+
+            rows.append(["IN logs", _format_number(totals["in_logs"])])
+            rows.append(["OUT logs", _format_number(totals["out_logs"])])
+            rows.append(["IN qty total", _format_number(totals["in_qty"])])
+            rows.append(["OUT qty total", _format_number(totals["out_qty"])])
 
-        return rows
+        return rows, status_chart, expiry_chart, computed_at
 
     def _draw_charts(self) -> None:
         self.chart_canvas.delete("all")
@@ -1965,6 +2383,13 @@ class MainWindow:
         ttk.Button(top, text="Search", command=self.refresh_perishable).grid(row=0, column=4, sticky="w", padx=6)
         ttk.Button(top, text="Clear Search", command=self._clear_perishable_search).grid(row=0, column=5, sticky="w")
         ttk.Button(top, text="Refresh", command=self.refresh_perishable).grid(row=0, column=6, sticky="w", padx=6)
+        self.perishable_local_filter = tk.BooleanVar(value=False)
+        ttk.Checkbutton(
+            top, text="Instant filter", variable=self.perishable_local_filter, command=self._toggle_perishable_local_filter
+        ).grid(row=0, column=7, sticky="w", padx=6)
+        self.perishable_category_combo.bind(
+            "<<ComboboxSelected>>", lambda _e: self._filter_perishable_locally(), add="+"
+        )
 
         buttons = ttk.Frame(top)
         buttons.grid(row=1, column=1, columnspan=6, sticky="w", pady=(0, 0))
@@ -1974,6 +2399,8 @@ class MainWindow:
         ttk.Button(buttons, text="Duplicate", command=self.duplicate_product).pack(side="left", padx=2)
         ttk.Button(buttons, text="Record IN", command=self.record_in).pack(side="left", padx=2)
         ttk.Button(buttons, text="Record OUT", command=self.record_out).pack(side="left", padx=2)
+        ttk.Button(buttons, text="Bulk IN", command=lambda: self.bulk_record("in")).pack(side="left", padx=2)
+        ttk.Button(buttons, text="Bulk OUT", command=lambda: self.bulk_record("out")).pack(side="left", padx=2)
         ttk.Button(buttons, text="View Record", command=self.view_perishable_record).pack(side="left", padx=2)
         ttk.Button(buttons, text="Add Expiry Dates", command=self.add_expiry_dates).pack(side="left", padx=2)
 
@@ -1997,26 +2424,91 @@ class MainWindow:
 
         self.refresh_perishable()
 
-        self._bind_dynamic_search(perishable_search_entry, self.refresh_perishable)
-        perishable_search_entry.bind("<Return>", lambda _e: self.refresh_perishable(), add="+")
+        self._bind_dynamic_search(perishable_search_entry, self._search_perishable)
+        perishable_search_entry.bind("<Return>", lambda _e: self._search_perishable(), add="+")
 
     def _clear_perishable_search(self) -> None:
         self.perishable_search.set("")
         self.refresh_perishable()
 
+    def _search_perishable(self) -> None:
+        if not self._filter_perishable_locally():
+            self.refresh_perishable()
+
+    def _toggle_perishable_local_filter(self) -> None:
+        self.perishable_tree._filter_index = None
+        get_db_executor(self.root).cancel("perishable:count")
+        self.refresh_perishable()
+
+    def _filter_perishable_locally(self) -> bool:
+        # Instant filter mode: search and category narrowing over the loaded index.
+        index = getattr(self.perishable_tree, "_filter_index", None)
+        if not self.perishable_local_filter.get() or index is None:
+            return False
+        category = self.perishable_category.get().strip()
+        positions = index.filter(
+            self.perishable_search.get().strip(), None if not category or category == "All" else category
+        )
+        show_local_matches(self.perishable_tree, "perishable", index, positions, self._render_perishable)
+        opening, in_qty, out_qty = index.column("opening_stock"), index.column("in_qty"), index.column("out_qty")
+        total_qty = sum(float(opening[pos]) + float(in_qty[pos]) - float(out_qty[pos]) for pos in positions)
+        self._set_tree_totals(self.perishable_tree, {"total_items": len(positions), "total_qty": total_qty})
+        return True
+
+    def _on_perishable_index(self, index: FilterIndex) -> None:
+        self.perishable_tree._filter_index = index
+        set_tree_loading(self.perishable_tree, False)
+        self._filter_perishable_locally()
+
     def refresh_perishable(self) -> None:
+        if self.perishable_local_filter.get():
+            # Reload the whole result set in the background; the current view
+            # stays usable until the new index replaces it.
+            if getattr(self.perishable_tree, "_filter_index", None) is None:
+                set_tree_loading(self.perishable_tree, True)
+            get_db_executor(self.root).submit(
+                "perishable:index",
+                build_filter_index,
+                lambda: get_perishable_stock("Unica"),
+                ("name", "category", "unit"),
+                "category",
+                on_done=self._on_perishable_index,
+                on_error=lambda exc: show_load_error(self.perishable_tree, exc),
+                owner=self.perishable_tree,
+            )
+            return
         search = self.perishable_search.get().strip()
         category = self.perishable_category.get().strip()
         category_filter = None if not category or category == "All" else category
-        rows = get_perishable_stock("Unica", search if search else None, category_filter)
-        self.perishable_tree.delete(*self.perishable_tree.get_children())
-        if hasattr(self.perishable_tree, "_img_refs"):
-            self.perishable_tree._img_refs = {}
+        search = search if search else None
+        load_tree_pages(
+            self.perishable_tree,
+            "perishable",
+            lambda after: get_perishable_stock("Unica", search, category_filter, limit=PAGE_SIZE, after=after),
+            self._render_perishable,
+        )
+        get_db_executor(self.root).submit(
+            "perishable:count",
+            count_perishable_stock,
+            "Unica",
+            search,
+            category_filter,
+            on_done=lambda totals: self._set_tree_totals(self.perishable_tree, totals),
+            owner=self.perishable_tree,
+        )
+
+    def _set_tree_totals(self, tree: ttk.Treeview, totals: dict) -> None:
+        tree._summary_total_items = int(totals["total_items"])
+        tree._summary_total_qty = float(totals["total_qty"])
+        self._update_tree_summary(tree, tree._summary_total_items, tree._summary_total_qty)
+
+    def _render_perishable(self, rows: list[dict], offset: int) -> None:
+        if offset == 0:
+            self.perishable_tree.delete(*self.perishable_tree.get_children())
         today = date.today()
-        total_qty = 0
-        for idx, row in enumerate(rows, start=1):
+        image_paths: dict[str, str | None] = {}
+        for idx, row in enumerate(rows, start=offset + 1):
             ending = float(row["opening_stock"]) + float(row["in_qty"]) - float(row["out_qty"])
-            total_qty += ending
             expiry_date = _safe_date(row.get("next_expiry"))
             expiring_3_qty = float(row.get("expiring_3_qty") or 0)
             expiring_7_qty = float(row.get("expiring_7_qty") or 0)
@@ -2059,17 +2551,15 @@ class MainWindow:
                 ),
                 tags=(tag,) if tag else (),
             )
-            set_tree_image(self.perishable_tree, str(row["id"]), row.get("photo_path"))
-        self.perishable_tree._summary_total_items = len(rows)
-        self.perishable_tree._summary_total_qty = total_qty
-        self._update_tree_summary(self.perishable_tree, len(rows), total_qty)
+            image_paths[str(row["id"])] = row.get("photo_path")
+        set_tree_images_lazy(self.perishable_tree, image_paths, append=offset > 0)
 
-    def _get_selected_product(self) -> tuple[int, dict] | None:
+    def _get_selected_product(self, fresh: bool = False) -> tuple[int, dict] | None:
         sel = self.perishable_tree.selection()
         if not sel:
             return None
         pid = int(sel[0])
-        row = next((r for r in list_products("Unica") if r["id"] == pid), None)
+        row = get_product(pid, fresh)
         if not row:
             return None
         return pid, dict(row)
@@ -2091,7 +2581,8 @@ class MainWindow:
         ProductForm(self.root, "Add Product", on_save)
 
     def edit_product(self) -> None:
-        selected = self._get_selected_product()
+        # Read past the cache so the form never starts from an outdated row.
+        selected = self._get_selected_product(fresh=True)
         if not selected:
             messagebox.showwarning("Select", "Select a product to edit.")
             return
@@ -2172,6 +2663,25 @@ class MainWindow:
 
         InOutForm(self.root, "Record OUT", products, on_save, default_product=default_name)
 
+    def bulk_record(self, kind: str) -> None:
+        products = list_products("Unica")
+        if not products:
+            messagebox.showwarning("Missing", "Add a product first.")
+            return
+
+        def on_save(entries: list[dict]) -> None:
+            try:
+                if kind == "in":
+                    record_in_batch(entries)
+                else:
+                    record_out_batch(entries)
+            except Exception as exc:
+                messagebox.showerror("Save failed", f"No rows were saved.\n\n{exc}")
+                return
+            self.refresh_perishable()
+
+        BulkInOutForm(self.root, "Bulk Record IN" if kind == "in" else "Bulk Record OUT", products, on_save)
+
     def view_logs(self, kind: str, product_id: int | None = None) -> None:
         if product_id is None:
             selected = self._get_selected_product()
@@ -2181,7 +2691,7 @@ class MainWindow:
             pid, row = selected
         else:
             pid = product_id
-            row = next((r for r in list_products("Unica") if r["id"] == pid), None) or {"name": f"ID {pid}"}
+            row = get_product(pid) or {"name": f"ID {pid}"}
         logs = list_in_out_logs(kind, pid)
 
         win = tk.Toplevel(self.root)
@@ -2260,7 +2770,7 @@ class MainWindow:
             pid, row = selected
         else:
             pid = product_id
-            row = next((r for r in list_products("Unica") if r["id"] == pid), None) or {"name": f"ID {pid}"}
+            row = get_product(pid) or {"name": f"ID {pid}"}
         logs = list_expiry_dates(pid)
 
         win = tk.Toplevel(self.root)
@@ -2477,9 +2987,8 @@ class MainWindow:
         search_entry.grid(row=0, column=1, sticky="ew", padx=4)
         ttk.Label(top, text="Type").grid(row=0, column=2, sticky="w", padx=(8, 2))
         type_var = tk.StringVar(value="All")
-        ttk.Combobox(top, textvariable=type_var, values=["All"] + ASSET_TYPES, state="readonly", width=18).grid(
-            row=0, column=3, sticky="w"
-        )
+        type_combo = ttk.Combobox(top, textvariable=type_var, values=["All"] + ASSET_TYPES, state="readonly", width=18)
+        type_combo.grid(row=0, column=3, sticky="w")
         ttk.Button(
             top, text="Search", command=lambda: self.refresh_assets(tree, business, inventory_type, search_var, type_var, sort_var)
         ).grid(row=0, column=4, sticky="w", padx=6)
@@ -2507,6 +3016,7 @@ class MainWindow:
                 "Newest (Acquired)",
                 "Qty Low-High",
                 "Qty High-Low",
+                "Relevance",
             ],
             state="readonly",
             width=18,
@@ -2516,6 +3026,18 @@ class MainWindow:
             "<<ComboboxSelected>>",
             lambda _e: self.refresh_assets(tree, business, inventory_type, search_var, type_var, sort_var),
         )
+        local_filter_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(
+            top,
+            text="Instant filter",
+            variable=local_filter_var,
+            command=lambda: self._toggle_asset_local_filter(tree, business, inventory_type, search_var, type_var, sort_var),
+        ).grid(row=0, column=9, sticky="w", padx=6)
+        type_combo.bind(
+            "<<ComboboxSelected>>",
+            lambda _e: self._filter_assets_locally(tree, business, inventory_type, search_var, type_var),
+            add="+",
+        )
         buttons = ttk.Frame(top)
         buttons.grid(row=1, column=1, columnspan=8, sticky="w", pady=(0, 0))
         ttk.Button(buttons, text="Add", command=lambda: self.add_asset(tree, business, inventory_type, search_var, type_var)).pack(
@@ -2617,6 +3139,7 @@ class MainWindow:
         self._register_tree(tree, tab)
 
         tree._sort_var = sort_var
+        tree._local_filter_var = local_filter_var
         self.refresh_assets(tree, business, inventory_type, search_var, type_var, sort_var)
 
         summary_bar = ttk.Frame(tab, style="Card.TFrame", padding=(8, 4))
@@ -2628,12 +3151,64 @@ class MainWindow:
 
         self._bind_dynamic_search(
             search_entry,
-            lambda: self.refresh_assets(tree, business, inventory_type, search_var, type_var, sort_var),
+            lambda: self._search_assets(tree, business, inventory_type, search_var, type_var, sort_var),
         )
         search_entry.bind(
             "<Return>",
-            lambda _e: self.refresh_assets(tree, business, inventory_type, search_var, type_var, sort_var),
+            lambda _e: self._search_assets(tree, business, inventory_type, search_var, type_var, sort_var),
+        )
+
+    def _search_assets(
+        self,
+        tree: ttk.Treeview,
+        business: str,
+        inventory_type: str,
+        search_var: tk.StringVar,
+        type_var: tk.StringVar,
+        sort_var: tk.StringVar | None = None,
+    ) -> None:
+        if not self._filter_assets_locally(tree, business, inventory_type, search_var, type_var):
+            self.refresh_assets(tree, business, inventory_type, search_var, type_var, sort_var)
+
+    def _toggle_asset_local_filter(
+        self,
+        tree: ttk.Treeview,
+        business: str,
+        inventory_type: str,
+        search_var: tk.StringVar,
+        type_var: tk.StringVar,
+        sort_var: tk.StringVar | None = None,
+    ) -> None:
+        tree._filter_index = None
+        get_db_executor(self.root).cancel(f"assets:{id(tree)}:count")
+        self.refresh_assets(tree, business, inventory_type, search_var, type_var, sort_var)
+
+    def _filter_assets_locally(
+        self,
+        tree: ttk.Treeview,
+        business: str,
+        inventory_type: str,
+        search_var: tk.StringVar,
+        type_var: tk.StringVar,
+    ) -> bool:
+        # Instant filter mode: search and type narrowing over the loaded index.
+        index = getattr(tree, "_filter_index", None)
+        local_filter_var = getattr(tree, "_local_filter_var", None)
+        if local_filter_var is None or not local_filter_var.get() or index is None:
+            return False
+        type_filter = type_var.get().strip()
+        positions = index.filter(search_var.get().strip(), None if not type_filter or type_filter == "All" else type_filter)
+        show_local_matches(
+            tree,
+            f"assets:{id(tree)}",
+            index,
+            positions,
+            lambda rows, offset: self._render_assets(tree, business, inventory_type, rows, offset),
         )
+        quantities = index.column("quantity")
+        total_qty = sum(float(quantities[pos] or 0) for pos in positions)
+        self._set_tree_totals(tree, {"total_items": len(positions), "total_qty": total_qty})
+        return True
 
     def refresh_assets(
         self,
@@ -2650,33 +3225,57 @@ class MainWindow:
             sort_var = tree._sort_var
         sort_choice = sort_var.get().strip() if sort_var is not None else "Alphabetical (A-Z)"
         type_filter_val = None if not type_filter or type_filter == "All" else type_filter
-        rows = list_assets(business, inventory_type, search if search else None, type_filter_val)
-        if sort_choice == "Alphabetical (Z-A)":
-            rows.sort(key=lambda r: (r.get("name") or "").lower(), reverse=True)
-        elif sort_choice == "Oldest (Added)":
-            rows.sort(key=lambda r: r.get("id") or 0)
-        elif sort_choice == "Newest (Added)":
-            rows.sort(key=lambda r: r.get("id") or 0, reverse=True)
-        elif sort_choice == "Oldest (Acquired)":
-            rows.sort(key=lambda r: r.get("latest_acquisition_date") or r.get("acquisition_date") or "")
-        elif sort_choice == "Newest (Acquired)":
-            rows.sort(key=lambda r: r.get("latest_acquisition_date") or r.get("acquisition_date") or "", reverse=True)
-        elif sort_choice == "Qty Low-High":
-            rows.sort(key=lambda r: float(r.get("quantity") or 0))
-        elif sort_choice == "Qty High-Low":
-            rows.sort(key=lambda r: float(r.get("quantity") or 0), reverse=True)
-        else:
-            rows.sort(key=lambda r: (r.get("name") or "").lower())
-        tree.delete(*tree.get_children())
-        if hasattr(tree, "_img_refs"):
-            tree._img_refs = {}
-        total_qty = 0
+        local_filter_var = getattr(tree, "_local_filter_var", None)
+        if local_filter_var is not None and local_filter_var.get():
+            # Reload the whole result set in the tab's sort order; the current
+            # view stays usable until the new index replaces it.
+            if getattr(tree, "_filter_index", None) is None:
+                set_tree_loading(tree, True)
+
+            def _on_index(index: FilterIndex) -> None:
+                tree._filter_index = index
+                set_tree_loading(tree, False)
+                self._filter_assets_locally(tree, business, inventory_type, search_var, type_var)
+
+            get_db_executor(self.root).submit(
+                f"assets:{id(tree)}:index",
+                build_filter_index,
+                lambda: list_assets(business, inventory_type, sort=sort_choice),
+                ("name", "brand", "model", "specifications", "series_number", "location"),
+                "type",
+                on_done=_on_index,
+                on_error=lambda exc: show_load_error(tree, exc),
+                owner=tree,
+            )
+            return
+        search = search if search else None
+        load_tree_pages(
+            tree,
+            f"assets:{id(tree)}",
+            lambda after: list_assets(
+                business, inventory_type, search, type_filter_val, sort=sort_choice, limit=PAGE_SIZE, after=after
+            ),
+            lambda rows, offset: self._render_assets(tree, business, inventory_type, rows, offset),
+        )
+        get_db_executor(self.root).submit(
+            f"assets:{id(tree)}:count",
+            count_assets,
+            business,
+            inventory_type,
+            search,
+            type_filter_val,
+            on_done=lambda totals: self._set_tree_totals(tree, totals),
+            owner=tree,
+        )
+
+    def _render_assets(
+        self, tree: ttk.Treeview, business: str, inventory_type: str, rows: list[dict], offset: int
+    ) -> None:
+        if offset == 0:
+            tree.delete(*tree.get_children())
+        image_paths: dict[str, str | None] = {}
         is_airbnb = getattr(tree, "_airbnb", False) or inventory_type == "Airbnb" or business == "Airbnb"
-        for idx, row in enumerate(rows, start=1):
-            try:
-                total_qty += float(row.get("quantity") or 0)
-            except ValueError:
-                pass
+        for idx, row in enumerate(rows, start=offset + 1):
             if is_airbnb:
                 values = (
                     idx,
@@ -2712,10 +3311,8 @@ class MainWindow:
                 text="",
                 values=values,
             )
-            set_tree_image(tree, str(row["id"]), row.get("picture_path"))
-        tree._summary_total_items = len(rows)
-        tree._summary_total_qty = total_qty
-        self._update_tree_summary(tree, len(rows), total_qty)
+            image_paths[str(row["id"])] = row.get("picture_path")
+        set_tree_images_lazy(tree, image_paths, append=offset > 0)
 
     def _clear_asset_search(
         self,
@@ -2777,8 +3374,8 @@ class MainWindow:
             messagebox.showwarning("Select", "Select a record to edit.")
             return
         asset_id = int(sel[0])
-        row = next((r for r in list_assets(business, inventory_type) if r["id"] == asset_id), None)
-        if not row:
+        row = get_asset(asset_id, fresh=True)
+        if not row or row["business"] != business or row["inventory_type"] != inventory_type:
             return
 
         def on_save(data: dict) -> None:
@@ -2843,8 +3440,8 @@ class MainWindow:
             messagebox.showwarning("Select", "Select a record first.")
             return
         asset_id = int(sel[0])
-        row = next((r for r in list_assets(business, inventory_type) if r["id"] == asset_id), None)
-        if not row:
+        row = get_asset(asset_id)
+        if not row or row["business"] != business or row["inventory_type"] != inventory_type:
             return
 
         win = tk.Toplevel(self.root)
@@ -2957,8 +3554,8 @@ class MainWindow:
             messagebox.showwarning("Select", "Select a record first.")
             return
         asset_id = int(sel[0])
-        row = next((r for r in list_assets(business, inventory_type) if r["id"] == asset_id), None)
-        if not row:
+        row = get_asset(asset_id)
+        if not row or row["business"] != business or row["inventory_type"] != inventory_type:
             return
 
         statuses = list_asset_statuses(asset_id)
@@ -2984,8 +3581,8 @@ class MainWindow:
             messagebox.showwarning("Select", "Select a record first.")
             return
         asset_id = int(sel[0])
-        row = next((r for r in list_assets(business, inventory_type) if r["id"] == asset_id), None)
-        if not row:
+        row = get_asset(asset_id)
+        if not row or row["business"] != business or row["inventory_type"] != inventory_type:
             return
 
         win = tk.Toplevel(self.root)
@@ -3064,8 +3661,8 @@ class MainWindow:
             messagebox.showwarning("Select", "Select a record first.")
             return
         asset_id = int(sel[0])
-        row = next((r for r in list_assets(business, inventory_type) if r["id"] == asset_id), None)
-        if not row:
+        row = get_asset(asset_id)
+        if not row or row["business"] != business or row["inventory_type"] != inventory_type:
             return
 
         win = tk.Toplevel(self.root)
@@ -3252,8 +3849,8 @@ class MainWindow:
             messagebox.showwarning("Select", "Select a record first.")
             return
         asset_id = int(sel[0])
-        row = next((r for r in list_assets(business, inventory_type) if r["id"] == asset_id), None)
-        if not row:
+        row = get_asset(asset_id)
+        if not row or row["business"] != business or row["inventory_type"] != inventory_type:
             return
 
         win = tk.Toplevel(self.root)
@@ -3367,6 +3964,10 @@ def main() -> None:
     configure_context_menu(root)
     try:
         init_db()
+    except MigrationError as exc:
+        messagebox.showerror("Database Setup Error", str(exc), parent=root)
+        root.destroy()
+        return
     except Exception as exc:
         messagebox.showerror(
             "Database Error",
@@ -3380,7 +3981,13 @@ def main() -> None:
         MainWindow(root, user)
 
     LoginWindow(root, launch)
-    root.mainloop()
+    try:
+        root.mainloop()
+    finally:
+        executor = getattr(root, "_db_executor", None)
+        if executor is not None:
+            executor.shutdown()
+        close_pool()
 
 
 if __name__ == "__main__":
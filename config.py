@@ -12,6 +12,10 @@ class DbConfig:
     dbname: str = "aman_inventory"
     user: str = "postgres"
     password: str = "postgres"
+    pool_min_size: int = 1
+    pool_max_size: int = 5
+    pool_max_idle: float = 300.0
+    pool_check_after: float = 30.0
 
 
 def load_db_config() -> DbConfig:
@@ -30,5 +34,9 @@ def load_db_config() -> DbConfig:
             dbname=data.get("dbname", "aman_inventory"),
             user=data.get("user", "postgres"),
             password=data.get("password", "postgres"),
+            pool_min_size=int(data.get("pool_min_size", 1)),
+            pool_max_size=int(data.get("pool_max_size", 5)),
+            pool_max_idle=float(data.get("pool_max_idle", 300.0)),
+            pool_check_after=float(data.get("pool_check_after", 30.0)),
         )
     return DbConfig()
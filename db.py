@@ -1,13 +1,26 @@
 from __future__ import annotations
 
 import hashlib
-from typing import Iterable, Sequence
+import itertools
+import threading
+import time
+from contextlib import AbstractContextManager
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import IO, Callable, Iterable, Iterator, Sequence
 
 import psycopg2
-from psycopg2.extras import RealDictCursor
+from psycopg2.extras import RealDictCursor, execute_values
 
-from config import load_db_config
-from constants import DEFAULT_LOW_STOCK_LEVEL, DEFAULT_PRODUCTS
+from config import DbConfig, load_db_config
+from constants import BUSINESSES, DEFAULT_LOW_STOCK_LEVEL, DEFAULT_PRODUCTS
+from db_pool import ConnectionPool
+from migrations import LATEST_VERSION, MIGRATIONS, apply_migrations, current_version
+from records import Record, fetch_records, iter_records
+from search import rank_expression, search_clause
+
+_pool: ConnectionPool | None = None
+_pool_lock = threading.Lock()
 
 
 def _hash_password(password: str) -> str:
@@ -15,8 +28,8 @@ def _hash_password(password: str) -> str:
     return hashlib.sha256((salt + password).encode("utf-8")).hexdigest()
 
 
-def connect():
-    cfg = load_db_config()
+def connect(cfg: DbConfig | None = None):
+    cfg = cfg or load_db_config()
     if cfg.port == 0 and "://" in cfg.host:
         return psycopg2.connect(cfg.host, cursor_factory=RealDictCursor)
     return psycopg2.connect(
@@ -29,182 +42,71 @@ def connect():
     )
 
 
-def init_db() -> None:
-    conn = connect()
-    cur = conn.cursor()
+def _get_pool() -> ConnectionPool:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                cfg = load_db_config()
+                _pool = ConnectionPool(
+                    lambda: connect(cfg),
+                    min_size=cfg.pool_min_size,
+                    max_size=cfg.pool_max_size,
+                    max_idle=cfg.pool_max_idle,
+                    check_after=cfg.pool_check_after,
+                )
+    return _pool
 
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS users (
-            id SERIAL PRIMARY KEY,
-            username TEXT UNIQUE NOT NULL,
-            password_hash TEXT NOT NULL,
-            business TEXT NOT NULL,
-            is_admin BOOLEAN NOT NULL DEFAULT FALSE
-        )
-        """
-    )
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS user_businesses (
-            user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
-            business TEXT NOT NULL,
-            PRIMARY KEY (user_id, business)
-        )
-        """
-    )
 
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS products (
-            id SERIAL PRIMARY KEY,
-            name TEXT NOT NULL,
-            category TEXT NOT NULL,
-            unit TEXT NOT NULL,
-            photo_path TEXT,
-            opening_stock NUMERIC NOT NULL DEFAULT 0,
-            low_stock_level NUMERIC NOT NULL DEFAULT %s,
-            business TEXT NOT NULL
-        )
-        """,
-        (DEFAULT_LOW_STOCK_LEVEL,),
-    )
+def get_conn() -> AbstractContextManager:
+    # Borrow a pooled connection; it is rolled back and returned on exit.
+    return _get_pool().connection()
 
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS perishable_in (
-            id SERIAL PRIMARY KEY,
-            product_id INTEGER NOT NULL REFERENCES products(id) ON DELETE CASCADE,
-            delivery_date DATE NOT NULL,
-            expiry_date DATE,
-            quantity NUMERIC NOT NULL
-        )
-        """
-    )
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS perishable_in_breakdown (
-            id SERIAL PRIMARY KEY,
-            in_id INTEGER NOT NULL REFERENCES perishable_in(id) ON DELETE CASCADE,
-            expiry_date DATE,
-            quantity NUMERIC NOT NULL
-        )
-        """
-    )
-    try:
-        cur.execute("ALTER TABLE perishable_in ALTER COLUMN expiry_date DROP NOT NULL")
-    except Exception:
-        pass
 
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS perishable_out (
-            id SERIAL PRIMARY KEY,
-            product_id INTEGER NOT NULL REFERENCES products(id) ON DELETE CASCADE,
-            out_date DATE NOT NULL,
-            out_time TEXT NOT NULL,
-            quantity NUMERIC NOT NULL
-        )
-        """
-    )
+def close_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
+
+def init_db() -> None:
+    with get_conn() as conn:
+        # Warm start: an up-to-date schema costs a single version query.
+        if current_version(conn) >= LATEST_VERSION:
+            return
+        apply_migrations(conn, seed=_seed_defaults)
 
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS assets (
-            id SERIAL PRIMARY KEY,
-            picture_path TEXT,
-            name TEXT NOT NULL,
-            brand TEXT,
-            model TEXT,
-            specifications TEXT,
-            series_number TEXT,
-            acquisition_date DATE NOT NULL,
-            acquisition_cost NUMERIC NOT NULL,
-            delivery_cost NUMERIC,
-            quantity NUMERIC NOT NULL,
-            location TEXT,
-            status TEXT,
-            business TEXT NOT NULL,
-            shop_link TEXT,
-            type TEXT NOT NULL,
-            inventory_type TEXT NOT NULL
-        )
-        """
-    )
-    try:
-        cur.execute("ALTER TABLE assets ALTER COLUMN acquisition_date DROP NOT NULL")
-    except Exception:
-        pass
-    try:
-        cur.execute("ALTER TABLE assets ALTER COLUMN acquisition_cost DROP NOT NULL")
-    except Exception:
-        pass
-    try:
-        cur.execute("ALTER TABLE assets ADD COLUMN IF NOT EXISTS specifications TEXT")
-    except Exception:
-        pass
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS asset_statuses (
-            id SERIAL PRIMARY KEY,
-            asset_id INTEGER NOT NULL REFERENCES assets(id) ON DELETE CASCADE,
-            status TEXT NOT NULL,
-            quantity NUMERIC NOT NULL
-        )
-        """
-    )
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS asset_acquisitions (
-            id SERIAL PRIMARY KEY,
-            asset_id INTEGER NOT NULL REFERENCES assets(id) ON DELETE CASCADE,
-            acquisition_date DATE NOT NULL,
-            acquisition_cost NUMERIC NOT NULL,
-            delivery_cost NUMERIC,
-            quantity NUMERIC NOT NULL,
-            shop_link TEXT
-        )
-        """
-    )
-    try:
-        cur.execute("ALTER TABLE asset_acquisitions ADD COLUMN IF NOT EXISTS shop_link TEXT")
-    except Exception:
-        pass
 
-    conn.commit()
+def _seed_defaults(cur) -> None:
+    # Runs inside apply_migrations' final step and commits with its version
+    # row, so a failed seed leaves the schema pending and is retried.
 
     # Migrate existing users into user_businesses if missing
-    cur.execute("SELECT id, business FROM users")
-    users = cur.fetchall()
-    for user in users:
-        cur.execute(
-            "SELECT 1 FROM user_businesses WHERE user_id = %s LIMIT 1",
-            (user["id"],),
-        )
-        if cur.fetchone():
-            continue
-        business = (user.get("business") or "").strip()
-        if business == "Both":
-            for biz in ("Unica", "HDN Integrated Farm", "Airbnb"):
-                cur.execute(
-                    "INSERT INTO user_businesses (user_id, business) VALUES (%s, %s)",
-                    (user["id"], biz),
-                )
-        elif business:
-            cur.execute(
-                "INSERT INTO user_businesses (user_id, business) VALUES (%s, %s)",
-                (user["id"], business),
-            )
+    cur.execute(
+        """
+        INSERT INTO user_businesses (user_id, business)
+        SELECT u.id, biz
+        FROM users u
+        CROSS JOIN LATERAL unnest(
+            CASE WHEN TRIM(u.business) = 'Both' THEN %s::text[] ELSE ARRAY[TRIM(u.business)] END
+        ) AS biz
+        WHERE TRIM(u.business) <> ''
+            AND NOT EXISTS (SELECT 1 FROM user_businesses ub WHERE ub.user_id = u.id)
+        ON CONFLICT DO NOTHING
+        """,
+        (list(BUSINESSES),),
+    )
 
     cur.execute("SELECT COUNT(*) as cnt FROM users")
     if cur.fetchone()["cnt"] == 0:
         cur.execute(
-            "INSERT INTO users (username, password_hash, business, is_admin) VALUES (%s, %s, %s, %s)",
+            "INSERT INTO users (username, password_hash, business, is_admin) VALUES (%s, %s, %s, %s) RETURNING id",
             ("admin", _hash_password("admin123"), "Both", True),
         )
-        cur.execute("SELECT id FROM users WHERE username = %s", ("admin",))
         admin_id = cur.fetchone()["id"]
-        for biz in ("Unica", "HDN Integrated Farm", "Airbnb"):
+        for biz in BUSINESSES:
             cur.execute(
                 "INSERT INTO user_businesses (user_id, business) VALUES (%s, %s)",
                 (admin_id, biz),
@@ -220,8 +122,6 @@ def init_db() -> None:
             [(name, category, "unit", None, 0, DEFAULT_LOW_STOCK_LEVEL, "Unica") for name, category in DEFAULT_PRODUCTS],
         )
 
-    conn.commit()
-
     # Seed acquisition records from legacy asset fields if none exist
     cur.execute("SELECT COUNT(*) as cnt FROM asset_acquisitions")
     if cur.fetchone()["cnt"] == 0:
@@ -233,7 +133,6 @@ def init_db() -> None:
             WHERE acquisition_date IS NOT NULL
             """
         )
-        conn.commit()
     else:
         # Backfill shop links from assets where missing
         cur.execute(
@@ -244,113 +143,218 @@ def init_db() -> None:
             WHERE a.id = aa.asset_id AND aa.shop_link IS NULL AND a.shop_link IS NOT NULL
             """
         )
-        conn.commit()
-    conn.close()
+
+
+# Users are few and read on every login and Users-tab refresh, so the whole
+# table is cached in-process and reloaded after writes or when it expires.
+_USER_CACHE_TTL = 60.0
+_user_cache: dict[str, dict] | None = None
+_user_cache_loaded = 0.0
+_user_cache_lock = threading.Lock()
+
+
+def _load_users(force: bool = False) -> dict[str, dict]:
+    global _user_cache, _user_cache_loaded
+    with _user_cache_lock:
+        fresh = _user_cache is not None and time.monotonic() - _user_cache_loaded < _USER_CACHE_TTL
+        if fresh and not force:
+            return _user_cache
+        with get_conn() as conn:
+            cur = conn.cursor()
+            cur.execute(
+                """
+                SELECT
+                    u.id,
+                    u.username,
+                    u.password_hash,
+                    u.business,
+                    u.is_admin,
+                    array_remove(array_agg(ub.business ORDER BY ub.business), NULL) as businesses
+                FROM users u
+                LEFT JOIN user_businesses ub ON ub.user_id = u.id
+                GROUP BY u.id
+                ORDER BY u.username ASC
+                """
+            )
+            rows = cur.fetchall()
+        _user_cache = {row["username"]: dict(row) for row in rows}
+        _user_cache_loaded = time.monotonic()
+        return _user_cache
+
+
+def _invalidate_users() -> None:
+    global _user_cache
+    with _user_cache_lock:
+        _user_cache = None
+
+
+# Per-process identity map for single-row lookups, dropped on every write to
+# the row and, like the user cache, expired after a while since other
+# machines write to the same database. The generation guards against caching
+# a row read before a write. fresh=True skips the cache (edit dialogs).
+_ROW_CACHE_TTL = 60.0
+_row_cache: dict[tuple[str, int], tuple[dict, float]] = {}
+_row_cache_generation = 0
+_row_cache_lock = threading.Lock()
+
+
+def _cached_row(kind: str, row_id: int, query: str, fresh: bool = False) -> dict | None:
+    with _row_cache_lock:
+        cached = None if fresh else _row_cache.get((kind, row_id))
+        generation = _row_cache_generation
+    if cached is not None and time.monotonic() - cached[1] < _ROW_CACHE_TTL:
+        return dict(cached[0])
+    with get_conn() as conn:
+        cur = conn.cursor()
+        cur.execute(query, (row_id,))
+        row = cur.fetchone()
+    with _row_cache_lock:
+        if row is None:
+            _row_cache.pop((kind, row_id), None)
+            return None
+        if generation == _row_cache_generation:
+            _row_cache[(kind, row_id)] = (row, time.monotonic())
+    return dict(row)
+
+
+def _forget_row(kind: str, row_id: int) -> None:
+    global _row_cache_generation
+    with _row_cache_lock:
+        _row_cache.pop((kind, row_id), None)
+        _row_cache_generation += 1
 
 
 def verify_user(username: str, password: str) -> tuple[bool, dict | None]:
-    conn = connect()
-    cur = conn.cursor()
-    cur.execute("SELECT id, username, password_hash, business, is_admin FROM users WHERE username = %s", (username,))
-    row = cur.fetchone()
-    conn.close()
-    if not row:
+    password_hash = _hash_password(password)
+    row = _load_users().get(username)
+    if not row or row["password_hash"] != password_hash:
+        # The account may have been added or changed from another machine.
+        row = _load_users(force=True).get(username)
+    if not row or row["password_hash"] != password_hash:
         return False, None
-    if row["password_hash"] == _hash_password(password):
-        conn = connect()
-        cur = conn.cursor()
-        cur.execute(
-            "SELECT business FROM user_businesses WHERE user_id = %s ORDER BY business ASC",
-            (row["id"],),
-        )
-        biz_rows = cur.fetchall()
-        conn.close()
-        row["businesses"] = [b["business"] for b in biz_rows] if biz_rows else [row["business"]]
-        return True, row
-    return False, None
+    user = dict(row)
+    user["businesses"] = list(row["businesses"]) or [row["business"]]
+    return True, user
 
 
 def list_users() -> list[dict]:
-    conn = connect()
-    cur = conn.cursor()
-    cur.execute("SELECT id, username, business, is_admin FROM users ORDER BY username ASC")
-    rows = cur.fetchall()
-    for row in rows:
-        cur.execute(
-            "SELECT business FROM user_businesses WHERE user_id = %s ORDER BY business ASC",
-            (row["id"],),
+    users = []
+    for row in _load_users().values():
+        users.append(
+            {
+                "id": row["id"],
+                "username": row["username"],
+                "business": ", ".join(row["businesses"]) if row["businesses"] else row["business"],
+                "is_admin": row["is_admin"],
+            }
         )
-        biz_rows = cur.fetchall()
-        if biz_rows:
-            row["business"] = ", ".join([b["business"] for b in biz_rows])
-    conn.close()
-    return rows
+    return users
 
 
 def add_user(username: str, password: str, businesses: Sequence[str], is_admin: bool) -> None:
-    conn = connect()
-    cur = conn.cursor()
-    business_label = ", ".join(businesses) if businesses else ""
-    cur.execute(
-        "INSERT INTO users (username, password_hash, business, is_admin) VALUES (%s, %s, %s, %s)",
-        (username, _hash_password(password), business_label or "Unica", is_admin),
-    )
-    cur.execute("SELECT id FROM users WHERE username = %s", (username,))
-    user_id = cur.fetchone()["id"]
-    for biz in businesses:
+    with get_conn() as conn:
+        cur = conn.cursor()
+        business_label = ", ".join(businesses) if businesses else ""
         cur.execute(
-            "INSERT INTO user_businesses (user_id, business) VALUES (%s, %s)",
-            (user_id, biz),
+            "INSERT INTO users (username, password_hash, business, is_admin) VALUES (%s, %s, %s, %s) RETURNING id",
+            (username, _hash_password(password), business_label or "Unica", is_admin),
         )
-    conn.commit()
-    conn.close()
+        user_id = cur.fetchone()["id"]
+        for biz in businesses:
+            cur.execute(
+                "INSERT INTO user_businesses (user_id, business) VALUES (%s, %s)",
+                (user_id, biz),
+            )
+        conn.commit()
+    _invalidate_users()
 
 
 def update_user(user_id: int, password: str | None, businesses: Sequence[str], is_admin: bool) -> None:
-    conn = connect()
-    cur = conn.cursor()
-    business_label = ", ".join(businesses) if businesses else ""
-    if password:
-        cur.execute(
-            "UPDATE users SET password_hash=%s, business=%s, is_admin=%s WHERE id=%s",
-            (_hash_password(password), business_label or "Unica", is_admin, user_id),
-        )
-    else:
-        cur.execute(
-            "UPDATE users SET business=%s, is_admin=%s WHERE id=%s",
-            (business_label or "Unica", is_admin, user_id),
-        )
-    cur.execute("DELETE FROM user_businesses WHERE user_id = %s", (user_id,))
-    for biz in businesses:
-        cur.execute(
-            "INSERT INTO user_businesses (user_id, business) VALUES (%s, %s)",
-            (user_id, biz),
-        )
-    conn.commit()
-    conn.close()
+    with get_conn() as conn:
+        cur = conn.cursor()
+        business_label = ", ".join(businesses) if businesses else ""
+        if password:
+            cur.execute(
+                "UPDATE users SET password_hash=%s, business=%s, is_admin=%s WHERE id=%s",
+                (_hash_password(password), business_label or "Unica", is_admin, user_id),
+            )
+        else:
+            cur.execute(
+                "UPDATE users SET business=%s, is_admin=%s WHERE id=%s",
+                (business_label or "Unica", is_admin, user_id),
+            )
+        cur.execute("DELETE FROM user_businesses WHERE user_id = %s", (user_id,))
+        for biz in businesses:
+            cur.execute(
+                "INSERT INTO user_businesses (user_id, business) VALUES (%s, %s)",
+                (user_id, biz),
+            )
+        conn.commit()
+    _invalidate_users()
 
 
 def delete_user(user_id: int) -> None:
-    conn = connect()
-    cur = conn.cursor()
-    cur.execute("DELETE FROM users WHERE id=%s", (user_id,))
-    conn.commit()
-    conn.close()
+    with get_conn() as conn:
+        cur = conn.cursor()
+        cur.execute("DELETE FROM users WHERE id=%s", (user_id,))
+        conn.commit()
+    _invalidate_users()
 
 
-def list_products(business: str, search: str | None = None) -> list[dict]:
-    conn = connect()
-    cur = conn.cursor()
-    params: list[object] = [business]
-    query = "SELECT * FROM products WHERE business = %s"
-    if search:
-        query += " AND (CAST(id AS TEXT) ILIKE %s OR name ILIKE %s OR category ILIKE %s OR unit ILIKE %s)"
-        like = f"%{search}%"
-        params.extend([like, like, like, like])
-    cur.execute(query + " ORDER BY name ASC", params)
-    rows = cur.fetchall()
-    conn.close()
-    return rows
+def _product_filters(search: str | None, category: str | None = None) -> tuple[str, list[object]]:
+    sql, params = search_clause("p", search)
+    if category:
+        sql += " AND p.category ILIKE %s"
+        params.append(f"%{category}%")
+    return sql, params
+
+
+def _keyset(sort_sql: str, id_sql: str, descending: bool, after: Sequence[object] | None) -> tuple[str, list[object]]:
+    # Rows strictly past the (sort key, id) of the last row of the previous page.
+    if after is None:
+        return "", []
+    op = "<" if descending else ">"
+    return f" AND ({sort_sql}, {id_sql}) {op} (%s, %s)", [after[0], after[1]]
+
+
+def list_products(
+    business: str,
+    search: str | None = None,
+    limit: int | None = None,
+    after: Sequence[object] | None = None,
+) -> list[dict]:
+    with get_conn() as conn:
+        cur = conn.cursor()
+        filter_sql, filter_params = _product_filters(search)
+        keyset_sql, keyset_params = _keyset("p.name", "p.id", False, after)
+        query = f"""
+            SELECT
+                p.id, p.name, p.category, p.unit, p.photo_path, p.opening_stock, p.low_stock_level, p.business,
+                p.name as sort_key
+            FROM products p
+            WHERE p.business = %s{filter_sql}{keyset_sql}
+            ORDER BY p.name ASC, p.id ASC
+        """
+        params: list[object] = [business, *filter_params, *keyset_params]
+        if limit is not None:
+            query += " LIMIT %s"
+            params.append(limit)
+        cur.execute(query, params)
+        rows = cur.fetchall()
+        return rows
+
+
+def get_product(product_id: int, fresh: bool = False) -> dict | None:
+    return _cached_row(
+        "product",
+        product_id,
+        """
+        SELECT id, name, category, unit, photo_path, opening_stock, low_stock_level, business
+        FROM products
+        WHERE id = %s
+        """,
+        fresh,
+    )
 
 
 def add_product(
@@ -362,48 +366,45 @@ def add_product(
     low_stock_level: float,
     business: str,
 ) -> None:
-    conn = connect()
-    cur = conn.cursor()
-    cur.execute(
-        """
-        INSERT INTO products (name, category, unit, photo_path, opening_stock, low_stock_level, business)
-        VALUES (%s, %s, %s, %s, %s, %s, %s)
-        """,
-        (name, category, unit, photo_path, opening_stock, low_stock_level, business),
-    )
-    conn.commit()
-    conn.close()
+    with get_conn() as conn:
+        cur = conn.cursor()
+        cur.execute(
+            """
+            INSERT INTO products (name, category, unit, photo_path, opening_stock, low_stock_level, business)
+            VALUES (%s, %s, %s, %s, %s, %s, %s)
+            """,
+            (name, category, unit, photo_path, opening_stock, low_stock_level, business),
+        )
+        conn.commit()
 
 
 def duplicate_product(product_id: int) -> int:
-    conn = connect()
-    cur = conn.cursor()
-    cur.execute("SELECT * FROM products WHERE id = %s", (product_id,))
-    row = cur.fetchone()
-    if not row:
-        conn.close()
-        return 0
-    new_name = f"{row.get('name') or ''} (copy)".strip()
-    cur.execute(
-        """
-        INSERT INTO products (name, category, unit, photo_path, opening_stock, low_stock_level, business)
-        VALUES (%s, %s, %s, %s, %s, %s, %s)
-        RETURNING id
-        """,
-        (
-            new_name,
-            row.get("category"),
-            row.get("unit"),
-            row.get("photo_path"),
-            row.get("opening_stock") or 0,
-            row.get("low_stock_level") or DEFAULT_LOW_STOCK_LEVEL,
-            row.get("business"),
-        ),
-    )
-    new_id = cur.fetchone()["id"]
-    conn.commit()
-    conn.close()
-    return new_id
+    with get_conn() as conn:
+        cur = conn.cursor()
+        cur.execute("SELECT * FROM products WHERE id = %s", (product_id,))
+        row = cur.fetchone()
+        if not row:
+            return 0
+        new_name = f"{row.get('name') or ''} (copy)".strip()
+        cur.execute(
+            """
+            INSERT INTO products (name, category, unit, photo_path, opening_stock, low_stock_level, business)
+            VALUES (%s, %s, %s, %s, %s, %s, %s)
+            RETURNING id
+            """,
+            (
+                new_name,
+                row.get("category"),
+                row.get("unit"),
+                row.get("photo_path"),
+                row.get("opening_stock") or 0,
+                row.get("low_stock_level") or DEFAULT_LOW_STOCK_LEVEL,
+                row.get("business"),
+            ),
+        )
+        new_id = cur.fetchone()["id"]
+        conn.commit()
+        return new_id
 
 
 def update_product(
@@ -415,237 +416,602 @@ def update_product(
     photo_path: str | None,
     low_stock_level: float,
 ) -> None:
-    conn = connect()
-    cur = conn.cursor()
-    cur.execute(
+    with get_conn() as conn:
+        cur = conn.cursor()
+        cur.execute(
+            """
+            UPDATE products
+            SET name=%s, category=%s, unit=%s, opening_stock=%s, photo_path=%s, low_stock_level=%s
+            WHERE id=%s
+            """,
+            (name, category, unit, opening_stock, photo_path, low_stock_level, product_id),
+        )
+        conn.commit()
+    _forget_row("product", product_id)
+
+
+def delete_product(product_id: int) -> None:
+    with get_conn() as conn:
+        cur = conn.cursor()
+        cur.execute("DELETE FROM products WHERE id=%s", (product_id,))
+        conn.commit()
+    _forget_row("product", product_id)
+
+
+_STOCK_LEDGER_TOTALS_SQL = """
+    SELECT
+        p.id AS product_id,
+        COALESCE(it.in_qty, 0) AS in_qty,
+        COALESCE(ot.out_qty, 0) AS out_qty
+    FROM products p
+    LEFT JOIN (SELECT product_id, SUM(quantity) AS in_qty FROM perishable_in GROUP BY product_id) it
+        ON it.product_id = p.id
+    LEFT JOIN (SELECT product_id, SUM(quantity) AS out_qty FROM perishable_out GROUP BY product_id) ot
+        ON ot.product_id = p.id
+"""
+
+
+def _add_ledger_delta(
+    deltas: dict[tuple[int, date], tuple[Decimal, Decimal]],
+    product_id: int,
+    day: date,
+    in_delta: Decimal = Decimal(0),
+    out_delta: Decimal = Decimal(0),
+) -> dict[tuple[int, date], tuple[Decimal, Decimal]]:
+    # Day and quantity are the values the cursor returned for the stored ledger
+    # row, never the caller's input, so the sums match SUM(quantity) exactly.
+    key = (product_id, day)
+    old_in, old_out = deltas.get(key, (Decimal(0), Decimal(0)))
+    deltas[key] = (old_in + in_delta, old_out + out_delta)
+    return deltas
+
+
+def _apply_ledger_deltas(cur, deltas: dict[tuple[int, date], tuple[Decimal, Decimal]]) -> None:
+    # IN/OUT quantity changes keyed by (product, ledger day): folded into the
+    # stock balances and the daily/monthly rollups in the caller's transaction.
+    totals: dict[int, tuple[Decimal, Decimal]] = {}
+    for (product_id, _day), (in_delta, out_delta) in deltas.items():
+        old_in, old_out = totals.get(product_id, (Decimal(0), Decimal(0)))
+        totals[product_id] = (old_in + in_delta, old_out + out_delta)
+    _apply_stock_deltas(cur, totals)
+    _apply_rollup_deltas(cur, deltas)
+
+
+def _apply_stock_deltas(cur, deltas: dict[int, tuple[Decimal, Decimal]]) -> None:
+    # Runs inside the caller's transaction so the balance commits with the ledger rows.
+    execute_values(
+        cur,
         """
-        UPDATE products
-        SET name=%s, category=%s, unit=%s, opening_stock=%s, photo_path=%s, low_stock_level=%s
-        WHERE id=%s
+        INSERT INTO product_stock_balance (product_id, in_qty, out_qty)
+        VALUES %s
+        ON CONFLICT (product_id) DO UPDATE
+        SET in_qty = product_stock_balance.in_qty + EXCLUDED.in_qty,
+            out_qty = product_stock_balance.out_qty + EXCLUDED.out_qty,
+            updated_at = NOW()
         """,
-        (name, category, unit, opening_stock, photo_path, low_stock_level, product_id),
+        [(product_id, in_delta, out_delta) for product_id, (in_delta, out_delta) in deltas.items()],
     )
-    conn.commit()
-    conn.close()
 
 
-def delete_product(product_id: int) -> None:
-    conn = connect()
-    cur = conn.cursor()
-    cur.execute("DELETE FROM products WHERE id=%s", (product_id,))
-    conn.commit()
-    conn.close()
+def _apply_rollup_deltas(cur, deltas: dict[tuple[int, date], tuple[Decimal, Decimal]]) -> None:
+    months: dict[tuple[int, date], tuple[Decimal, Decimal]] = {}
+    for (product_id, day), (in_delta, out_delta) in deltas.items():
+        key = (product_id, day.replace(day=1))
+        old_in, old_out = months.get(key, (Decimal(0), Decimal(0)))
+        months[key] = (old_in + in_delta, old_out + out_delta)
+    for table, column, rows in (
+        ("perishable_daily_rollup", "day", deltas),
+        ("perishable_monthly_rollup", "month", months),
+    ):
+        execute_values(
+            cur,
+            f"""
+            INSERT INTO {table} (product_id, {column}, in_qty, out_qty)
+            VALUES %s
+            ON CONFLICT (product_id, {column}) DO UPDATE
+            SET in_qty = {table}.in_qty + EXCLUDED.in_qty,
+                out_qty = {table}.out_qty + EXCLUDED.out_qty
+            """,
+            [(product_id, day, in_delta, out_delta) for (product_id, day), (in_delta, out_delta) in rows.items()],
+        )
 
 
-def record_in(product_id: int, delivery_date: str, quantity: float) -> None:
-    conn = connect()
-    cur = conn.cursor()
+def _rebuild_stock_balances(cur) -> list[dict]:
+    cur.execute("LOCK TABLE perishable_in, perishable_out IN SHARE MODE")
     cur.execute(
-        "INSERT INTO perishable_in (product_id, delivery_date, expiry_date, quantity) VALUES (%s, %s, %s, %s)",
-        (product_id, delivery_date, None, quantity),
+        f"""
+        WITH expected AS ({_STOCK_LEDGER_TOTALS_SQL})
+        SELECT
+            e.product_id,
+            p.name,
+            COALESCE(b.in_qty, 0) as stored_in_qty,
+            e.in_qty,
+            COALESCE(b.out_qty, 0) as stored_out_qty,
+            e.out_qty
+        FROM expected e
+        JOIN products p ON p.id = e.product_id
+        LEFT JOIN product_stock_balance b ON b.product_id = e.product_id
+        WHERE COALESCE(b.in_qty, 0) <> e.in_qty OR COALESCE(b.out_qty, 0) <> e.out_qty
+        ORDER BY p.name ASC
+        """
     )
-    conn.commit()
-    conn.close()
-
-
-def update_in_log(log_id: int, delivery_date: str, quantity: float) -> None:
-    conn = connect()
-    cur = conn.cursor()
+    drift = cur.fetchall()
     cur.execute(
-        "UPDATE perishable_in SET delivery_date=%s, quantity=%s WHERE id=%s",
-        (delivery_date, quantity, log_id),
+        f"""
+        INSERT INTO product_stock_balance (product_id, in_qty, out_qty)
+        SELECT product_id, in_qty, out_qty FROM ({_STOCK_LEDGER_TOTALS_SQL}) expected
+        ON CONFLICT (product_id) DO UPDATE
+        SET in_qty = EXCLUDED.in_qty, out_qty = EXCLUDED.out_qty, updated_at = NOW()
+        """
     )
-    conn.commit()
-    conn.close()
+    return drift
 
 
-def delete_in_log(log_id: int) -> None:
-    conn = connect()
-    cur = conn.cursor()
-    cur.execute("DELETE FROM perishable_in WHERE id=%s", (log_id,))
-    conn.commit()
-    conn.close()
+_DAILY_ROLLUP_SQL = """
+    SELECT product_id, day, SUM(in_qty) AS in_qty, SUM(out_qty) AS out_qty
+    FROM (
+        SELECT product_id, delivery_date AS day, quantity AS in_qty, 0 AS out_qty FROM perishable_in
+        UNION ALL
+        SELECT product_id, out_date, 0, quantity FROM perishable_out
+    ) ledger
+    GROUP BY product_id, day
+"""
 
 
-def record_out(product_id: int, out_date: str, out_time: str, quantity: float) -> None:
-    conn = connect()
-    cur = conn.cursor()
+def _rebuild_perishable_rollups(cur) -> int:
+    # Recomputes both rollups from the ledgers; returns the number of
+    # (product, day) rows whose stored totals had drifted or were missing.
+    cur.execute("LOCK TABLE perishable_in, perishable_out IN SHARE MODE")
     cur.execute(
-        "INSERT INTO perishable_out (product_id, out_date, out_time, quantity) VALUES (%s, %s, %s, %s)",
-        (product_id, out_date, out_time, quantity),
+        f"""
+        SELECT COUNT(*) as drift
+        FROM ({_DAILY_ROLLUP_SQL}) expected
+        FULL JOIN perishable_daily_rollup r ON r.product_id = expected.product_id AND r.day = expected.day
+        WHERE COALESCE(r.in_qty, 0) <> COALESCE(expected.in_qty, 0)
+            OR COALESCE(r.out_qty, 0) <> COALESCE(expected.out_qty, 0)
+        """
     )
-    conn.commit()
-    conn.close()
+    drift = int(cur.fetchone()["drift"])
+    cur.execute("DELETE FROM perishable_daily_rollup")
+    cur.execute("DELETE FROM perishable_monthly_rollup")
+    cur.execute(f"INSERT INTO perishable_daily_rollup (product_id, day, in_qty, out_qty) {_DAILY_ROLLUP_SQL}")
+    cur.execute(
+        """
+        INSERT INTO perishable_monthly_rollup (product_id, month, in_qty, out_qty)
+        SELECT product_id, date_trunc('month', day)::date, SUM(in_qty), SUM(out_qty)
+        FROM perishable_daily_rollup
+        GROUP BY product_id, date_trunc('month', day)
+        """
+    )
+    return drift
 
 
-def update_out_log(log_id: int, out_date: str, out_time: str, quantity: float) -> None:
-    conn = connect()
-    cur = conn.cursor()
+def rebuild_perishable_rollups() -> int:
+    with get_conn() as conn:
+        cur = conn.cursor()
+        drift = _rebuild_perishable_rollups(cur)
+        conn.commit()
+        return drift
+
+
+def rebuild_stock_balances() -> list[dict]:
+    with get_conn() as conn:
+        cur = conn.cursor()
+        drift = _rebuild_stock_balances(cur)
+        conn.commit()
+        return drift
+
+
+def record_in(product_id: int, delivery_date: str, quantity: float) -> None:
+    with get_conn() as conn:
+        cur = conn.cursor()
+        cur.execute(
+            """
+            INSERT INTO perishable_in (product_id, delivery_date, expiry_date, quantity) VALUES (%s, %s, %s, %s)
+            RETURNING delivery_date, quantity
+            """,
+            (product_id, delivery_date, None, quantity),
+        )
+        new = cur.fetchone()
+        _apply_ledger_deltas(cur, _add_ledger_delta({}, product_id, new["delivery_date"], in_delta=new["quantity"]))
+        conn.commit()
+
+
+def _next_ids(cur, table: str, count: int) -> list[int]:
+    # Draws ids from the table's serial up front, so batch rows can be matched
+    # to their entries by id; RETURNING order is not guaranteed to follow VALUES.
     cur.execute(
-        "UPDATE perishable_out SET out_date=%s, out_time=%s, quantity=%s WHERE id=%s",
-        (out_date, out_time, quantity, log_id),
+        "SELECT nextval(pg_get_serial_sequence(%s, 'id')) as id FROM generate_series(1, %s)", (table, count)
     )
-    conn.commit()
-    conn.close()
+    return [row["id"] for row in cur.fetchall()]
 
 
-def delete_out_log(log_id: int) -> None:
-    conn = connect()
-    cur = conn.cursor()
-    cur.execute("DELETE FROM perishable_out WHERE id=%s", (log_id,))
-    conn.commit()
-    conn.close()
+def record_in_batch(entries: Sequence[dict]) -> list[int]:
+    # Each entry: product_id, date, quantity and optional expiries [(expiry_date, quantity), ...].
+    # Returns the new IN log ids in entry order.
+    if not entries:
+        return []
+    with get_conn() as conn:
+        cur = conn.cursor()
+        in_ids = _next_ids(cur, "perishable_in", len(entries))
+        inserted = execute_values(
+            cur,
+            """
+            INSERT INTO perishable_in (id, product_id, delivery_date, expiry_date, quantity) VALUES %s
+            RETURNING product_id, delivery_date, quantity
+            """,
+            [(in_id, e["product_id"], e["date"], None, e["quantity"]) for in_id, e in zip(in_ids, entries)],
+            page_size=1000,
+            fetch=True,
+        )
+        breakdown = [
+            (in_id, expiry_date, qty)
+            for in_id, entry in zip(in_ids, entries)
+            for expiry_date, qty in entry.get("expiries") or ()
+        ]
+        if breakdown:
+            execute_values(
+                cur,
+                "INSERT INTO perishable_in_breakdown (in_id, expiry_date, quantity) VALUES %s",
+                breakdown,
+                page_size=1000,
+            )
+        deltas: dict[tuple[int, date], tuple[Decimal, Decimal]] = {}
+        for row in inserted:
+            _add_ledger_delta(deltas, row["product_id"], row["delivery_date"], in_delta=row["quantity"])
+        _apply_ledger_deltas(cur, deltas)
+        conn.commit()
+        return in_ids
 
 
-def get_perishable_stock(business: str, search: str | None = None, category: str | None = None) -> list[dict]:
-    conn = connect()
-    cur = conn.cursor()
-    params: list[object] = [business]
-    query = """
-        SELECT
-            p.id,
-            p.name,
-            p.category,
-            p.unit,
-            p.opening_stock,
-            p.low_stock_level,
-            p.photo_path,
-            COALESCE((SELECT SUM(quantity) FROM perishable_in i WHERE i.product_id = p.id), 0) as in_qty,
-            COALESCE((SELECT SUM(quantity) FROM perishable_out o WHERE o.product_id = p.id), 0) as out_qty,
-            (
-                SELECT MIN(b.expiry_date)
-                FROM perishable_in_breakdown b
-                JOIN perishable_in i ON i.id = b.in_id
-                WHERE i.product_id = p.id AND b.expiry_date IS NOT NULL
-            ) as next_expiry,
-            COALESCE(
-                (
-                    SELECT SUM(b.quantity)
-                    FROM perishable_in_breakdown b
-                    JOIN perishable_in i ON i.id = b.in_id
-                    WHERE i.product_id = p.id AND b.expiry_date IS NOT NULL AND b.expiry_date <= CURRENT_DATE + 3
-                ),
-                0
-            ) as expiring_3_qty,
-            COALESCE(
-                (
-                    SELECT SUM(b.quantity)
-                    FROM perishable_in_breakdown b
-                    JOIN perishable_in i ON i.id = b.in_id
-                    WHERE i.product_id = p.id AND b.expiry_date IS NOT NULL AND b.expiry_date <= CURRENT_DATE + 7
-                ),
-                0
-            ) as expiring_7_qty
-        FROM products p
-        WHERE p.business = %s
-    """
-    if search:
-        query += " AND (CAST(p.id AS TEXT) ILIKE %s OR p.name ILIKE %s OR p.category ILIKE %s OR p.unit ILIKE %s)"
-        like = f"%{search}%"
-        params.extend([like, like, like, like])
-    if category:
-        query += " AND p.category ILIKE %s"
-        params.append(f"%{category}%")
-    query += " ORDER BY p.name ASC"
-    cur.execute(query, params)
-    rows = cur.fetchall()
-    conn.close()
-    return rows
+def update_in_log(log_id: int, delivery_date: str, quantity: float) -> None:
+    with get_conn() as conn:
+        cur = conn.cursor()
+        cur.execute(
+            "SELECT product_id, delivery_date, quantity FROM perishable_in WHERE id=%s FOR UPDATE", (log_id,)
+        )
+        old = cur.fetchone()
+        if not old:
+            return
+        cur.execute(
+            "UPDATE perishable_in SET delivery_date=%s, quantity=%s WHERE id=%s RETURNING delivery_date, quantity",
+            (delivery_date, quantity, log_id),
+        )
+        new = cur.fetchone()
+        deltas = _add_ledger_delta({}, old["product_id"], old["delivery_date"], in_delta=-old["quantity"])
+        _add_ledger_delta(deltas, old["product_id"], new["delivery_date"], in_delta=new["quantity"])
+        _apply_ledger_deltas(cur, deltas)
+        conn.commit()
 
 
-def get_perishable_report(business: str, start_date: str, end_date: str) -> list[dict]:
-    conn = connect()
-    cur = conn.cursor()
-    cur.execute(
+def delete_in_log(log_id: int) -> None:
+    with get_conn() as conn:
+        cur = conn.cursor()
+        cur.execute(
+            "DELETE FROM perishable_in WHERE id=%s RETURNING product_id, delivery_date, quantity", (log_id,)
+        )
+        old = cur.fetchone()
+        if old:
+            _apply_ledger_deltas(
+                cur, _add_ledger_delta({}, old["product_id"], old["delivery_date"], in_delta=-old["quantity"])
+            )
+        conn.commit()
+
+
+def record_out(product_id: int, out_date: str, out_time: str, quantity: float) -> None:
+    with get_conn() as conn:
+        cur = conn.cursor()
+        cur.execute(
+            """
+            INSERT INTO perishable_out (product_id, out_date, out_time, quantity) VALUES (%s, %s, %s, %s)
+            RETURNING out_date, quantity
+            """,
+            (product_id, out_date, out_time, quantity),
+        )
+        new = cur.fetchone()
+        _apply_ledger_deltas(cur, _add_ledger_delta({}, product_id, new["out_date"], out_delta=new["quantity"]))
+        conn.commit()
+
+
+def record_out_batch(entries: Sequence[dict]) -> list[int]:
+    # Each entry: product_id, date, time and quantity. Returns the new OUT log ids in entry order.
+    if not entries:
+        return []
+    with get_conn() as conn:
+        cur = conn.cursor()
+        out_ids = _next_ids(cur, "perishable_out", len(entries))
+        inserted = execute_values(
+            cur,
+            """
+            INSERT INTO perishable_out (id, product_id, out_date, out_time, quantity) VALUES %s
+            RETURNING product_id, out_date, quantity
+            """,
+            [(out_id, e["product_id"], e["date"], e["time"], e["quantity"]) for out_id, e in zip(out_ids, entries)],
+            page_size=1000,
+            fetch=True,
+        )
+        deltas: dict[tuple[int, date], tuple[Decimal, Decimal]] = {}
+        for row in inserted:
+            _add_ledger_delta(deltas, row["product_id"], row["out_date"], out_delta=row["quantity"])
+        _apply_ledger_deltas(cur, deltas)
+        conn.commit()
+        return out_ids
+
+
+def update_out_log(log_id: int, out_date: str, out_time: str, quantity: float) -> None:
+    with get_conn() as conn:
+        cur = conn.cursor()
+        cur.execute("SELECT product_id, out_date, quantity FROM perishable_out WHERE id=%s FOR UPDATE", (log_id,))
+        old = cur.fetchone()
+        if not old:
+            return
+        cur.execute(
+            "UPDATE perishable_out SET out_date=%s, out_time=%s, quantity=%s WHERE id=%s RETURNING out_date, quantity",
+            (out_date, out_time, quantity, log_id),
+        )
+        new = cur.fetchone()
+        deltas = _add_ledger_delta({}, old["product_id"], old["out_date"], out_delta=-old["quantity"])
+        _add_ledger_delta(deltas, old["product_id"], new["out_date"], out_delta=new["quantity"])
+        _apply_ledger_deltas(cur, deltas)
+        conn.commit()
+
+
+def delete_out_log(log_id: int) -> None:
+    with get_conn() as conn:
+        cur = conn.cursor()
+        cur.execute("DELETE FROM perishable_out WHERE id=%s RETURNING product_id, out_date, quantity", (log_id,))
+        old = cur.fetchone()
+        if old:
+            _apply_ledger_deltas(
+                cur, _add_ledger_delta({}, old["product_id"], old["out_date"], out_delta=-old["quantity"])
+            )
+        conn.commit()
+
+
+def get_perishable_stock(
+    business: str,
+    search: str | None = None,
+    category: str | None = None,
+    limit: int | None = None,
+    after: Sequence[object] | None = None,
+) -> list[dict]:
+    with get_conn() as conn:
+        cur = conn.cursor()
+        # The page is cut first; IN/OUT totals come from the maintained balance
+        # table and expiry buckets are aggregated in one grouped pass over the
+        # page's products (the whole business when there is no limit).
+        filter_sql, filter_params = _product_filters(search, category)
+        keyset_sql, keyset_params = _keyset("p.name", "p.id", False, after)
+        limit_sql = " LIMIT %s" if limit is not None else ""
+        query = f"""
+            WITH page AS (
+                SELECT p.id, p.name, p.category, p.unit, p.opening_stock, p.low_stock_level, p.photo_path
+                FROM products p
+                WHERE p.business = %s{filter_sql}{keyset_sql}
+                ORDER BY p.name ASC, p.id ASC{limit_sql}
+            )
+            SELECT
+                p.id,
+                p.name,
+                p.category,
+                p.unit,
+                p.opening_stock,
+                p.low_stock_level,
+                p.photo_path,
+                p.name as sort_key,
+                COALESCE(sb.in_qty, 0) as in_qty,
+                COALESCE(sb.out_qty, 0) as out_qty,
+                et.next_expiry,
+                COALESCE(et.expiring_3_qty, 0) as expiring_3_qty,
+                COALESCE(et.expiring_7_qty, 0) as expiring_7_qty
+            FROM page p
+            LEFT JOIN product_stock_balance sb ON sb.product_id = p.id
+            LEFT JOIN (
+                SELECT
+                    i.product_id,
+                    MIN(b.expiry_date) AS next_expiry,
+                    SUM(b.quantity) FILTER (WHERE b.expiry_date <= CURRENT_DATE + 3) AS expiring_3_qty,
+                    SUM(b.quantity) FILTER (WHERE b.expiry_date <= CURRENT_DATE + 7) AS expiring_7_qty
+                FROM perishable_in i
+                JOIN perishable_in_breakdown b ON b.in_id = i.id
+                WHERE i.product_id IN (SELECT id FROM page) AND b.expiry_date IS NOT NULL
+                GROUP BY i.product_id
+            ) et ON et.product_id = p.id
+            ORDER BY p.name ASC, p.id ASC
         """
-        SELECT
-            p.id as product_id,
-            p.name,
-            p.category,
-            p.unit,
-            COALESCE((SELECT SUM(quantity) FROM perishable_in i WHERE i.product_id = p.id AND i.delivery_date BETWEEN %s AND %s), 0) as in_qty,
-            COALESCE((SELECT SUM(quantity) FROM perishable_out o WHERE o.product_id = p.id AND o.out_date BETWEEN %s AND %s), 0) as out_qty
-        FROM products p
-        WHERE p.business = %s
-        ORDER BY p.category ASC, p.name ASC
-        """,
-        (start_date, end_date, start_date, end_date, business),
-    )
-    rows = cur.fetchall()
-    conn.close()
-    return rows
+        params: list[object] = [business, *filter_params, *keyset_params]
+        if limit is not None:
+            params.append(limit)
+        cur.execute(query, params)
+        rows = cur.fetchall()
+        return rows
 
 
-def list_in_out_logs(kind: str, product_id: int) -> list[dict]:
-    conn = connect()
-    cur = conn.cursor()
-    if kind == "in":
+def count_perishable_stock(business: str, search: str | None = None, category: str | None = None) -> dict:
+    with get_conn() as conn:
+        cur = conn.cursor()
+        filter_sql, filter_params = _product_filters(search, category)
         cur.execute(
-            "SELECT id, delivery_date, quantity FROM perishable_in WHERE product_id = %s ORDER BY delivery_date DESC",
-            (product_id,),
+            f"""
+            SELECT
+                COUNT(*) as total_items,
+                COALESCE(SUM(p.opening_stock + COALESCE(sb.in_qty, 0) - COALESCE(sb.out_qty, 0)), 0) as total_qty
+            FROM products p
+            LEFT JOIN product_stock_balance sb ON sb.product_id = p.id
+            WHERE p.business = %s{filter_sql}
+            """,
+            [business, *filter_params],
         )
-    else:
+        return cur.fetchone()
+
+
+# Rows fetched per round trip by the streaming (server-side cursor) reports.
+REPORT_ITERSIZE = 2000
+_report_cursor_ids = itertools.count(1)
+
+
+def _fetch_report(query: str, params: Sequence[object]) -> list[Record]:
+    with get_conn() as conn:
+        cur = conn.cursor(cursor_factory=psycopg2.extensions.cursor)
+        cur.execute(query, params)
+        return fetch_records(cur)
+
+
+def _stream_report(query: str, params: Sequence[object]) -> Iterator[Record]:
+    # A named cursor keeps the result on the server; rows arrive REPORT_ITERSIZE
+    # at a time and the pooled connection is held until the generator is
+    # exhausted or closed.
+    with get_conn() as conn:
+        cur = conn.cursor(name=f"report_{next(_report_cursor_ids)}", cursor_factory=psycopg2.extensions.cursor)
+        cur.itersize = REPORT_ITERSIZE
+        cur.execute(query, params)
+        yield from iter_records(cur)
+        cur.close()
+
+
+def _rollup_ranges(start: date, end: date) -> tuple[tuple[tuple[date, date], tuple[date, date]], tuple[date, date]]:
+    # Splits [start, end] into whole months, read from the monthly rollup,
+    # and the leftover days at either end, read from the daily rollup.
+    # Ranges are half-open.
+    first_month = start if start.day == 1 else (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+    after_end = end + timedelta(days=1)
+    end_month = after_end.replace(day=1)
+    if first_month >= end_month:
+        return ((start, after_end), (start, start)), (start, start)
+    return ((start, first_month), (end_month, after_end)), (first_month, end_month)
+
+
+def get_perishable_report(business: str, start_date: str, end_date: str) -> list[Record]:
+    # IN/OUT totals for the range from the rollups: at most about 62 daily
+    # rows per product (partial months at each end) plus one row per whole
+    # month, whatever the ledger size.
+    with get_conn() as conn:
+        cur = conn.cursor(cursor_factory=psycopg2.extensions.cursor)
+        # PostgreSQL parses the entered dates, as it does for the ledger writes.
+        cur.execute("SELECT %s::date, %s::date", (start_date, end_date))
+        (head, tail), months = _rollup_ranges(*cur.fetchone())
         cur.execute(
-            "SELECT id, out_date, out_time, quantity FROM perishable_out WHERE product_id = %s ORDER BY out_date DESC",
-            (product_id,),
+            """
+            WITH scope AS (SELECT id FROM products WHERE business = %s),
+            totals AS (
+                SELECT product_id, SUM(in_qty) as in_qty, SUM(out_qty) as out_qty
+                FROM (
+                    SELECT product_id, in_qty, out_qty
+                    FROM perishable_daily_rollup
+                    WHERE product_id IN (SELECT id FROM scope)
+                        AND ((day >= %s AND day < %s) OR (day >= %s AND day < %s))
+                    UNION ALL
+                    SELECT product_id, in_qty, out_qty
+                    FROM perishable_monthly_rollup
+                    WHERE product_id IN (SELECT id FROM scope) AND month >= %s AND month < %s
+                ) r
+                GROUP BY product_id
+            )
+            SELECT
+                p.id as product_id,
+                p.name,
+                p.category,
+                p.unit,
+                COALESCE(t.in_qty, 0) as in_qty,
+                COALESCE(t.out_qty, 0) as out_qty
+            FROM products p
+            LEFT JOIN totals t ON t.product_id = p.id
+            WHERE p.business = %s
+            ORDER BY p.category ASC, p.name ASC
+            """,
+            (business, *head, *tail, *months, business),
         )
-    rows = cur.fetchall()
-    conn.close()
-    return rows
+        return fetch_records(cur)
+
+
+def list_in_out_logs(kind: str, product_id: int) -> list[dict]:
+    with get_conn() as conn:
+        cur = conn.cursor()
+        if kind == "in":
+            cur.execute(
+                "SELECT id, delivery_date, quantity FROM perishable_in WHERE product_id = %s ORDER BY delivery_date DESC",
+                (product_id,),
+            )
+        else:
+            cur.execute(
+                "SELECT id, out_date, out_time, quantity FROM perishable_out WHERE product_id = %s ORDER BY out_date DESC",
+                (product_id,),
+            )
+        rows = cur.fetchall()
+        return rows
 
 
 def list_expiry_dates(product_id: int) -> list[dict]:
-    conn = connect()
-    cur = conn.cursor()
-    cur.execute(
-        """
-        SELECT b.id, i.delivery_date, b.expiry_date, b.quantity
-        FROM perishable_in_breakdown b
-        JOIN perishable_in i ON i.id = b.in_id
-        WHERE i.product_id = %s
-        ORDER BY b.expiry_date ASC NULLS LAST, i.delivery_date DESC
-        """,
-        (product_id,),
-    )
-    rows = cur.fetchall()
-    conn.close()
-    return rows
+    with get_conn() as conn:
+        cur = conn.cursor()
+        cur.execute(
+            """
+            SELECT b.id, i.delivery_date, b.expiry_date, b.quantity
+            FROM perishable_in_breakdown b
+            JOIN perishable_in i ON i.id = b.in_id
+            WHERE i.product_id = %s
+            ORDER BY b.expiry_date ASC NULLS LAST, i.delivery_date DESC
+            """,
+            (product_id,),
+        )
+        rows = cur.fetchall()
+        return rows
 
 
 def list_in_breakdown(in_id: int) -> list[dict]:
-    conn = connect()
-    cur = conn.cursor()
-    cur.execute(
-        """
-        SELECT id, expiry_date, quantity
-        FROM perishable_in_breakdown
-        WHERE in_id = %s
-        ORDER BY expiry_date ASC NULLS LAST
-        """,
-        (in_id,),
-    )
-    rows = cur.fetchall()
-    conn.close()
-    return rows
+    with get_conn() as conn:
+        cur = conn.cursor()
+        cur.execute(
+            """
+            SELECT id, expiry_date, quantity
+            FROM perishable_in_breakdown
+            WHERE in_id = %s
+            ORDER BY expiry_date ASC NULLS LAST
+            """,
+            (in_id,),
+        )
+        rows = cur.fetchall()
+        return rows
 
 
 def add_in_breakdown(in_id: int, expiry_date: str | None, quantity: float) -> None:
-    conn = connect()
-    cur = conn.cursor()
-    cur.execute(
-        "INSERT INTO perishable_in_breakdown (in_id, expiry_date, quantity) VALUES (%s, %s, %s)",
-        (in_id, expiry_date, quantity),
-    )
-    conn.commit()
-    conn.close()
+    with get_conn() as conn:
+        cur = conn.cursor()
+        cur.execute(
+            "INSERT INTO perishable_in_breakdown (in_id, expiry_date, quantity) VALUES (%s, %s, %s)",
+            (in_id, expiry_date, quantity),
+        )
+        conn.commit()
 
 
 def delete_in_breakdown(breakdown_id: int) -> None:
-    conn = connect()
-    cur = conn.cursor()
-    cur.execute("DELETE FROM perishable_in_breakdown WHERE id=%s", (breakdown_id,))
-    conn.commit()
-    conn.close()
+    with get_conn() as conn:
+        cur = conn.cursor()
+        cur.execute("DELETE FROM perishable_in_breakdown WHERE id=%s", (breakdown_id,))
+        conn.commit()
+
+
+# Sort choices offered by the asset tabs: (sort key expression, descending).
+ASSET_SORTS: dict[str, tuple[str, bool]] = {
+    "Alphabetical (A-Z)": ("lower(a.name)", False),
+    "Alphabetical (Z-A)": ("lower(a.name)", True),
+    "Oldest (Added)": ("a.id", False),
+    "Newest (Added)": ("a.id", True),
+    "Oldest (Acquired)": ("COALESCE(acq.latest_acquisition_date, a.acquisition_date, DATE '0001-01-01')", False),
+    "Newest (Acquired)": ("COALESCE(acq.latest_acquisition_date, a.acquisition_date, DATE '0001-01-01')", True),
+    "Qty Low-High": ("a.quantity", False),
+    "Qty High-Low": ("a.quantity", True),
+    # Negated rank so that pages ascend like every other key.
+    "Relevance": ("r.relevance", False),
+}
+
+
+def _asset_filters(search: str | None, type_filter: str | None) -> tuple[str, list[object]]:
+    sql, params = search_clause("a", search)
+    if type_filter:
+        sql += " AND a.type = %s"
+        params.append(type_filter)
+    return sql, params
 
 
 def list_assets(
@@ -653,123 +1019,165 @@ def list_assets(
     inventory_type: str,
     search: str | None = None,
     type_filter: str | None = None,
+    sort: str | None = None,
+    limit: int | None = None,
+    after: Sequence[object] | None = None,
 ) -> list[dict]:
-    conn = connect()
-    cur = conn.cursor()
-    params: list[object] = [business, inventory_type]
-    query = """
-        SELECT
-            a.*,
-            (
-                SELECT MAX(acquisition_date)
+    with get_conn() as conn:
+        cur = conn.cursor()
+        if sort is None:
+            sort_sql, descending = "a.name", False
+        else:
+            sort_sql, descending = ASSET_SORTS.get(sort, ASSET_SORTS["Alphabetical (A-Z)"])
+        rank_sql, rank_params = rank_expression("a", search)
+        if sort == "Relevance" and not rank_params:
+            sort_sql, descending = ASSET_SORTS["Alphabetical (A-Z)"]
+        relevance_join = ""
+        if sort_sql == "r.relevance":
+            relevance_join = f"CROSS JOIN LATERAL (SELECT -({rank_sql})::float8 as relevance) r"
+        else:
+            rank_params = []
+        direction = "DESC" if descending else "ASC"
+        filter_sql, filter_params = _asset_filters(search, type_filter)
+        keyset_sql, keyset_params = _keyset(sort_sql, "a.id", descending, after)
+        # Acquisition totals are aggregated per listed asset rather than by
+        # three correlated subqueries.
+        query = f"""
+            SELECT
+                a.id, a.picture_path, a.name, a.brand, a.model, a.specifications, a.series_number,
+                a.acquisition_date, a.acquisition_cost, a.delivery_cost, a.quantity, a.location,
+                a.status, a.business, a.shop_link, a.type, a.inventory_type,
+                acq.latest_acquisition_date,
+                COALESCE(acq.total_acquired_qty, 0) as total_acquired_qty,
+                COALESCE(acq.total_spent, 0) as total_spent,
+                {sort_sql} as sort_key
+            FROM assets a
+            CROSS JOIN LATERAL (
+                SELECT
+                    MAX(acquisition_date) as latest_acquisition_date,
+                    SUM(quantity) as total_acquired_qty,
+                    SUM(acquisition_cost * quantity) as total_spent
                 FROM asset_acquisitions aa
                 WHERE aa.asset_id = a.id
-            ) as latest_acquisition_date,
-            COALESCE(
-                (
-                    SELECT SUM(quantity)
-                    FROM asset_acquisitions aa
-                    WHERE aa.asset_id = a.id
-                ),
-                0
-            ) as total_acquired_qty,
-            COALESCE(
-                (
-                    SELECT SUM(acquisition_cost * quantity)
-                    FROM asset_acquisitions aa
-                    WHERE aa.asset_id = a.id
-                ),
-                0
-            ) as total_spent
-        FROM assets a
-        WHERE a.business = %s AND a.inventory_type = %s
-    """
-    if search:
-        query += (
-            " AND (CAST(id AS TEXT) ILIKE %s OR name ILIKE %s OR brand ILIKE %s OR model ILIKE %s "
-            "OR specifications ILIKE %s OR series_number ILIKE %s OR location ILIKE %s OR shop_link ILIKE %s)"
-        )
-        like = f"%{search}%"
-        params.extend([like, like, like, like, like, like, like, like])
-    if type_filter:
-        query += " AND type = %s"
-        params.append(type_filter)
-    query += " ORDER BY name ASC"
-    cur.execute(query, params)
-    rows = cur.fetchall()
-    conn.close()
-    return rows
+            ) acq
+            {relevance_join}
+            WHERE a.business = %s AND a.inventory_type = %s{filter_sql}{keyset_sql}
+            ORDER BY {sort_sql} {direction}, a.id {direction}
+        """
+        params: list[object] = [*rank_params, business, inventory_type, *filter_params, *keyset_params]
+        if limit is not None:
+            query += " LIMIT %s"
+            params.append(limit)
+        cur.execute(query, params)
+        rows = cur.fetchall()
+        return rows
 
 
-def list_asset_statuses(asset_id: int) -> list[dict]:
-    conn = connect()
-    cur = conn.cursor()
-    cur.execute(
-        """
-        SELECT id, status, quantity
-        FROM asset_statuses
-        WHERE asset_id = %s
-        ORDER BY status ASC
-        """,
-        (asset_id,),
-    )
-    rows = cur.fetchall()
-    conn.close()
-    return rows
+def count_assets(business: str, inventory_type: str, search: str | None = None, type_filter: str | None = None) -> dict:
+    with get_conn() as conn:
+        cur = conn.cursor()
+        filter_sql, filter_params = _asset_filters(search, type_filter)
+        cur.execute(
+            f"""
+            SELECT COUNT(*) as total_items, COALESCE(SUM(a.quantity), 0) as total_qty
+            FROM assets a
+            WHERE a.business = %s AND a.inventory_type = %s{filter_sql}
+            """,
+            [business, inventory_type, *filter_params],
+        )
+        return cur.fetchone()
 
 
-def list_asset_statuses_report(business: str, inventory_type: str) -> list[dict]:
-    conn = connect()
-    cur = conn.cursor()
-    cur.execute(
+def get_asset(asset_id: int, fresh: bool = False) -> dict | None:
+    return _cached_row(
+        "asset",
+        asset_id,
         """
-        SELECT a.id as asset_id, a.name, a.type, s.status, s.quantity
+        SELECT
+            a.id, a.picture_path, a.name, a.brand, a.model, a.specifications, a.series_number,
+            a.acquisition_date, a.acquisition_cost, a.delivery_cost, a.quantity, a.location,
+            a.status, a.business, a.shop_link, a.type, a.inventory_type,
+            acq.latest_acquisition_date,
+            COALESCE(acq.total_acquired_qty, 0) as total_acquired_qty,
+            COALESCE(acq.total_spent, 0) as total_spent
         FROM assets a
-        JOIN asset_statuses s ON s.asset_id = a.id
-        WHERE a.business = %s AND a.inventory_type = %s
-        ORDER BY a.type ASC, a.name ASC, s.status ASC
+        CROSS JOIN LATERAL (
+            SELECT
+                MAX(acquisition_date) as latest_acquisition_date,
+                SUM(quantity) as total_acquired_qty,
+                SUM(acquisition_cost * quantity) as total_spent
+            FROM asset_acquisitions aa
+            WHERE aa.asset_id = a.id
+        ) acq
+        WHERE a.id = %s
         """,
-        (business, inventory_type),
+        fresh,
     )
-    rows = cur.fetchall()
-    conn.close()
-    return rows
+
+
+def list_asset_statuses(asset_id: int) -> list[dict]:
+    with get_conn() as conn:
+        cur = conn.cursor()
+        cur.execute(
+            """
+            SELECT id, status, quantity
+            FROM asset_statuses
+            WHERE asset_id = %s
+            ORDER BY status ASC
+            """,
+            (asset_id,),
+        )
+        rows = cur.fetchall()
+        return rows
+
+
+def list_asset_statuses_report(business: str, inventory_type: str) -> list[Record]:
+    with get_conn() as conn:
+        cur = conn.cursor(cursor_factory=psycopg2.extensions.cursor)
+        cur.execute(
+            """
+            SELECT a.id as asset_id, a.name, a.type, s.status, s.quantity
+            FROM assets a
+            JOIN asset_statuses s ON s.asset_id = a.id
+            WHERE a.business = %s AND a.inventory_type = %s
+            ORDER BY a.type ASC, a.name ASC, s.status ASC
+            """,
+            (business, inventory_type),
+        )
+        return fetch_records(cur)
 
 
 def add_asset_status(asset_id: int, status: str, quantity: float) -> None:
-    conn = connect()
-    cur = conn.cursor()
-    cur.execute(
-        "INSERT INTO asset_statuses (asset_id, status, quantity) VALUES (%s, %s, %s)",
-        (asset_id, status, quantity),
-    )
-    conn.commit()
-    conn.close()
+    with get_conn() as conn:
+        cur = conn.cursor()
+        cur.execute(
+            "INSERT INTO asset_statuses (asset_id, status, quantity) VALUES (%s, %s, %s)",
+            (asset_id, status, quantity),
+        )
+        conn.commit()
 
 
 def delete_asset_status(status_id: int) -> None:
-    conn = connect()
-    cur = conn.cursor()
-    cur.execute("DELETE FROM asset_statuses WHERE id=%s", (status_id,))
-    conn.commit()
-    conn.close()
+    with get_conn() as conn:
+        cur = conn.cursor()
+        cur.execute("DELETE FROM asset_statuses WHERE id=%s", (status_id,))
+        conn.commit()
 
 
 def list_asset_acquisitions(asset_id: int) -> list[dict]:
-    conn = connect()
-    cur = conn.cursor()
-    cur.execute(
-        """
-        SELECT id, acquisition_date, acquisition_cost, delivery_cost, quantity, shop_link
-        FROM asset_acquisitions
-        WHERE asset_id = %s
-        ORDER BY acquisition_date DESC, id DESC
-        """,
-        (asset_id,),
-    )
-    rows = cur.fetchall()
-    conn.close()
-    return rows
+    with get_conn() as conn:
+        cur = conn.cursor()
+        cur.execute(
+            """
+            SELECT id, acquisition_date, acquisition_cost, delivery_cost, quantity, shop_link
+            FROM asset_acquisitions
+            WHERE asset_id = %s
+            ORDER BY acquisition_date DESC, id DESC
+            """,
+            (asset_id,),
+        )
+        rows = cur.fetchall()
+        return rows
 
 
 def add_asset_acquisition(
@@ -780,17 +1188,17 @@ def add_asset_acquisition(
     quantity: float,
     shop_link: str | None,
 ) -> None:
-    conn = connect()
-    cur = conn.cursor()
-    cur.execute(
-        """
-        INSERT INTO asset_acquisitions (asset_id, acquisition_date, acquisition_cost, delivery_cost, quantity, shop_link)
-        VALUES (%s, %s, %s, %s, %s, %s)
-        """,
-        (asset_id, acquisition_date, acquisition_cost, delivery_cost, quantity, shop_link),
-    )
-    conn.commit()
-    conn.close()
+    with get_conn() as conn:
+        cur = conn.cursor()
+        cur.execute(
+            """
+            INSERT INTO asset_acquisitions (asset_id, acquisition_date, acquisition_cost, delivery_cost, quantity, shop_link)
+            VALUES (%s, %s, %s, %s, %s, %s)
+            """,
+            (asset_id, acquisition_date, acquisition_cost, delivery_cost, quantity, shop_link),
+        )
+        conn.commit()
+    _forget_row("asset", asset_id)
 
 
 def update_asset_acquisition(
@@ -801,36 +1209,39 @@ def update_asset_acquisition(
     quantity: float,
     shop_link: str | None,
 ) -> None:
-    conn = connect()
-    cur = conn.cursor()
-    cur.execute(
-        """
-        UPDATE asset_acquisitions
-        SET acquisition_date=%s, acquisition_cost=%s, delivery_cost=%s, quantity=%s, shop_link=%s
-        WHERE id=%s
-        """,
-        (acquisition_date, acquisition_cost, delivery_cost, quantity, shop_link, acquisition_id),
-    )
-    conn.commit()
-    conn.close()
+    with get_conn() as conn:
+        cur = conn.cursor()
+        cur.execute(
+            """
+            UPDATE asset_acquisitions
+            SET acquisition_date=%s, acquisition_cost=%s, delivery_cost=%s, quantity=%s, shop_link=%s
+            WHERE id=%s
+            RETURNING asset_id
+            """,
+            (acquisition_date, acquisition_cost, delivery_cost, quantity, shop_link, acquisition_id),
+        )
+        row = cur.fetchone()
+        conn.commit()
+    if row:
+        _forget_row("asset", row["asset_id"])
 
 
 def delete_asset_acquisition(acquisition_id: int) -> None:
-    conn = connect()
-    cur = conn.cursor()
-    cur.execute("DELETE FROM asset_acquisitions WHERE id=%s", (acquisition_id,))
-    conn.commit()
-    conn.close()
+    with get_conn() as conn:
+        cur = conn.cursor()
+        cur.execute("DELETE FROM asset_acquisitions WHERE id=%s RETURNING asset_id", (acquisition_id,))
+        row = cur.fetchone()
+        conn.commit()
+    if row:
+        _forget_row("asset", row["asset_id"])
 
 
-def list_asset_acquisitions_report(
+def _asset_acquisitions_report_query(
     business: str,
     inventory_type: str,
     start_date: str | None = None,
     end_date: str | None = None,
-) -> list[dict]:
-    conn = connect()
-    cur = conn.cursor()
+) -> tuple[str, list[object]]:
     params: list[object] = [business, inventory_type]
     query = """
         SELECT
@@ -850,10 +1261,25 @@ def list_asset_acquisitions_report(
         query += " AND aa.acquisition_date BETWEEN %s AND %s"
         params.extend([start_date, end_date])
     query += " ORDER BY a.type ASC, a.name ASC, aa.acquisition_date DESC, aa.id DESC"
-    cur.execute(query, params)
-    rows = cur.fetchall()
-    conn.close()
-    return rows
+    return query, params
+
+
+def list_asset_acquisitions_report(
+    business: str,
+    inventory_type: str,
+    start_date: str | None = None,
+    end_date: str | None = None,
+) -> list[Record]:
+    return _fetch_report(*_asset_acquisitions_report_query(business, inventory_type, start_date, end_date))
+
+
+def iter_asset_acquisitions_report(
+    business: str,
+    inventory_type: str,
+    start_date: str | None = None,
+    end_date: str | None = None,
+) -> Iterator[Record]:
+    return _stream_report(*_asset_acquisitions_report_query(business, inventory_type, start_date, end_date))
 
 
 def add_asset(
@@ -870,40 +1296,39 @@ def add_asset(
     type_: str,
     inventory_type: str,
 ) -> int:
-    conn = connect()
-    cur = conn.cursor()
-    cur.execute(
-        """
-        INSERT INTO assets (
-            picture_path, name, brand, model, specifications, series_number, acquisition_date,
-            acquisition_cost, delivery_cost, quantity, location, status,
-            business, shop_link, type, inventory_type
-        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-        RETURNING id
-        """,
-        (
-            picture_path,
-            name,
-            brand,
-            model,
-            specifications,
-            series_number,
-            None,
-            None,
-            None,
-            quantity,
-            location,
-            status,
-            business,
-            None,
-            type_,
-            inventory_type,
-        ),
-    )
-    asset_id = cur.fetchone()["id"]
-    conn.commit()
-    conn.close()
-    return asset_id
+    with get_conn() as conn:
+        cur = conn.cursor()
+        cur.execute(
+            """
+            INSERT INTO assets (
+                picture_path, name, brand, model, specifications, series_number, acquisition_date,
+                acquisition_cost, delivery_cost, quantity, location, status,
+                business, shop_link, type, inventory_type
+            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+            RETURNING id
+            """,
+            (
+                picture_path,
+                name,
+                brand,
+                model,
+                specifications,
+                series_number,
+                None,
+                None,
+                None,
+                quantity,
+                location,
+                status,
+                business,
+                None,
+                type_,
+                inventory_type,
+            ),
+        )
+        asset_id = cur.fetchone()["id"]
+        conn.commit()
+        return asset_id
 
 
 def update_asset(
@@ -919,133 +1344,134 @@ def update_asset(
     status: str | None,
     type_: str,
 ) -> None:
-    conn = connect()
-    cur = conn.cursor()
-    cur.execute(
-        """
-        UPDATE assets
-        SET picture_path=%s, name=%s, brand=%s, model=%s, specifications=%s, series_number=%s,
-            quantity=%s, location=%s, status=%s, type=%s
-        WHERE id=%s
-        """,
-        (
-            picture_path,
-            name,
-            brand,
-            model,
-            specifications,
-            series_number,
-            quantity,
-            location,
-            status,
-            type_,
-            asset_id,
-        ),
-    )
-    conn.commit()
-    conn.close()
+    with get_conn() as conn:
+        cur = conn.cursor()
+        cur.execute(
+            """
+            UPDATE assets
+            SET picture_path=%s, name=%s, brand=%s, model=%s, specifications=%s, series_number=%s,
+                quantity=%s, location=%s, status=%s, type=%s
+            WHERE id=%s
+            """,
+            (
+                picture_path,
+                name,
+                brand,
+                model,
+                specifications,
+                series_number,
+                quantity,
+                location,
+                status,
+                type_,
+                asset_id,
+            ),
+        )
+        conn.commit()
+    _forget_row("asset", asset_id)
 
 
 def duplicate_asset(asset_id: int) -> int:
-    conn = connect()
-    cur = conn.cursor()
-    cur.execute("SELECT * FROM assets WHERE id = %s", (asset_id,))
-    row = cur.fetchone()
-    if not row:
-        conn.close()
-        return 0
-    new_name = f"{row.get('name') or ''} (copy)".strip()
-    cur.execute(
-        """
-        INSERT INTO assets (
-            picture_path, name, brand, model, specifications, series_number, acquisition_date,
-            acquisition_cost, delivery_cost, quantity, location, status,
-            business, shop_link, type, inventory_type
-        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-        RETURNING id
-        """,
-        (
-            row.get("picture_path"),
-            new_name,
-            row.get("brand"),
-            row.get("model"),
-            row.get("specifications"),
-            row.get("series_number"),
-            None,
-            None,
-            None,
-            row.get("quantity"),
-            row.get("location"),
-            row.get("status"),
-            row.get("business"),
-            None,
-            row.get("type"),
-            row.get("inventory_type"),
-        ),
-    )
-    new_id = cur.fetchone()["id"]
+    with get_conn() as conn:
+        cur = conn.cursor()
+        cur.execute("SELECT * FROM assets WHERE id = %s", (asset_id,))
+        row = cur.fetchone()
+        if not row:
+            return 0
+        new_name = f"{row.get('name') or ''} (copy)".strip()
+        cur.execute(
+            """
+            INSERT INTO assets (
+                picture_path, name, brand, model, specifications, series_number, acquisition_date,
+                acquisition_cost, delivery_cost, quantity, location, status,
+                business, shop_link, type, inventory_type
+            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+            RETURNING id
+            """,
+            (
+                row.get("picture_path"),
+                new_name,
+                row.get("brand"),
+                row.get("model"),
+                row.get("specifications"),
+                row.get("series_number"),
+                None,
+                None,
+                None,
+                row.get("quantity"),
+                row.get("location"),
+                row.get("status"),
+                row.get("business"),
+                None,
+                row.get("type"),
+                row.get("inventory_type"),
+            ),
+        )
+        new_id = cur.fetchone()["id"]
 
-    conn.commit()
-    conn.close()
-    return new_id
+        conn.commit()
+        return new_id
 
 
 def delete_asset(asset_id: int) -> None:
-    conn = connect()
-    cur = conn.cursor()
-    cur.execute("DELETE FROM assets WHERE id=%s", (asset_id,))
-    conn.commit()
-    conn.close()
+    with get_conn() as conn:
+        cur = conn.cursor()
+        cur.execute("DELETE FROM assets WHERE id=%s", (asset_id,))
+        conn.commit()
+    _forget_row("asset", asset_id)
 
 
 def get_assets_summary(business: str, inventory_type: str) -> list[dict]:
-    conn = connect()
-    cur = conn.cursor()
-    cur.execute(
-        """
-        SELECT MIN(picture_path) as picture_path, name, type, status, SUM(quantity) as total_quantity
-        FROM assets
-        WHERE business = %s AND inventory_type = %s
-        GROUP BY name, type, status
-        ORDER BY name ASC
-        """,
-        (business, inventory_type),
-    )
-    rows = cur.fetchall()
-    conn.close()
-    return rows
+    with get_conn() as conn:
+        cur = conn.cursor()
+        cur.execute(
+            """
+            SELECT MIN(picture_path) as picture_path, name, type, status, SUM(quantity) as total_quantity
+            FROM assets
+            WHERE business = %s AND inventory_type = %s
+            GROUP BY name, type, status
+            ORDER BY name ASC
+            """,
+            (business, inventory_type),
+        )
+        rows = cur.fetchall()
+        return rows
 
 
 def get_assets_summary_range(business: str, inventory_type: str, start_date: str, end_date: str) -> list[dict]:
-    conn = connect()
-    cur = conn.cursor()
-    cur.execute(
-        """
-        SELECT MIN(picture_path) as picture_path, name, type, status, SUM(quantity) as total_quantity
-        FROM assets
-        WHERE business = %s AND inventory_type = %s AND acquisition_date BETWEEN %s AND %s
-        GROUP BY name, type, status
-        ORDER BY name ASC
-        """,
-        (business, inventory_type, start_date, end_date),
-    )
-    rows = cur.fetchall()
-    conn.close()
-    return rows
+    with get_conn() as conn:
+        cur = conn.cursor()
+        cur.execute(
+            """
+            SELECT MIN(picture_path) as picture_path, name, type, status, SUM(quantity) as total_quantity
+            FROM assets
+            WHERE business = %s AND inventory_type = %s AND acquisition_date BETWEEN %s AND %s
+            GROUP BY name, type, status
+            ORDER BY name ASC
+            """,
+            (business, inventory_type, start_date, end_date),
+        )
+        rows = cur.fetchall()
+        return rows
 
 
-def list_assets_for_export(
+def _assets_for_export_query(
     business: str,
     inventory_type: str,
     start_date: str | None = None,
     end_date: str | None = None,
-) -> list[dict]:
-    conn = connect()
-    cur = conn.cursor()
-    cur.execute(
-        """
+) -> tuple[str, list[object]]:
+    query = """
         SELECT
-            a.*,
+            a.id,
+            a.name,
+            a.type,
+            a.brand,
+            a.model,
+            a.specifications,
+            a.quantity,
+            a.location,
+            a.picture_path,
             COALESCE(
                 (
                     SELECT SUM(acquisition_cost * quantity)
@@ -1057,21 +1483,39 @@ def list_assets_for_export(
         FROM assets a
         WHERE a.business = %s AND a.inventory_type = %s
         ORDER BY a.type ASC, a.name ASC, a.id ASC
+    """
+    return query, [business, inventory_type]
+
+
+def list_assets_for_export(
+    business: str,
+    inventory_type: str,
+    start_date: str | None = None,
+    end_date: str | None = None,
+) -> list[Record]:
+    return _fetch_report(*_assets_for_export_query(business, inventory_type, start_date, end_date))
+
+
+def list_airbnb_inspection_items(rooms: Sequence[str], areas: Sequence[str] = ()) -> list[Record]:
+    # Checklist lines for the given rooms, ordered by room (as listed), area
+    # (as listed, unknown areas last) and item name.
+    return _fetch_report(
+        """
+        SELECT a.model as room, a.brand, a.name, a.quantity
+        FROM assets a
+        WHERE a.business = 'Airbnb' AND a.inventory_type = 'Airbnb' AND a.model = ANY(%s)
+        ORDER BY array_position(%s::text[], a.model), array_position(%s::text[], a.brand) NULLS LAST,
+            lower(a.name), a.id
         """,
-        (business, inventory_type),
+        [list(rooms), list(rooms), list(areas)],
     )
-    rows = cur.fetchall()
-    conn.close()
-    return rows
 
 
-def list_expiry_dates_report(
+def _expiry_dates_report_query(
     business: str,
     start_date: str | None = None,
     end_date: str | None = None,
-) -> list[dict]:
-    conn = connect()
-    cur = conn.cursor()
+) -> tuple[str, list[object]]:
     params: list[object] = [business]
     query = """
         SELECT p.id as product_id, p.name, i.delivery_date, b.expiry_date, b.quantity
@@ -1084,19 +1528,30 @@ def list_expiry_dates_report(
         query += " AND b.expiry_date BETWEEN %s AND %s"
         params.extend([start_date, end_date])
     query += " ORDER BY p.name ASC, b.expiry_date ASC NULLS LAST, i.delivery_date DESC"
-    cur.execute(query, params)
-    rows = cur.fetchall()
-    conn.close()
-    return rows
+    return query, params
 
 
-def list_in_logs_report(
+def list_expiry_dates_report(
     business: str,
     start_date: str | None = None,
     end_date: str | None = None,
-) -> list[dict]:
-    conn = connect()
-    cur = conn.cursor()
+) -> list[Record]:
+    return _fetch_report(*_expiry_dates_report_query(business, start_date, end_date))
+
+
+def iter_expiry_dates_report(
+    business: str,
+    start_date: str | None = None,
+    end_date: str | None = None,
+) -> Iterator[Record]:
+    return _stream_report(*_expiry_dates_report_query(business, start_date, end_date))
+
+
+def _in_logs_report_query(
+    business: str,
+    start_date: str | None = None,
+    end_date: str | None = None,
+) -> tuple[str, list[object]]:
     params: list[object] = [business]
     query = """
         SELECT p.id as product_id, p.name, i.delivery_date, i.quantity
@@ -1108,19 +1563,30 @@ def list_in_logs_report(
         query += " AND i.delivery_date BETWEEN %s AND %s"
         params.extend([start_date, end_date])
     query += " ORDER BY p.name ASC, i.delivery_date DESC, i.id DESC"
-    cur.execute(query, params)
-    rows = cur.fetchall()
-    conn.close()
-    return rows
+    return query, params
 
 
-def list_out_logs_report(
+def list_in_logs_report(
     business: str,
     start_date: str | None = None,
     end_date: str | None = None,
-) -> list[dict]:
-    conn = connect()
-    cur = conn.cursor()
+) -> list[Record]:
+    return _fetch_report(*_in_logs_report_query(business, start_date, end_date))
+
+
+def iter_in_logs_report(
+    business: str,
+    start_date: str | None = None,
+    end_date: str | None = None,
+) -> Iterator[Record]:
+    return _stream_report(*_in_logs_report_query(business, start_date, end_date))
+
+
+def _out_logs_report_query(
+    business: str,
+    start_date: str | None = None,
+    end_date: str | None = None,
+) -> tuple[str, list[object]]:
     params: list[object] = [business]
     query = """
         SELECT p.id as product_id, p.name, o.out_date, o.out_time, o.quantity
@@ -1132,7 +1598,657 @@ def list_out_logs_report(
         query += " AND o.out_date BETWEEN %s AND %s"
         params.extend([start_date, end_date])
     query += " ORDER BY p.name ASC, o.out_date DESC, o.id DESC"
-    cur.execute(query, params)
-    rows = cur.fetchall()
-    conn.close()
-    return rows
+    return query, params
+
+
+def list_out_logs_report(
+    business: str,
+    start_date: str | None = None,
+    end_date: str | None = None,
+) -> list[Record]:
+    return _fetch_report(*_out_logs_report_query(business, start_date, end_date))
+
+
+def iter_out_logs_report(
+    business: str,
+    start_date: str | None = None,
+    end_date: str | None = None,
+) -> Iterator[Record]:
+    return _stream_report(*_out_logs_report_query(business, start_date, end_date))
+
+
+_COPY_REPORTS = {
+    "expiry_dates": _expiry_dates_report_query,
+    "in_logs": _in_logs_report_query,
+    "out_logs": _out_logs_report_query,
+    "asset_acquisitions": _asset_acquisitions_report_query,
+}
+
+
+def copy_report_csv(out: IO[bytes], report: str, *args: object) -> None:
+    # Streams a raw report as UTF-8 CSV, with the query's column names as the
+    # header row, straight from COPY into out without building rows in Python.
+    query, params = _COPY_REPORTS[report](*args)
+    with get_conn() as conn:
+        cur = conn.cursor()
+        cur.execute("SET LOCAL client_encoding TO 'UTF8'")
+        select = cur.mogrify(query, params)
+        cur.copy_expert(b"COPY (" + select + b") TO STDOUT WITH CSV HEADER", out, size=1 << 16)
+
+
+def _insights_query(
+    business: str, inventory_type: str, today: date, perishable_business: str | None
+) -> tuple[str, dict[str, object]]:
+    # Every InsightsWindow figure in one statement and one row. The
+    # perishable CTEs match nothing unless perishable_business is given.
+    query = """
+        WITH asset_totals AS (
+            SELECT COUNT(*) as asset_items, COALESCE(SUM(a.quantity), 0) as asset_qty
+            FROM assets a
+            WHERE a.business = %(business)s AND a.inventory_type = %(inventory_type)s
+        ),
+        acquisition_totals AS (
+            SELECT
+                COUNT(*) as acquisition_entries,
+                COALESCE(SUM(aa.quantity), 0) as acquisition_qty,
+                COALESCE(SUM(aa.acquisition_cost * aa.quantity), 0) as total_spent,
+                MAX(aa.acquisition_date) - MIN(aa.acquisition_date) as acquisition_span_days
+            FROM asset_acquisitions aa
+            JOIN assets a ON a.id = aa.asset_id
+            WHERE a.business = %(business)s AND a.inventory_type = %(inventory_type)s
+        ),
+        status_totals AS (
+            SELECT json_object_agg(t.status, t.quantity ORDER BY t.status) as statuses
+            FROM (
+                SELECT COALESCE(NULLIF(s.status, ''), 'Unknown') as status, SUM(s.quantity) as quantity
+                FROM asset_statuses s
+                JOIN assets a ON a.id = s.asset_id
+                WHERE a.business = %(business)s AND a.inventory_type = %(inventory_type)s
+                GROUP BY 1
+            ) t
+        ),
+        product_totals AS (
+            SELECT COUNT(*) as perishable_products
+            FROM products p
+            WHERE p.business = %(perishable_business)s
+        ),
+        expiry_totals AS (
+            SELECT
+                COUNT(*) as expiry_entries,
+                COUNT(*) FILTER (WHERE b.expiry_date < %(today)s::date) as expired_entries,
+                COUNT(*) FILTER (
+                    WHERE b.expiry_date BETWEEN %(today)s::date AND %(today)s::date + 7
+                ) as expiring_entries
+            FROM perishable_in_breakdown b
+            JOIN perishable_in i ON i.id = b.in_id
+            JOIN products p ON p.id = i.product_id
+            WHERE p.business = %(perishable_business)s
+        ),
+        in_totals AS (
+            SELECT COUNT(*) as in_logs, COALESCE(SUM(i.quantity), 0) as in_qty
+            FROM perishable_in i
+            JOIN products p ON p.id = i.product_id
+            WHERE p.business = %(perishable_business)s
+        ),
+        out_totals AS (
+            SELECT COUNT(*) as out_logs, COALESCE(SUM(o.quantity), 0) as out_qty
+            FROM perishable_out o
+            JOIN products p ON p.id = o.product_id
+            WHERE p.business = %(perishable_business)s
+        )
+        SELECT *
+        FROM asset_totals, acquisition_totals, status_totals, product_totals, expiry_totals, in_totals, out_totals
+        """
+    params = {
+        "business": business,
+        "inventory_type": inventory_type,
+        "perishable_business": perishable_business,
+        "today": today,
+    }
+    return query, params
+
+
+def get_insights(business: str, inventory_type: str, today: date, perishable_business: str | None = None) -> dict:
+    with get_conn() as conn:
+        cur = conn.cursor()
+        cur.execute(*_insights_query(business, inventory_type, today, perishable_business))
+        return cur.fetchone()
+
+
+def get_insights_snapshot(
+    business: str, inventory_type: str, today: date, perishable_business: str | None = None
+) -> tuple[dict, datetime]:
+    # A primary-key read while the stored snapshot is current (no writes
+    # since, computed today). Otherwise it is recomputed and stored in the
+    # same statement; the store only applies if no write bumped the version
+    # meanwhile, so a concurrent write leaves it stale for the next read.
+    # Returns the figures and when they were computed.
+    with get_conn() as conn:
+        cur = conn.cursor()
+        cur.execute(
+            """
+            SELECT data, as_of, computed_at, stale, version
+            FROM insights_snapshot
+            WHERE business = %s AND inventory_type = %s AND perishable_business = %s
+            """,
+            (business, inventory_type, perishable_business or ""),
+        )
+        snapshot = cur.fetchone()
+        if snapshot and not snapshot["stale"] and snapshot["as_of"] == today and snapshot["data"] is not None:
+            return snapshot["data"], snapshot["computed_at"]
+        query, params = _insights_query(business, inventory_type, today, perishable_business)
+        params["version"] = snapshot["version"] if snapshot else 0
+        params["snapshot_perishable"] = perishable_business or ""
+        cur.execute(
+            f"""
+            WITH fresh AS (
+                SELECT to_jsonb(t) as data, LOCALTIMESTAMP as computed_at FROM ({query}) t
+            ),
+            stored AS (
+                INSERT INTO insights_snapshot (
+                    business, inventory_type, perishable_business, data, as_of, computed_at, stale, version
+                )
+                SELECT
+                    %(business)s, %(inventory_type)s, %(snapshot_perishable)s,
+                    fresh.data, %(today)s, fresh.computed_at, FALSE, %(version)s
+                FROM fresh
+                ON CONFLICT (business, inventory_type, perishable_business) DO UPDATE
+                SET data = EXCLUDED.data, as_of = EXCLUDED.as_of, computed_at = EXCLUDED.computed_at, stale = FALSE
+                WHERE insights_snapshot.version = EXCLUDED.version
+                RETURNING 1
+            )
+            SELECT data, computed_at FROM fresh
+            """,
+            params,
+        )
+        fresh = cur.fetchone()
+        conn.commit()
+        return fresh["data"], fresh["computed_at"]
+
+
+def benchmark_search(term: str, repeat: int = 5) -> list[tuple[str, float, float, int]]:
+    # Median milliseconds of the former ILIKE chain against search.py, per table.
+    legacy = {
+        "products": (
+            "SELECT id FROM products p WHERE CAST(p.id AS TEXT) ILIKE %s OR p.name ILIKE %s"
+            " OR p.category ILIKE %s OR p.unit ILIKE %s",
+            4,
+        ),
+        "assets": (
+            "SELECT id FROM assets a WHERE CAST(a.id AS TEXT) ILIKE %s OR a.name ILIKE %s OR a.brand ILIKE %s"
+            " OR a.model ILIKE %s OR a.specifications ILIKE %s OR a.series_number ILIKE %s"
+            " OR a.location ILIKE %s OR a.shop_link ILIKE %s",
+            8,
+        ),
+    }
+    results = []
+    with get_conn() as conn:
+        cur = conn.cursor()
+
+        def _median_ms(query: str, params: Sequence[object]) -> tuple[float, int]:
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                cur.execute(query, params)
+                count = len(cur.fetchall())
+                timings.append((time.perf_counter() - started) * 1000)
+            timings.sort()
+            return timings[len(timings) // 2], count
+
+        for table, (legacy_sql, placeholders) in legacy.items():
+            alias = table[0]
+            legacy_ms, _ = _median_ms(legacy_sql, [f"%{term}%"] * placeholders)
+            where_sql, where_params = search_clause(alias, term)
+            indexed_ms, matches = _median_ms(f"SELECT id FROM {table} {alias} WHERE TRUE{where_sql}", where_params)
+            results.append((table, legacy_ms, indexed_ms, matches))
+    return results
+
+
+def _median_ms(fn: Callable[[], object], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return timings[len(timings) // 2]
+
+
+def benchmark_insights(business: str, repeat: int = 3) -> tuple[float, float, int]:
+    # Median milliseconds of the former seven full fetches behind the
+    # Insights window against get_insights, plus the IN/OUT/expiry log rows.
+    inventory_type = {"Unica": "Unica Non-Perishable", "Airbnb": "Airbnb"}.get(business, "HDN Warehouse")
+    perishable_business = business if business == "Unica" else None
+
+    def _legacy() -> None:
+        list_assets(business, inventory_type)
+        list_asset_acquisitions_report(business, inventory_type)
+        list_asset_statuses_report(business, inventory_type)
+        if perishable_business:
+            list_products(perishable_business)
+            list_expiry_dates_report(perishable_business)
+            list_in_logs_report(perishable_business)
+            list_out_logs_report(perishable_business)
+
+    legacy_ms = _median_ms(_legacy, repeat)
+    single_ms = _median_ms(lambda: get_insights(business, inventory_type, date.today(), perishable_business), repeat)
+    totals = get_insights(business, inventory_type, date.today(), perishable_business)
+    log_rows = int(totals["in_logs"] + totals["out_logs"] + totals["expiry_entries"])
+    return legacy_ms, single_ms, log_rows
+
+
+def benchmark_pool(business: str = "Unica", repeat: int = 20, page_size: int = 200) -> tuple[float, float]:
+    # Median milliseconds of one Perishable tab refresh (first page plus the
+    # totals) with a fresh connection per call, as db.py did before the pool
+    # (config re-read included), against the warm pool.
+    global _pool
+
+    def _refresh() -> None:
+        get_perishable_stock(business, limit=page_size)
+        count_perishable_stock(business)
+
+    close_pool()
+    with _pool_lock:
+        # min_size 0 and a negative max_idle: every released connection is closed.
+        _pool = ConnectionPool(lambda: connect(), min_size=0, max_idle=-1.0)
+    try:
+        per_call_ms = _median_ms(_refresh, repeat)
+    finally:
+        close_pool()
+    _refresh()
+    pooled_ms = _median_ms(_refresh, repeat)
+    return per_call_ms, pooled_ms
+
+
+# Synthetic benchmark data lives under its own business name and is deleted
+# (cascading to its ledgers) when the benchmark ends.
+BENCHMARK_BUSINESS = "Benchmark"
+
+# get_perishable_stock before the set-based rewrite: five correlated
+# subqueries per product. Kept for the parity check and timing below.
+_LEGACY_PERISHABLE_STOCK_SQL = """
+    SELECT
+        p.id,
+        COALESCE((SELECT SUM(quantity) FROM perishable_in i WHERE i.product_id = p.id), 0) as in_qty,
+        COALESCE((SELECT SUM(quantity) FROM perishable_out o WHERE o.product_id = p.id), 0) as out_qty,
+        (
+            SELECT MIN(b.expiry_date)
+            FROM perishable_in_breakdown b
+            JOIN perishable_in i ON i.id = b.in_id
+            WHERE i.product_id = p.id AND b.expiry_date IS NOT NULL
+        ) as next_expiry,
+        COALESCE(
+            (
+                SELECT SUM(b.quantity)
+                FROM perishable_in_breakdown b
+                JOIN perishable_in i ON i.id = b.in_id
+                WHERE i.product_id = p.id AND b.expiry_date IS NOT NULL AND b.expiry_date <= CURRENT_DATE + 3
+            ),
+            0
+        ) as expiring_3_qty,
+        COALESCE(
+            (
+                SELECT SUM(b.quantity)
+                FROM perishable_in_breakdown b
+                JOIN perishable_in i ON i.id = b.in_id
+                WHERE i.product_id = p.id AND b.expiry_date IS NOT NULL AND b.expiry_date <= CURRENT_DATE + 7
+            ),
+            0
+        ) as expiring_7_qty
+    FROM products p
+    WHERE p.business = %s
+    ORDER BY p.name ASC, p.id ASC
+"""
+
+
+def _seed_benchmark_ledger(cur, products: int, log_rows: int) -> None:
+    # products synthetic products, log_rows IN/OUT rows (half each) spread
+    # over three years, and one expiry breakdown per IN row. Written with
+    # plain SQL, so the balances and rollups are rebuilt afterwards.
+    cur.execute(
+        """
+        INSERT INTO products (name, category, unit, opening_stock, low_stock_level, business)
+        SELECT 'Product ' || lpad(n::text, 7, '0'), 'Category ' || (n %% 25), 'unit', 0, 0, %s
+        FROM generate_series(1, %s) n
+        """,
+        (BENCHMARK_BUSINESS, products),
+    )
+    for table, date_column, extra_column, extra_value in (
+        ("perishable_in", "delivery_date", "expiry_date", "NULL::date"),
+        ("perishable_out", "out_date", "out_time", "'08:00'"),
+    ):
+        cur.execute(
+            f"""
+            WITH scope AS (SELECT array_agg(id) as ids FROM products WHERE business = %s)
+            INSERT INTO {table} (product_id, {date_column}, {extra_column}, quantity)
+            SELECT scope.ids[1 + n %% cardinality(scope.ids)], CURRENT_DATE - (n %% 1095), {extra_value}, 1 + n %% 40
+            FROM scope, generate_series(1, %s) n
+            """,
+            (BENCHMARK_BUSINESS, log_rows // 2),
+        )
+    cur.execute(
+        """
+        INSERT INTO perishable_in_breakdown (in_id, expiry_date, quantity)
+        SELECT i.id, i.delivery_date + 3 + i.id %% 30, i.quantity
+        FROM perishable_in i
+        JOIN products p ON p.id = i.product_id
+        WHERE p.business = %s
+        """,
+        (BENCHMARK_BUSINESS,),
+    )
+    _rebuild_stock_balances(cur)
+    _rebuild_perishable_rollups(cur)
+    cur.execute("ANALYZE")
+
+
+def _drop_benchmark_data() -> None:
+    with get_conn() as conn:
+        cur = conn.cursor()
+        cur.execute("DELETE FROM products WHERE business = %s", (BENCHMARK_BUSINESS,))
+        conn.commit()
+
+
+def benchmark_perishable_stock(
+    business: str, repeat: int = 3, synthetic: tuple[int, int] | None = None
+) -> tuple[float, float, int, list[int]]:
+    # Median milliseconds of the former correlated-subquery stock query
+    # against get_perishable_stock for the whole business, the number of
+    # products, and the ids whose totals or expiry figures differ between
+    # the two. synthetic=(products, log_rows) benchmarks generated data under
+    # BENCHMARK_BUSINESS instead; run it on a copy of the database.
+    if synthetic is not None:
+        business = BENCHMARK_BUSINESS
+        _drop_benchmark_data()
+        with get_conn() as conn:
+            _seed_benchmark_ledger(conn.cursor(), *synthetic)
+            conn.commit()
+    try:
+        with get_conn() as conn:
+            cur = conn.cursor()
+
+            def _legacy() -> list[dict]:
+                cur.execute(_LEGACY_PERISHABLE_STOCK_SQL, (business,))
+                return cur.fetchall()
+
+            legacy_ms = _median_ms(_legacy, repeat)
+            legacy = {row["id"]: row for row in _legacy()}
+        current_ms = _median_ms(lambda: get_perishable_stock(business), repeat)
+        current = {row["id"]: row for row in get_perishable_stock(business)}
+    finally:
+        if synthetic is not None:
+            _drop_benchmark_data()
+    fields = ("in_qty", "out_qty", "next_expiry", "expiring_3_qty", "expiring_7_qty")
+    mismatches = [
+        product_id
+        for product_id in sorted(legacy.keys() | current.keys())
+        if product_id not in legacy
+        or product_id not in current
+        or any(legacy[product_id][field] != current[product_id][field] for field in fields)
+    ]
+    return legacy_ms, current_ms, len(current), mismatches
+
+
+def benchmark_batch_writes(
+    sizes: Sequence[int] = (1_000, 100_000), single_rows: int = 500
+) -> list[tuple[str, int, float]]:
+    # Rows per second for record_in_batch (one expiry breakdown per row) and
+    # record_out_batch at each size, and for single_rows one-at-a-time
+    # record_in calls, against products under BENCHMARK_BUSINESS that are
+    # deleted afterwards. Returns (writer, rows, rows/s).
+    _drop_benchmark_data()
+    with get_conn() as conn:
+        cur = conn.cursor()
+        cur.execute(
+            """
+            INSERT INTO products (name, category, unit, opening_stock, low_stock_level, business)
+            SELECT 'Product ' || lpad(n::text, 4, '0'), 'Category', 'unit', 0, 0, %s
+            FROM generate_series(1, 200) n
+            RETURNING id
+            """,
+            (BENCHMARK_BUSINESS,),
+        )
+        product_ids = [row["id"] for row in cur.fetchall()]
+        conn.commit()
+    today = date.today()
+    results = []
+
+    def _rate(label: str, count: int, write: Callable[[], object]) -> None:
+        started = time.perf_counter()
+        write()
+        results.append((label, count, count / max(time.perf_counter() - started, 1e-9)))
+
+    try:
+        entries = [
+            {"product_id": product_ids[n % len(product_ids)], "date": today - timedelta(days=n % 365), "quantity": 1}
+            for n in range(single_rows)
+        ]
+        _rate(
+            "record_in (one call per row)",
+            single_rows,
+            lambda: [record_in(e["product_id"], e["date"], e["quantity"]) for e in entries],
+        )
+        for size in sizes:
+            entries = [
+                {
+                    "product_id": product_ids[n % len(product_ids)],
+                    "date": today - timedelta(days=n % 365),
+                    "time": "08:00",
+                    "quantity": 1 + n % 5,
+                    "expiries": [(today + timedelta(days=7), 1 + n % 5)],
+                }
+                for n in range(size)
+            ]
+            _rate("record_in_batch", size, lambda: record_in_batch(entries))
+            _rate("record_out_batch", size, lambda: record_out_batch(entries))
+    finally:
+        _drop_benchmark_data()
+    return results
+
+
+def benchmark_startup(repeat: int = 5) -> tuple[float, float]:
+    # Median milliseconds from a closed pool to the schema being ready: the
+    # warm-start init_db (one version query) against the full pass every
+    # start used to make (all migration steps and the seed, rolled back).
+    init_db()
+
+    def _warm() -> None:
+        close_pool()
+        init_db()
+
+    def _full_pass() -> None:
+        close_pool()
+        with get_conn() as conn:
+            cur = conn.cursor()
+            for _version, _name, migrate in MIGRATIONS:
+                migrate(cur)
+            _seed_defaults(cur)
+            conn.rollback()
+
+    warm_ms = _median_ms(_warm, repeat)
+    full_ms = _median_ms(_full_pass, repeat)
+    return warm_ms, full_ms
+
+
+def _plan_indexes(plan: dict) -> set[str]:
+    names = {plan["Index Name"]} if "Index Name" in plan else set()
+    for child in plan.get("Plans", ()):
+        names |= _plan_indexes(child)
+    return names
+
+
+def check_report_indexes(
+    business: str = "Unica", inventory_type: str = "Unica Non-Perishable"
+) -> list[tuple[str, bool, list[str]]]:
+    # EXPLAINs the report and lookup queries with sequential scans disabled,
+    # so a small table cannot hide a missing index, and checks that each plan
+    # reads through one of the indexes added for it. Returns
+    # (check, passed, indexes used) per query.
+    end = date.today().isoformat()
+    start = date.today().replace(day=1).isoformat()
+    checks = [
+        (
+            "IN log report",
+            _in_logs_report_query(business, start, end),
+            {"perishable_in_product_date_idx", "perishable_in_delivery_date_idx"},
+        ),
+        (
+            "OUT log report",
+            _out_logs_report_query(business, start, end),
+            {"perishable_out_product_date_idx", "perishable_out_out_date_idx"},
+        ),
+        (
+            "Expiry date report",
+            _expiry_dates_report_query(business, start, end),
+            {"perishable_in_breakdown_in_id_idx", "perishable_in_breakdown_expiry_date_idx"},
+        ),
+        (
+            "Acquisition report",
+            _asset_acquisitions_report_query(business, inventory_type, start, end),
+            {"asset_acquisitions_asset_date_idx", "asset_acquisitions_date_idx"},
+        ),
+        (
+            "Product IN log",
+            (
+                "SELECT id, delivery_date, quantity FROM perishable_in"
+                " WHERE product_id = %s ORDER BY delivery_date DESC",
+                [0],
+            ),
+            {"perishable_in_product_date_idx"},
+        ),
+        (
+            "Product expiry breakdown",
+            ("SELECT expiry_date, quantity FROM perishable_in_breakdown WHERE in_id = %s", [0]),
+            {"perishable_in_breakdown_in_id_idx"},
+        ),
+        (
+            "Asset statuses",
+            ("SELECT status, quantity FROM asset_statuses WHERE asset_id = %s", [0]),
+            {"asset_statuses_asset_id_idx"},
+        ),
+        (
+            "Products by business",
+            ("SELECT id, name FROM products WHERE business = %s ORDER BY name", [business]),
+            {"products_business_name_idx", "products_business_name_id_idx"},
+        ),
+        (
+            "Assets by inventory",
+            ("SELECT id FROM assets WHERE business = %s AND inventory_type = %s", [business, inventory_type]),
+            {
+                "assets_business_inventory_type_idx",
+                "assets_listing_id_idx",
+                "assets_listing_lower_name_idx",
+                "assets_listing_quantity_idx",
+            },
+        ),
+    ]
+    results = []
+    with get_conn() as conn:
+        cur = conn.cursor()
+        cur.execute("SET LOCAL enable_seqscan = off")
+        for name, (query, params), expected in checks:
+            cur.execute("EXPLAIN (FORMAT JSON) " + query, params)
+            used = _plan_indexes(cur.fetchone()["QUERY PLAN"][0]["Plan"])
+            results.append((name, bool(used & expected), sorted(used)))
+    return results
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Aman Inventory database maintenance")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("migrate", help="Apply pending schema migrations and print the schema version")
+    sub.add_parser("reconcile-stock", help="Rebuild stock balances from the IN/OUT ledgers and report drift")
+    sub.add_parser("rebuild-rollups", help="Rebuild the daily/monthly IN/OUT rollups from the ledgers")
+    bench = sub.add_parser("search-benchmark", help="Time the indexed tab search against the old ILIKE chain")
+    bench.add_argument("term")
+    bench.add_argument("--repeat", type=int, default=5)
+    insights_bench = sub.add_parser(
+        "insights-benchmark", help="Time the single-query Insights load against the former per-report fetches"
+    )
+    insights_bench.add_argument("business", choices=BUSINESSES)
+    insights_bench.add_argument("--repeat", type=int, default=3)
+    pool_bench = sub.add_parser(
+        "pool-benchmark", help="Time a Perishable tab refresh with a connection per call against the pool"
+    )
+    pool_bench.add_argument("--repeat", type=int, default=20)
+    stock_bench = sub.add_parser(
+        "stock-benchmark",
+        help="Check get_perishable_stock against the former correlated-subquery query and time both",
+    )
+    stock_bench.add_argument("business", nargs="?", default="Unica", choices=BUSINESSES)
+    stock_bench.add_argument("--repeat", type=int, default=3)
+    stock_bench.add_argument(
+        "--synthetic", action="store_true", help="Use generated data (run on a copy of the database)"
+    )
+    stock_bench.add_argument("--products", type=int, default=10_000)
+    stock_bench.add_argument("--log-rows", type=int, default=5_000_000)
+    sub.add_parser("index-check", help="EXPLAIN the report queries and check they use their indexes")
+    startup_bench = sub.add_parser(
+        "startup-benchmark", help="Time a warm-start init_db against the full migration and seed pass"
+    )
+    startup_bench.add_argument("--repeat", type=int, default=5)
+    batch_bench = sub.add_parser(
+        "batch-benchmark", help="Measure batch IN/OUT write throughput (run on a copy of the database)"
+    )
+    batch_bench.add_argument("--sizes", type=int, nargs="+", default=[1_000, 100_000])
+    args = parser.parse_args(argv)
+    failed = False
+
+    if args.command == "migrate":
+        with get_conn() as conn:
+            applied = apply_migrations(conn, seed=_seed_defaults)
+            version = current_version(conn)
+        if applied:
+            print(f"Applied migrations: {', '.join(str(v) for v in applied)}")
+        print(f"Schema version: {version}")
+    if args.command == "reconcile-stock":
+        drift = rebuild_stock_balances()
+        for row in drift:
+            print(
+                f"{row['product_id']} {row['name']}: "
+                f"in {row['stored_in_qty']} -> {row['in_qty']}, out {row['stored_out_qty']} -> {row['out_qty']}"
+            )
+        print(f"{len(drift)} product(s) had drifted balances.")
+    if args.command == "rebuild-rollups":
+        drift = rebuild_perishable_rollups()
+        print(f"Rollups rebuilt; {drift} product-day total(s) had drifted.")
+    if args.command == "search-benchmark":
+        for table, legacy_ms, indexed_ms, matches in benchmark_search(args.term, max(1, args.repeat)):
+            print(f"{table}: ILIKE {legacy_ms:.1f} ms, indexed {indexed_ms:.1f} ms ({matches} match(es))")
+    if args.command == "insights-benchmark":
+        legacy_ms, single_ms, log_rows = benchmark_insights(args.business, max(1, args.repeat))
+        print(
+            f"{args.business}: per-report fetches {legacy_ms:.1f} ms, single query {single_ms:.1f} ms"
+            f" ({log_rows} log rows)"
+        )
+    if args.command == "pool-benchmark":
+        per_call_ms, pooled_ms = benchmark_pool(repeat=max(1, args.repeat))
+        print(f"Perishable refresh: connection per call {per_call_ms:.1f} ms, pooled {pooled_ms:.1f} ms")
+    if args.command == "stock-benchmark":
+        synthetic = (args.products, args.log_rows) if args.synthetic else None
+        legacy_ms, current_ms, products, mismatches = benchmark_perishable_stock(
+            args.business, max(1, args.repeat), synthetic
+        )
+        print(f"{products:,} products: correlated subqueries {legacy_ms:.1f} ms, set-based {current_ms:.1f} ms")
+        if mismatches:
+            print(f"{len(mismatches)} product(s) differ: {', '.join(str(pid) for pid in mismatches[:20])}")
+        else:
+            print("Results match.")
+    if args.command == "index-check":
+        for name, passed, used in check_report_indexes():
+            print(f"{'ok' if passed else 'NO INDEX':<8} {name}: {', '.join(used) or 'sequential scan'}")
+            failed = failed or not passed
+    if args.command == "startup-benchmark":
+        warm_ms, full_ms = benchmark_startup(max(1, args.repeat))
+        print(f"Database startup: warm start {warm_ms:.1f} ms, full migration and seed pass {full_ms:.1f} ms")
+    if args.command == "batch-benchmark":
+        for writer, rows, rate in benchmark_batch_writes(args.sizes):
+            print(f"{writer:<30} {rows:>9,} rows  {rate:>10,.0f} rows/s")
+    close_pool()
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
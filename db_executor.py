@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import queue
+import threading
+import tkinter as tk
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable
+
+
+class DbExecutor:
+    # Runs blocking calls on worker threads and hands results back to the Tk
+    # main loop. Work is keyed: a newer submit for the same key supersedes the
+    # older one, whose result is dropped (or which never starts at all).
+
+    def __init__(self, root: tk.Misc, max_workers: int = 4, poll_ms: int = 25) -> None:
+        self.root = root
+        self.poll_ms = poll_ms
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="aman-db")
+        self._results: queue.Queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._latest: dict[str, int] = {}
+        self._futures: dict[str, Future] = {}
+        self._seq = 0
+        self._poll_after: str | None = None
+        self._closed = False
+
+    def submit(
+        self,
+        key: str,
+        fn: Callable[..., Any],
+        *args: Any,
+        on_done: Callable[[Any], None] | None = None,
+        on_error: Callable[[Exception], None] | None = None,
+        owner: tk.Misc | None = None,
+        **kwargs: Any,
+    ) -> None:
+        if self._closed:
+            return
+        with self._lock:
+            self._seq += 1
+            token = self._seq
+            previous = self._futures.get(key)
+            if previous is not None:
+                previous.cancel()
+            self._latest[key] = token
+            self._futures[key] = self._pool.submit(
+                self._run, key, token, fn, args, kwargs, on_done, on_error, owner
+            )
+        self._ensure_polling()
+
+    def cancel(self, key: str) -> None:
+        with self._lock:
+            self._latest.pop(key, None)
+            future = self._futures.pop(key, None)
+        if future is not None:
+            future.cancel()
+
+    def is_pending(self, key: str) -> bool:
+        with self._lock:
+            return key in self._latest
+
+    def shutdown(self) -> None:
+        self._closed = True
+        with self._lock:
+            self._latest.clear()
+            self._futures.clear()
+        if self._poll_after is not None:
+            try:
+                self.root.after_cancel(self._poll_after)
+            except tk.TclError:
+                pass
+            self._poll_after = None
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def _is_current(self, key: str, token: int) -> bool:
+        with self._lock:
+            return self._latest.get(key) == token
+
+    def _run(self, key, token, fn, args, kwargs, on_done, on_error, owner) -> None:
+        if not self._is_current(key, token):
+            return
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as exc:
+            self._results.put((key, token, on_error, exc, owner, True))
+            return
+        self._results.put((key, token, on_done, result, owner, False))
+
+    def _ensure_polling(self) -> None:
+        if self._poll_after is None and not self._closed:
+            self._poll_after = self.root.after(self.poll_ms, self._poll)
+
+    def _poll(self) -> None:
+        self._poll_after = None
+        while True:
+            try:
+                key, token, callback, value, owner, failed = self._results.get_nowait()
+            except queue.Empty:
+                break
+            with self._lock:
+                if self._latest.get(key) != token:
+                    continue
+                del self._latest[key]
+                self._futures.pop(key, None)
+            try:
+                if owner is not None and not owner.winfo_exists():
+                    continue
+            except tk.TclError:
+                continue
+            if callback is not None:
+                callback(value)
+            elif failed:
+                from tkinter import messagebox
+
+                messagebox.showerror("Database Error", str(value), parent=self.root)
+        with self._lock:
+            pending = bool(self._latest)
+        if pending:
+            self._ensure_polling()
+
+
+def get_db_executor(widget: tk.Misc) -> DbExecutor:
+    root = widget._root()
+    executor = getattr(root, "_db_executor", None)
+    if executor is None:
+        executor = DbExecutor(root)
+        root._db_executor = executor
+    return executor
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class ConnectionPool:
+    def __init__(
+        self,
+        factory: Callable[[], Any],
+        min_size: int = 1,
+        max_size: int = 5,
+        max_idle: float = 300.0,
+        check_after: float = 30.0,
+        timeout: float = 10.0,
+    ) -> None:
+        self._factory = factory
+        self.min_size = max(0, min_size)
+        self.max_size = max(1, max_size, self.min_size)
+        self.max_idle = max_idle
+        self.check_after = check_after
+        self.timeout = timeout
+        # Idle connections with the monotonic time they were last returned.
+        self._idle: list[tuple[Any, float]] = []
+        self._in_use = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        for _ in range(self.min_size):
+            self._idle.append((self._factory(), time.monotonic()))
+
+    def acquire(self) -> Any:
+        deadline = time.monotonic() + self.timeout
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Connection pool is closed.")
+                if self._idle:
+                    conn, last_used = self._idle.pop()
+                    break
+                if self._in_use < self.max_size:
+                    conn, last_used = None, 0.0
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PoolTimeout(f"No database connection available after {self.timeout:g}s.")
+                self._cond.wait(remaining)
+            self._in_use += 1
+        try:
+            if conn is not None and not self._is_healthy(conn, last_used):
+                self._discard(conn)
+                conn = None
+            if conn is None:
+                conn = self._factory()
+        except Exception:
+            with self._cond:
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+        return conn
+
+    def release(self, conn: Any) -> None:
+        reusable = not conn.closed
+        if reusable:
+            try:
+                # Never hand out a connection with an open transaction.
+                conn.rollback()
+            except Exception:
+                reusable = False
+        if not reusable:
+            self._discard(conn)
+        now = time.monotonic()
+        stale: list[Any] = []
+        with self._cond:
+            self._in_use -= 1
+            if reusable and not self._closed:
+                self._idle.append((conn, now))
+            elif reusable:
+                stale.append(conn)
+            # Recycle connections that sat idle too long, keeping min_size warm.
+            keep: list[tuple[Any, float]] = []
+            for idle_conn, last_used in self._idle:
+                if now - last_used > self.max_idle and len(keep) + self._in_use >= self.min_size:
+                    stale.append(idle_conn)
+                else:
+                    keep.append((idle_conn, last_used))
+            self._idle = keep
+            self._cond.notify()
+        for idle_conn in stale:
+            self._discard(idle_conn)
+
+    @contextmanager
+    def connection(self) -> Iterator[Any]:
+        conn = self.acquire()
+        try:
+            yield conn
+        except Exception:
+            try:
+                conn.rollback()
+            except Exception:
+                pass
+            raise
+        finally:
+            self.release(conn)
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            idle = [conn for conn, _ in self._idle]
+            self._idle = []
+            self._cond.notify_all()
+        for conn in idle:
+            self._discard(conn)
+
+    def _is_healthy(self, conn: Any, last_used: float) -> bool:
+        if conn.closed:
+            return False
+        idle_for = time.monotonic() - last_used
+        if idle_for > self.max_idle:
+            return False
+        if idle_for > self.check_after:
+            try:
+                cur = conn.cursor()
+                cur.execute("SELECT 1")
+                cur.fetchone()
+                conn.rollback()
+            except Exception:
+                return False
+        return True
+
+    @staticmethod
+    def _discard(conn: Any) -> None:
+        try:
+            conn.close()
+        except Exception:
+            pass
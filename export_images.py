@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import hashlib
+import io
+import os
+import re
+import shutil
+import tempfile
+import threading
+import zipfile
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Sequence
+
+try:
+    from PIL import Image  # type: ignore
+except Exception:
+    Image = None
+
+# Pictures embedded in exports are decoded and scaled down to the size they
+# are shown at, on a thread pool (Pillow releases the GIL while decoding and
+# resizing, and threads need no freeze_support in the frozen Windows build),
+# and the scaled bytes are cached by the source file's content hash so each
+# distinct picture is encoded once.
+
+# Below this many pictures a thread pool costs more than it saves.
+MIN_POOL_IMAGES = 8
+MAX_CACHED_IMAGES = 2048
+JPEG_QUALITY = 85
+
+_lock = threading.Lock()
+# (path, mtime_ns, size) -> content sha1, so repeat exports skip re-reading.
+_digests: OrderedDict[tuple, str] = OrderedDict()
+# (content sha1, height) -> (encoded bytes, width, height)
+_scaled: OrderedDict[tuple[str, int], tuple[bytes, int, int]] = OrderedDict()
+
+
+def _stat_key(path: str) -> tuple | None:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+
+
+def _scale(path: str, height: int) -> tuple[str, bytes, int, int] | None:
+    # Runs on a pool thread: returns (sha1, encoded bytes, width, height).
+    try:
+        with open(path, "rb") as f:
+            raw = f.read()
+        digest = hashlib.sha1(raw).hexdigest()
+        with Image.open(io.BytesIO(raw)) as src:
+            src.draft("RGB", (1, height))
+            img = src.copy()
+    except Exception:
+        return None
+    img.thumbnail((max(1, img.width * height // max(1, img.height)), height))
+    out = io.BytesIO()
+    if img.mode in ("RGBA", "LA", "P"):
+        img.save(out, format="PNG", optimize=True)
+    else:
+        img.convert("RGB").save(out, format="JPEG", quality=JPEG_QUALITY, optimize=True)
+    return digest, out.getvalue(), img.width, img.height
+
+
+def _remember(stat_key: tuple, digest: str, height: int, entry: tuple[bytes, int, int]) -> None:
+    # Both maps are LRU-bounded so a long session does not grow them forever.
+    for cache, key, value in ((_digests, stat_key, digest), (_scaled, (digest, height), entry)):
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > MAX_CACHED_IMAGES:
+            cache.popitem(last=False)
+
+
+def scaled_images(
+    paths: Sequence[str | None], height: int, max_workers: int | None = None
+) -> list[tuple[str, bytes, int, int] | None]:
+    # One (sha1, bytes, width, height) per path, None where a picture is
+    # missing or unreadable. Identical files share the same entry.
+    if Image is None:
+        return [None] * len(paths)
+    results: dict[str, tuple[str, bytes, int, int] | None] = {}
+    pending: dict[str, tuple] = {}
+    with _lock:
+        for path in dict.fromkeys(p for p in paths if p):
+            stat_key = _stat_key(path)
+            if stat_key is None:
+                results[path] = None
+                continue
+            digest = _digests.get(stat_key)
+            entry = _scaled.get((digest, height)) if digest else None
+            if entry is not None:
+                _digests.move_to_end(stat_key)
+                _scaled.move_to_end((digest, height))
+                results[path] = (digest, *entry)
+            else:
+                pending[path] = stat_key
+    if pending:
+        todo = list(pending)
+        if len(todo) >= MIN_POOL_IMAGES:
+            with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                scaled = list(pool.map(_scale, todo, [height] * len(todo)))
+        else:
+            scaled = [_scale(path, height) for path in todo]
+        with _lock:
+            for path, result in zip(todo, scaled):
+                if result is None:
+                    results[path] = None
+                    continue
+                digest, data, width, img_height = result
+                # Different files with the same content share one entry.
+                entry = _scaled.get((digest, height)) or (data, width, img_height)
+                _remember(pending[path], digest, height, entry)
+                results[path] = (digest, *entry)
+    return [results.get(path) if path else None for path in paths]
+
+
+def clear() -> None:
+    with _lock:
+        _digests.clear()
+        _scaled.clear()
+
+
+_MEDIA_TARGET_RE = re.compile(r'Target="(/?xl/media/[^"]+|\.\./media/[^"]+)"')
+
+
+def dedupe_xlsx_media(path: str) -> int:
+    # openpyxl writes one media part per add_image call, even for the same
+    # picture. Rewrite the package so identical media are stored once and
+    # every drawing points at that copy. Returns the number of parts dropped.
+    with zipfile.ZipFile(path) as src:
+        canonical: dict[str, str] = {}
+        by_hash: dict[str, str] = {}
+        for info in src.infolist():
+            if info.filename.startswith("xl/media/"):
+                digest = hashlib.sha1(src.read(info)).hexdigest()
+                canonical[info.filename] = by_hash.setdefault(digest, info.filename)
+        dropped = {name for name, keep in canonical.items() if name != keep}
+        if not dropped:
+            return 0
+
+        def _retarget(match: re.Match) -> str:
+            prefix, _sep, name = match.group(1).rpartition("/")
+            keep = canonical.get(f"xl/media/{name}", f"xl/media/{name}")
+            return f'Target="{prefix}/{keep.rpartition("/")[2]}"'
+
+        fd, tmp_path = tempfile.mkstemp(suffix=".xlsx", dir=os.path.dirname(os.path.abspath(path)))
+        os.close(fd)
+        try:
+            with zipfile.ZipFile(tmp_path, "w", zipfile.ZIP_DEFLATED) as dst:
+                for info in src.infolist():
+                    if info.filename in dropped:
+                        continue
+                    if info.filename.startswith("xl/drawings/_rels/"):
+                        xml = src.read(info).decode("utf-8")
+                        dst.writestr(info, _MEDIA_TARGET_RE.sub(_retarget, xml))
+                    else:
+                        with src.open(info) as data, dst.open(info, "w") as out:
+                            shutil.copyfileobj(data, out, 1 << 20)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+    os.replace(tmp_path, path)
+    return len(dropped)
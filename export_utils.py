@@ -1,16 +1,49 @@
 from __future__ import annotations
 
 import csv
+import gzip
+import io
+import itertools
+import os
+from collections import OrderedDict
 from datetime import date, datetime
-from typing import Iterable, Sequence
+from typing import IO, Callable, Iterable, Sequence
 
+from export_images import dedupe_xlsx_media, scaled_images
 
-def export_to_csv(path: str, columns: Sequence[str], rows: Iterable[Sequence[object]]) -> None:
-    with open(path, "w", newline="", encoding="utf-8") as f:
+
+# Speed over ratio: level 1 keeps gzip from becoming the bottleneck.
+GZIP_LEVEL = 1
+
+
+def export_to_csv(
+    path: str,
+    columns: Sequence[str],
+    rows: Iterable[Sequence[object]],
+    header_lines: Sequence[str] | None = None,
+) -> None:
+    if path.lower().endswith(".gz"):
+        f = gzip.open(path, "wt", newline="", encoding="utf-8", compresslevel=GZIP_LEVEL)
+    else:
+        f = open(path, "w", newline="", encoding="utf-8")
+    with f:
         writer = csv.writer(f)
+        if header_lines:
+            for line in header_lines:
+                writer.writerow([line])
+            writer.writerow([])
         writer.writerow(columns)
-        for row in rows:
-            writer.writerow(row)
+        writer.writerows(rows)
+
+
+def export_copy_csv(path: str, copy_rows: Callable[[IO[bytes]], None], compress: bool | None = None) -> None:
+    # copy_rows writes the whole CSV, header included (e.g. PostgreSQL
+    # COPY ... WITH CSV HEADER), straight into the file. Gzipped when
+    # compress is set, or by default when the path ends in .gz.
+    if compress is None:
+        compress = path.lower().endswith(".gz")
+    with (gzip.open(path, "wb", compresslevel=GZIP_LEVEL) if compress else open(path, "wb")) as f:
+        copy_rows(f)
 
 
 def export_to_excel(
@@ -22,57 +55,14 @@ def export_to_excel(
     header_lines: Sequence[str] | None = None,
     image_column: int = 0,
 ) -> None:
+    # rows may be a one-shot iterator (streamed reports), so it is consumed
+    # exactly once whichever writer is used.
     try:
         import openpyxl  # type: ignore
         from openpyxl.drawing.image import Image as XLImage  # type: ignore
         from openpyxl.utils import get_column_letter  # type: ignore
+        from openpyxl.cell import WriteOnlyCell  # type: ignore
         from openpyxl.styles import Font  # type: ignore
-
-        wb = openpyxl.Workbook()
-        ws = wb.active
-        ws.title = "Report"
-        columns_out = list(columns)
-        if image_paths is not None:
-            columns_out.insert(max(0, min(image_column, len(columns_out))), "Picture")
-        header_offset = 0
-        if header_lines:
-            for line in header_lines:
-                ws.append([line])
-            for row_idx in range(1, len(header_lines) + 1):
-                ws.cell(row=row_idx, column=1).font = Font(bold=True)
-            header_offset = len(header_lines)
-        ws.append(columns_out)
-        row_values = list(rows)
-        for row in row_values:
-            if image_paths is not None:
-                row_out = list(row)
-                row_out.insert(max(0, min(image_column, len(row_out))), "")
-                ws.append(row_out)
-            else:
-                ws.append(list(row))
-        for i in range(1, len(columns_out) + 1):
-            ws.column_dimensions[get_column_letter(i)].width = 18
-        if image_paths is not None:
-            photo_col = max(0, min(image_column, len(columns_out) - 1))
-            photo_letter = get_column_letter(photo_col + 1)
-            ws.column_dimensions[photo_letter].width = 16
-            for idx, img_path in enumerate(image_paths, start=2 + header_offset):
-                if not img_path:
-                    continue
-                try:
-                    xl_img = XLImage(img_path)
-                    if xl_img.height:
-                        scale = image_height / xl_img.height
-                        xl_img.height = image_height
-                        xl_img.width = int(xl_img.width * scale)
-                    else:
-                        xl_img.height = image_height
-                        xl_img.width = image_height
-                    ws.add_image(xl_img, f"{photo_letter}{idx}")
-                    ws.row_dimensions[idx].height = image_height + 6
-                except Exception:
-                    continue
-        wb.save(path)
     except Exception:
         # Fallback to CSV if openpyxl is not installed
         csv_path = path.replace(".xlsx", ".csv")
@@ -86,58 +76,419 @@ def export_to_excel(
                 columns_out = list(columns)
                 columns_out.insert(max(0, min(image_column, len(columns_out))), "Picture")
                 writer.writerow(columns_out)
-                row_values = list(rows)
-                for idx, row in enumerate(row_values):
+                for idx, row in enumerate(rows):
                     img_path = image_paths[idx] if idx < len(image_paths) else ""
                     row_out = list(row)
                     row_out.insert(max(0, min(image_column, len(row_out))), img_path or "")
                     writer.writerow(row_out)
             else:
                 writer.writerow(list(columns))
-                for row in rows:
-                    writer.writerow(list(row))
+                writer.writerows(rows)
+        return
+
+    # write_only streams rows to a temp file as they are appended, so memory
+    # stays flat however many rows the report has. Column widths and each
+    # row's height have to be set before that row is written.
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet("Report")
+    columns_out = list(columns)
+    if image_paths is not None:
+        columns_out.insert(max(0, min(image_column, len(columns_out))), "Picture")
+    for i in range(1, len(columns_out) + 1):
+        ws.column_dimensions[get_column_letter(i)].width = 18
+    bold = Font(bold=True)
+    header_offset = 0
+    if header_lines:
+        for line in header_lines:
+            cell = WriteOnlyCell(ws, value=line)
+            cell.font = bold
+            ws.append([cell])
+        header_offset = len(header_lines)
+    ws.append(columns_out)
+    if image_paths is None:
+        for row in rows:
+            ws.append(row)
+        wb.save(path)
+        return
+
+    photo_col = max(0, min(image_column, len(columns_out) - 1))
+    photo_letter = get_column_letter(photo_col + 1)
+    ws.column_dimensions[photo_letter].width = 16
+    # Pictures are embedded pre-scaled to image_height, and identical ones
+    # are collapsed to a single media part after saving.
+    scaled = scaled_images(image_paths, image_height)
+    for idx, row in enumerate(rows):
+        row_out = list(row)
+        row_out.insert(max(0, min(image_column, len(row_out))), "")
+        picture = scaled[idx] if idx < len(scaled) else None
+        if picture is not None:
+            row_idx = idx + 2 + header_offset
+            _digest, data, width, height = picture
+            try:
+                xl_img = XLImage(io.BytesIO(data))
+                xl_img.height = image_height
+                xl_img.width = max(1, width * image_height // max(1, height))
+                ws.add_image(xl_img, f"{photo_letter}{row_idx}")
+                ws.row_dimensions[row_idx].height = image_height + 6
+            except Exception:
+                pass
+        ws.append(row_out)
+    wb.save(path)
+    dedupe_xlsx_media(path)
+
+
+def _benchmark_excel(counts: Sequence[int] = (100_000, 1_000_000)) -> None:
+    # Time and peak memory of export_to_excel against the previous in-memory
+    # Workbook writer, on rows shaped like the OUT log report.
+    import tempfile
+    import time
+    import tracemalloc
+
+    import openpyxl  # type: ignore
+
+    def _rows(count: int) -> Iterable[tuple]:
+        start = date(2024, 1, 1).toordinal()
+        for n in range(count):
+            yield (n + 1, n % 500, f"Product {n % 500}", date.fromordinal(start + n % 365), "08:30", n % 49 + 1)
+
+    def _in_memory(path: str, columns: Sequence[str], rows: Iterable[Sequence[object]]) -> None:
+        wb = openpyxl.Workbook()
+        ws = wb.active
+        ws.append(list(columns))
+        for row in rows:
+            ws.append(row)
+        wb.save(path)
 
+    columns = ["No.", "Product Id", "Product", "Out Date", "Out Time", "Quantity"]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.xlsx")
+        for count in counts:
+            for label, write in (
+                ("in-memory", lambda: _in_memory(path, columns, _rows(count))),
+                ("write_only", lambda: export_to_excel(path, columns, _rows(count), header_lines=["Benchmark"])),
+            ):
+                tracemalloc.start()
+                started = time.perf_counter()
+                write()
+                elapsed = time.perf_counter() - started
+                _size, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                print(
+                    f"{count:>9,} rows  {label:<10}  {elapsed:7.1f}s  {count / elapsed:9,.0f} rows/s"
+                    f"  peak {peak / 1024 / 1024:7.1f} MiB"
+                )
+
+
+def _benchmark_excel_images(photo_dir: str | None = None, count: int = 2_000) -> None:
+    # Workbook size and time for `count` picture rows: full-resolution
+    # pictures per row (the previous behaviour) against the scaled, deduped
+    # pipeline. Uses the photos in photo_dir, or generated 12 MP JPEGs.
+    import tempfile
+    import time
+
+    import openpyxl  # type: ignore
+    from openpyxl.drawing.image import Image as XLImage  # type: ignore
+    from PIL import Image  # type: ignore
+
+    def _full_size(path: str, columns: Sequence[str], rows: list[tuple], images: list[str]) -> None:
+        wb = openpyxl.Workbook(write_only=True)
+        ws = wb.create_sheet("Report")
+        ws.append(["Picture", *columns])
+        for idx, row in enumerate(rows, start=2):
+            xl_img = XLImage(images[idx - 2])
+            scale = 60 / xl_img.height
+            xl_img.height = 60
+            xl_img.width = int(xl_img.width * scale)
+            ws.add_image(xl_img, f"A{idx}")
+            ws.row_dimensions[idx].height = 66
+            ws.append(["", *row])
+        wb.save(path)
 
-def _simple_pdf(lines: Sequence[str]) -> bytes:
-    # Minimal PDF with one page and a single Helvetica font.
-    content = []
-    y = 800
-    for line in lines:
-        safe = line.replace("(", "[").replace(")", "]")
-        content.append(f"1 0 0 1 50 {y} Tm ({safe}) Tj")
-        y -= 14
-    stream = "\n".join(content)
-
-    objects = []
-    objects.append("1 0 obj << /Type /Catalog /Pages 2 0 R >> endobj")
-    objects.append("2 0 obj << /Type /Pages /Kids [3 0 R] /Count 1 >> endobj")
-    objects.append(
-        "3 0 obj << /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Resources << /Font << /F1 4 0 R >> >> /Contents 5 0 R >> endobj"
-    )
-    objects.append("4 0 obj << /Type /Font /Subtype /Type1 /BaseFont /Helvetica >> endobj")
-    objects.append(f"5 0 obj << /Length {len(stream.encode('utf-8'))} >> stream\n{stream}\nendstream endobj")
+    with tempfile.TemporaryDirectory() as tmp:
+        if photo_dir:
+            photos = [
+                os.path.join(photo_dir, name)
+                for name in sorted(os.listdir(photo_dir))
+                if name.lower().endswith((".jpg", ".jpeg", ".png"))
+            ]
+        else:
+            photos = []
+            for n in range(50):
+                photo = os.path.join(tmp, f"photo{n}.jpg")
+                Image.effect_noise((4032, 3024), 20 + n).convert("RGB").save(photo, quality=90)
+                photos.append(photo)
+        columns = ["Asset Id", "Name", "Quantity"]
+        rows = [(n + 1, f"Asset {n}", n % 7 + 1) for n in range(count)]
+        images = [photos[n % len(photos)] for n in range(count)]
+        for label, write in (
+            ("full size", lambda path: _full_size(path, columns, rows, images)),
+            ("scaled", lambda path: export_to_excel(path, columns, rows, image_paths=images, image_column=0)),
+        ):
+            path = os.path.join(tmp, f"{label.replace(' ', '_')}.xlsx")
+            started = time.perf_counter()
+            write(path)
+            elapsed = time.perf_counter() - started
+            print(
+                f"{count:,} picture rows ({len(photos)} distinct)  {label:<9}  {elapsed:6.1f}s"
+                f"  {os.path.getsize(path) / 1024 / 1024:8.1f} MiB"
+            )
+
+
+PDF_PAGE_SIZE = (612.0, 792.0)  # US Letter, points
+PDF_MARGIN = 40.0
+PDF_FONT_SIZE = 9
+PDF_ROW_HEIGHT = 14.0
+PDF_COLUMN_GAP = 6.0
+# Rows read ahead to size the columns before the first page is drawn.
+PDF_SAMPLE_ROWS = 200
+
+
+def _cell_text(value: object) -> str:
+    return "" if value is None else str(value)
+
+
+def _column_layout(
+    columns: Sequence[str],
+    sample: Sequence[Sequence[object]],
+    available: float,
+    measure: Callable[[str], float],
+    picture_index: int | None = None,
+    picture_width: float = 0.0,
+) -> list[tuple[float, float]]:
+    # (x offset, width) per output column, sized by the widest header or
+    # sampled value and shrunk proportionally to fit the page. The picture
+    # column, if any, has a fixed width.
+    wanted = []
+    for idx, name in enumerate(columns):
+        widest = max([measure(name)] + [measure(_cell_text(row[idx])) for row in sample if idx < len(row)])
+        wanted.append(max(widest, measure("0000")) + PDF_COLUMN_GAP)
+    text_space = available - (picture_width + PDF_COLUMN_GAP if picture_index is not None else 0)
+    scale = min(1.0, text_space / sum(wanted)) if wanted else 1.0
+    widths = [w * scale for w in wanted]
+    if picture_index is not None:
+        widths.insert(picture_index, picture_width + PDF_COLUMN_GAP)
+    layout = []
+    x = 0.0
+    for w in widths:
+        layout.append((x, w - PDF_COLUMN_GAP))
+        x += w
+    return layout
+
+
+def _fit_text(text: str, width: float, measure: Callable[[str], float]) -> str:
+    if measure(text) <= width:
+        return text
+    while text and measure(text + "...") > width:
+        text = text[: max(0, min(len(text) - 1, int(len(text) * width / max(1.0, measure(text)))))]
+    return text + "..." if text else ""
+
+
+def _pdf_text(text: str) -> bytes:
+    # Helvetica with WinAnsiEncoding; characters outside cp1252 become "?".
+    data = text.encode("cp1252", errors="replace")
+    return b"(" + data.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)") + b")"
+
+
+def _helvetica_width(text: str, size: float = PDF_FONT_SIZE) -> float:
+    # Rough Helvetica advance; only used to lay out the fallback writer.
+    return len(text) * size * 0.52
+
+
+class _PdfWriter:
+    # Dependency-free PDF writer: objects go to the file as soon as they are
+    # complete, so only byte offsets and page ids are kept in memory. Pages
+    # hold text in Helvetica/Helvetica-Bold and JPEG images, each distinct
+    # image written once as an XObject.
+
+    _CATALOG, _PAGES, _FONT, _FONT_BOLD = 1, 2, 3, 4
+
+    def __init__(self, f: IO[bytes], page_size: tuple[float, float] = PDF_PAGE_SIZE) -> None:
+        self._f = f
+        self._pos = 0
+        self._offsets: dict[int, int] = {}
+        self._next_id = 5
+        self._pages: list[int] = []
+        self._images: dict[str, tuple[str, int]] = {}
+        self.page_size = page_size
+        self._ops: list[bytes] = []
+        self._page_images: dict[str, int] = {}
+        self._write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    def _write(self, data: bytes) -> None:
+        self._f.write(data)
+        self._pos += len(data)
+
+    def _object(self, obj_id: int, body: bytes, stream: bytes | None = None) -> None:
+        self._offsets[obj_id] = self._pos
+        self._write(b"%d 0 obj\n" % obj_id + body)
+        if stream is not None:
+            self._write(b"\nstream\n" + stream + b"\nendstream")
+        self._write(b"\nendobj\n")
+
+    def _new_id(self) -> int:
+        obj_id = self._next_id
+        self._next_id += 1
+        return obj_id
+
+    def text(self, x: float, y: float, text: str, bold: bool = False, size: float = PDF_FONT_SIZE) -> None:
+        font = b"/F2" if bold else b"/F1"
+        self._ops.append(b"BT %s %g Tf 1 0 0 1 %.2f %.2f Tm %s Tj ET" % (font, size, x, y, _pdf_text(text)))
+
+    def line(self, x1: float, y1: float, x2: float, y2: float) -> None:
+        self._ops.append(b"0.5 w %.2f %.2f m %.2f %.2f l S" % (x1, y1, x2, y2))
+
+    def image(
+        self, key: str, jpeg: bytes, size: tuple[int, int], x: float, y: float, width: float, height: float
+    ) -> None:
+        entry = self._images.get(key)
+        if entry is None:
+            obj_id = self._new_id()
+            self._object(
+                obj_id,
+                b"<< /Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace /DeviceRGB"
+                b" /BitsPerComponent 8 /Filter /DCTDecode /Length %d >>" % (size[0], size[1], len(jpeg)),
+                jpeg,
+            )
+            entry = self._images[key] = (f"Im{len(self._images) + 1}", obj_id)
+        name, obj_id = entry
+        self._page_images[name] = obj_id
+        self._ops.append(b"q %.2f 0 0 %.2f %.2f %.2f cm /%s Do Q" % (width, height, x, y, name.encode("ascii")))
+
+    def end_page(self) -> None:
+        content = b"\n".join(self._ops)
+        content_id, page_id = self._new_id(), self._new_id()
+        self._object(content_id, b"<< /Length %d >>" % len(content), content)
+        xobjects = b"".join(
+            b"/%s %d 0 R " % (name.encode("ascii"), obj_id) for name, obj_id in self._page_images.items()
+        )
+        self._object(
+            page_id,
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %g %g] /Resources << /Font << /F1 %d 0 R /F2 %d 0 R >>"
+            b" /XObject << %s>> >> /Contents %d 0 R >>"
+            % (self._PAGES, self.page_size[0], self.page_size[1], self._FONT, self._FONT_BOLD, xobjects, content_id),
+        )
+        self._pages.append(page_id)
+        self._ops = []
+        self._page_images = {}
+
+    def close(self) -> None:
+        if self._ops or not self._pages:
+            self.end_page()
+        for font_id, base in ((self._FONT, b"Helvetica"), (self._FONT_BOLD, b"Helvetica-Bold")):
+            self._object(
+                font_id, b"<< /Type /Font /Subtype /Type1 /BaseFont /%s /Encoding /WinAnsiEncoding >>" % base
+            )
+        kids = b" ".join(b"%d 0 R" % page_id for page_id in self._pages)
+        self._object(self._PAGES, b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(self._pages)))
+        self._object(self._CATALOG, b"<< /Type /Catalog /Pages %d 0 R >>" % self._PAGES)
+        xref_start = self._pos
+        size = self._next_id
+        xref = [b"xref\n0 %d\n" % size, b"0000000000 65535 f \n"]
+        for obj_id in range(1, size):
+            xref.append(b"%010d 00000 n \n" % self._offsets[obj_id])
+        self._write(b"".join(xref))
+        self._write(
+            b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (size, self._CATALOG, xref_start)
+        )
 
-    xref_positions = []
-    pdf = ["%PDF-1.4"]
-    for obj in objects:
-        xref_positions.append(sum(len(p) + 1 for p in pdf))
-        pdf.append(obj)
-    xref_start = sum(len(p) + 1 for p in pdf)
 
-    xref = ["xref", f"0 {len(objects) + 1}", "0000000000 65535 f "]
-    for pos in xref_positions:
-        xref.append(f"{pos:010} 00000 n ")
+def _simple_pdf(lines: Sequence[str]) -> bytes:
+    return _simple_pdf_pages([lines])
+
+
+def _simple_pdf_pages(pages: Iterable[Sequence[str]]) -> bytes:
+    # Plain text lines in Helvetica. Each block starts on a new page and is
+    # continued onto as many pages as it needs.
+    out = io.BytesIO()
+    writer = _PdfWriter(out)
+    top = writer.page_size[1] - PDF_MARGIN
+    for lines in pages:
+        y = top
+        for line in lines:
+            if y < PDF_MARGIN:
+                writer.end_page()
+                y = top
+            writer.text(PDF_MARGIN, y, line, size=10)
+            y -= PDF_ROW_HEIGHT
+        writer.end_page()
+    writer.close()
+    return out.getvalue()
+
+
+def _write_pdf_table(
+    f: IO[bytes],
+    title: str,
+    columns: Sequence[str],
+    rows: Iterable[Sequence[object]],
+    image_paths: Sequence[str | None] | None,
+    pictures: Sequence[tuple[str, bytes, int, int] | None] | None,
+    image_height: int,
+    header_lines: Sequence[str] | None,
+    image_column: int,
+) -> None:
+    # Fallback table writer: same layout as the reportlab engine, streamed
+    # page by page through _PdfWriter.
+    writer = _PdfWriter(f)
+    page_width, page_height = writer.page_size
+    rows = iter(rows)
+    sample = list(itertools.islice(rows, PDF_SAMPLE_ROWS))
+    picture_index = max(0, min(image_column, len(columns))) if pictures is not None else None
+    picture_width = image_height * 4 / 3
+    columns_out = list(columns)
+    if picture_index is not None:
+        columns_out.insert(picture_index, "Picture")
+    layout = _column_layout(
+        columns, sample, page_width - 2 * PDF_MARGIN, _helvetica_width, picture_index, picture_width
+    )
+    row_height = max(PDF_ROW_HEIGHT, image_height + 6) if pictures is not None else PDF_ROW_HEIGHT
 
-    trailer = [
-        "trailer",
-        f"<< /Size {len(objects) + 1} /Root 1 0 R >>",
-        "startxref",
-        str(xref_start),
-        "%%EOF",
-    ]
+    def bold_width(text: str) -> float:
+        return _helvetica_width(text) * 1.1
 
-    full_pdf = "\n".join(pdf + xref + trailer)
-    return full_pdf.encode("utf-8")
+    def start_page(first: bool) -> float:
+        y = page_height - PDF_MARGIN
+        if first:
+            for line in header_lines or ():
+                writer.text(PDF_MARGIN, y, line, bold=True, size=12)
+                y -= 16
+            if header_lines:
+                y -= 8
+            writer.text(PDF_MARGIN, y, title, bold=True, size=14)
+            y -= 24
+        for (x, width), name in zip(layout, columns_out):
+            writer.text(PDF_MARGIN + x, y, _fit_text(name, width, bold_width), bold=True)
+        writer.line(PDF_MARGIN, y - 4, page_width - PDF_MARGIN, y - 4)
+        return y - PDF_ROW_HEIGHT - 2
+
+    page = 1
+    y = start_page(True)
+    for idx, row in enumerate(itertools.chain(sample, rows)):
+        if y - row_height + PDF_ROW_HEIGHT < PDF_MARGIN:
+            writer.text(page_width - PDF_MARGIN - 40, PDF_MARGIN / 2, f"Page {page}", size=8)
+            writer.end_page()
+            page += 1
+            y = start_page(False)
+        cells = [_cell_text(value) for value in row]
+        if picture_index is not None:
+            cells.insert(picture_index, "")
+            picture = pictures[idx] if idx < len(pictures) else None
+            if picture is not None:
+                digest, data, width, height = picture
+                x, box = layout[picture_index]
+                if data[:2] == b"\xff\xd8":
+                    scale = min(box / width, image_height / height)
+                    draw_y = y - image_height + 8
+                    writer.image(digest, data, (width, height), PDF_MARGIN + x, draw_y, width * scale, height * scale)
+                else:
+                    cells[picture_index] = "[image]"
+            elif idx < len(image_paths) and image_paths[idx]:
+                cells[picture_index] = "[image]"
+        for (x, width), text in zip(layout, cells):
+            if text:
+                writer.text(PDF_MARGIN + x, y, _fit_text(text, width, _helvetica_width))
+        y -= row_height
+    writer.text(page_width - PDF_MARGIN - 40, PDF_MARGIN / 2, f"Page {page}", size=8)
+    writer.close()
 
 
 def export_to_pdf(
@@ -150,75 +501,109 @@ def export_to_pdf(
     header_lines: Sequence[str] | None = None,
     image_column: int = 0,
 ) -> None:
+    # A paged table: columns sized from the first rows, the column header
+    # repeated on every page, and each distinct picture embedded once
+    # (pre-scaled, see export_images). rows are streamed.
+    # Pictures are scaled to twice the drawn height so they stay sharp.
+    pictures = scaled_images(image_paths, image_height * 2) if image_paths is not None else None
     try:
         from reportlab.lib.pagesizes import letter  # type: ignore
         from reportlab.lib.utils import ImageReader  # type: ignore
+        from reportlab.pdfbase.pdfmetrics import stringWidth  # type: ignore
         from reportlab.pdfgen import canvas  # type: ignore
-
-        c = canvas.Canvas(path, pagesize=letter)
-        width, height = letter
-        y = height - 50
-        if header_lines:
-            c.setFont("Helvetica-Bold", 12)
-            for line in header_lines:
-                c.drawString(50, y, line)
-                y -= 16
-            y -= 8
-        c.setFont("Helvetica-Bold", 14)
-        c.drawString(50, y, title)
-        y -= 24
-        c.setFont("Helvetica", 10)
-        columns_out = list(columns)
-        if image_paths is not None:
-            columns_out.insert(max(0, min(image_column, len(columns_out))), "Picture")
-        c.drawString(50, y, " | ".join(columns_out))
-        y -= 18
-
-        row_values = list(rows)
-        for idx, row in enumerate(row_values):
-            if image_paths is not None:
-                img_path = image_paths[idx] if idx < len(image_paths) else None
-                if img_path:
-                    try:
-                        img = ImageReader(img_path)
-                        c.drawImage(img, 50, y - image_height + 10, height=image_height, preserveAspectRatio=True, mask="auto")
-                    except Exception:
-                        pass
-                row_out = list(row)
-                row_out.insert(max(0, min(image_column, len(row_out))), "")
-                line = " | ".join(str(x) for x in row_out)
-                c.drawString(50 + image_height + 10, y, line[:1500])
-                y -= max(14, image_height + 6)
-            else:
-                line = " | ".join(str(x) for x in row)
-                c.drawString(50, y, line[:1500])
-                y -= 14
-            if y < 50:
-                c.showPage()
-                y = height - 50
-                c.setFont("Helvetica", 10)
-        c.save()
     except Exception:
-        lines = []
-        if header_lines:
-            lines.extend(list(header_lines))
-            lines.append("")
-        lines.extend([title, ""])
-        columns_out = list(columns)
-        if image_paths is not None:
-            columns_out.insert(max(0, min(image_column, len(columns_out))), "Picture")
-        lines.append(" | ".join(columns_out))
-        row_values = list(rows)
-        for idx, row in enumerate(row_values):
-            if image_paths is not None:
-                prefix = "[image]" if idx < len(image_paths) and image_paths[idx] else ""
-                row_out = list(row)
-                row_out.insert(max(0, min(image_column, len(row_out))), prefix)
-                lines.append(" | ".join(str(x) for x in row_out))
-            else:
-                lines.append(" | ".join(str(x) for x in row))
         with open(path, "wb") as f:
-            f.write(_simple_pdf(lines))
+            _write_pdf_table(f, title, columns, rows, image_paths, pictures, image_height, header_lines, image_column)
+        return
+
+    c = canvas.Canvas(path, pagesize=letter)
+    page_width, page_height = letter
+    rows = iter(rows)
+    sample = list(itertools.islice(rows, PDF_SAMPLE_ROWS))
+    picture_index = max(0, min(image_column, len(columns))) if pictures is not None else None
+    picture_width = image_height * 4 / 3
+    columns_out = list(columns)
+    if picture_index is not None:
+        columns_out.insert(picture_index, "Picture")
+
+    def measure(text: str) -> float:
+        return stringWidth(text, "Helvetica", PDF_FONT_SIZE)
+
+    def bold_measure(text: str) -> float:
+        return stringWidth(text, "Helvetica-Bold", PDF_FONT_SIZE)
+
+    layout = _column_layout(columns, sample, page_width - 2 * PDF_MARGIN, measure, picture_index, picture_width)
+    row_height = max(PDF_ROW_HEIGHT, image_height + 6) if pictures is not None else PDF_ROW_HEIGHT
+    # reportlab stores an image once per distinct content; keeping one
+    # reader per picture also avoids re-reading it for every row.
+    readers: dict[str, object] = {}
+
+    def start_page(first: bool) -> float:
+        y = page_height - PDF_MARGIN
+        if first:
+            c.setFont("Helvetica-Bold", 12)
+            for line in header_lines or ():
+                c.drawString(PDF_MARGIN, y, line)
+                y -= 16
+            if header_lines:
+                y -= 8
+            c.setFont("Helvetica-Bold", 14)
+            c.drawString(PDF_MARGIN, y, title)
+            y -= 24
+        c.setFont("Helvetica-Bold", PDF_FONT_SIZE)
+        for (x, width), name in zip(layout, columns_out):
+            c.drawString(PDF_MARGIN + x, y, _fit_text(name, width, bold_measure))
+        c.setLineWidth(0.5)
+        c.line(PDF_MARGIN, y - 4, page_width - PDF_MARGIN, y - 4)
+        c.setFont("Helvetica", PDF_FONT_SIZE)
+        return y - PDF_ROW_HEIGHT - 2
+
+    def end_page() -> None:
+        c.setFont("Helvetica", 8)
+        c.drawRightString(page_width - PDF_MARGIN, PDF_MARGIN / 2, f"Page {c.getPageNumber()}")
+
+    y = start_page(True)
+    for idx, row in enumerate(itertools.chain(sample, rows)):
+        if y - row_height + PDF_ROW_HEIGHT < PDF_MARGIN:
+            end_page()
+            c.showPage()
+            y = start_page(False)
+        cells = [_cell_text(value) for value in row]
+        if picture_index is not None:
+            cells.insert(picture_index, "")
+            picture = pictures[idx] if idx < len(pictures) else None
+            if picture is not None:
+                digest, data, width, height = picture
+                x, box = layout[picture_index]
+                try:
+                    reader = readers.get(digest)
+                    if reader is None:
+                        reader = readers[digest] = ImageReader(io.BytesIO(data))
+                    scale = min(box / width, image_height / height)
+                    c.drawImage(
+                        reader, PDF_MARGIN + x, y - image_height + 8, width * scale, height * scale, mask="auto"
+                    )
+                except Exception:
+                    pass
+        for (x, width), text in zip(layout, cells):
+            if text:
+                c.drawString(PDF_MARGIN + x, y, _fit_text(text, width, measure))
+        y -= row_height
+    end_page()
+    c.save()
+
+
+IMAGE_PAGE_WIDTH = 1200
+IMAGE_PAGE_HEIGHT = 1600
+# Decoded thumbnails kept while drawing image pages.
+IMAGE_THUMB_CACHE = 256
+
+
+def _image_page_paths(path: str, pages: int) -> list[str]:
+    if pages <= 1:
+        return [path]
+    stem, ext = os.path.splitext(path)
+    return [f"{stem}-{page:03d}{ext}" for page in range(1, pages + 1)]
 
 
 def export_to_jpg(
@@ -230,66 +615,125 @@ def export_to_jpg(
     image_height: int = 60,
     header_lines: Sequence[str] | None = None,
     image_column: int = 0,
-) -> None:
+) -> list[str]:
+    # Renders the report as fixed-size pages drawn one at a time, so memory
+    # does not grow with the row count. A .tif/.tiff path gets one
+    # multi-page TIFF; otherwise pages are saved as numbered files next to
+    # path (report-001.jpg, ...), or to path itself if one page is enough.
+    # Returns the files written.
     try:
         from PIL import Image, ImageDraw, ImageFont  # type: ignore
+    except Exception:
+        raise RuntimeError("JPG export requires Pillow. Install with: pip install pillow")
 
-        row_values = list(rows)
-        columns_out = list(columns)
-        if image_paths is not None:
-            columns_out.insert(max(0, min(image_column, len(columns_out))), "Picture")
-        width = 1200
-        line_height = max(20, image_height + 10) if image_paths is not None else 20
-        extra_lines = 0
-        if header_lines:
-            extra_lines = len(header_lines) + 1
-        height = max(200, (len(row_values) + 4 + extra_lines) * line_height)
-        img = Image.new("RGB", (width, height), "white")
-        draw = ImageDraw.Draw(img)
-        font = ImageFont.load_default()
-
-        y = 10
-        if header_lines:
-            for line in header_lines:
-                draw.text((10, y), line, fill="black", font=font)
+    font = ImageFont.load_default()
+
+    def measure(text: str) -> float:
+        return font.getlength(text)
+
+    rows = iter(rows)
+    sample = list(itertools.islice(rows, PDF_SAMPLE_ROWS))
+    pictures = scaled_images(image_paths, image_height) if image_paths is not None else None
+    picture_index = max(0, min(image_column, len(columns))) if pictures is not None else None
+    columns_out = list(columns)
+    if picture_index is not None:
+        columns_out.insert(picture_index, "Picture")
+    margin = 10
+    layout = _column_layout(
+        columns, sample, IMAGE_PAGE_WIDTH - 2 * margin, measure, picture_index, image_height * 4 / 3
+    )
+    line_height = 20
+    row_height = max(line_height, image_height + 10) if pictures is not None else line_height
+    thumbs: OrderedDict[str, object] = OrderedDict()
+
+    def thumbnail(picture: tuple[str, bytes, int, int]) -> object:
+        digest, data = picture[0], picture[1]
+        thumb = thumbs.get(digest)
+        if thumb is None:
+            with Image.open(io.BytesIO(data)) as src:
+                thumb = src.convert("RGBA") if src.mode in ("RGBA", "LA", "P") else src.convert("RGB")
+            thumbs[digest] = thumb
+            if len(thumbs) > IMAGE_THUMB_CACHE:
+                thumbs.popitem(last=False)
+        else:
+            thumbs.move_to_end(digest)
+        return thumb
+
+    def new_page(first: bool):
+        page = Image.new("RGB", (IMAGE_PAGE_WIDTH, IMAGE_PAGE_HEIGHT), "white")
+        draw = ImageDraw.Draw(page)
+        y = margin
+        if first:
+            for line in header_lines or ():
+                draw.text((margin, y), line, fill="black", font=font)
                 y += line_height
-            y += 4
-        draw.text((10, y), title, fill="black", font=font)
-        y += line_height
-        draw.text((10, y), " | ".join(columns_out), fill="black", font=font)
-        y += line_height
-
-        for idx, row in enumerate(row_values):
-            x = 10
-            if image_paths is not None:
-                img_path = image_paths[idx] if idx < len(image_paths) else None
-                if img_path:
-                    try:
-                        thumb = Image.open(img_path)
-                        thumb.thumbnail((image_height, image_height))
-                        img.paste(thumb, (x, y))
-                    except Exception:
-                        pass
-                x += image_height + 10
-                row_out = list(row)
-                row_out.insert(max(0, min(image_column, len(row_out))), "")
-                draw.text((x, y), " | ".join(str(x) for x in row_out), fill="black", font=font)
-            else:
-                draw.text((x, y), " | ".join(str(x) for x in row), fill="black", font=font)
+            if header_lines:
+                y += 4
+            draw.text((margin, y), title, fill="black", font=font)
             y += line_height
-        img.save(path, "JPEG")
-    except Exception:
-        raise RuntimeError("JPG export requires Pillow. Install with: pip install pillow")
+        for (x, width), name in zip(layout, columns_out):
+            draw.text((margin + x, y), _fit_text(name, width, measure), fill="black", font=font)
+        return page, draw, y + line_height
+
+    def pages():
+        page, draw, y = new_page(True)
+        for idx, row in enumerate(itertools.chain(sample, rows)):
+            if y + row_height > IMAGE_PAGE_HEIGHT - margin:
+                yield page
+                page, draw, y = new_page(False)
+            cells = [_cell_text(value) for value in row]
+            if picture_index is not None:
+                cells.insert(picture_index, "")
+                picture = pictures[idx] if idx < len(pictures) else None
+                if picture is not None:
+                    thumb = thumbnail(picture)
+                    mask = thumb if thumb.mode == "RGBA" else None
+                    page.paste(thumb, (margin + int(layout[picture_index][0]), y), mask)
+            for (x, width), text in zip(layout, cells):
+                if text:
+                    draw.text((margin + x, y), _fit_text(text, width, measure), fill="black", font=font)
+            y += row_height
+        yield page
+
+    if path.lower().endswith((".tif", ".tiff")):
+        from PIL import TiffImagePlugin  # type: ignore
+
+        with TiffImagePlugin.AppendingTiffWriter(path, new=True) as tiff:
+            for page in pages():
+                page.save(tiff, format="TIFF", compression="tiff_deflate")
+                tiff.newFrame()
+        return [path]
+
+    # Pages are written under temporary names and renamed once the count
+    # (and so the naming) is known.
+    image_format = "PNG" if path.lower().endswith(".png") else "JPEG"
+    stem, ext = os.path.splitext(path)
+    written: list[str] = []
+    for number, page in enumerate(pages(), start=1):
+        tmp_path = f"{stem}.page{number}.tmp"
+        page.save(tmp_path, image_format)
+        written.append(tmp_path)
+    final = _image_page_paths(path, len(written))
+    for tmp_path, final_path in zip(written, final):
+        os.replace(tmp_path, final_path)
+    return final
 
 
 def export_airbnb_inspection_pdf(path: str, report_date: date, room_no: str, items: Sequence[dict]) -> None:
+    export_airbnb_inspection_batch_pdf(path, report_date, [(room_no, items)])
+
+
+def export_airbnb_inspection_batch_pdf(
+    path: str, report_date: date, rooms: Sequence[tuple[str, Sequence[dict]]]
+) -> None:
+    # One landscape page per room, each with the two checklist copies.
     title = "Airbnb Inspection Checklist"
     note = (
         "A refundable \u20b1500 deposit is required upon check-in to ensure all items on the inspection list "
         "remain in good condition. The deposit will be refunded based on the condition of the listed items upon checkout."
     )
 
-    def _grouped_items() -> list[tuple[str, dict]]:
+    def _grouped_items(items: Sequence[dict]) -> list[tuple[str, dict]]:
         grouped: list[tuple[str, dict]] = []
         last_area = None
         for item in items:
@@ -313,7 +757,7 @@ def export_airbnb_inspection_pdf(path: str, report_date: date, room_no: str, ite
 
         import textwrap
 
-        def draw_copy(x_offset: float) -> None:
+        def draw_copy(x_offset: float, room_no: str, items: Sequence[dict]) -> None:
             y = start_y
             c.setFont("Helvetica-Bold", 12)
             c.drawString(x_offset, y, title)
@@ -336,7 +780,7 @@ def export_airbnb_inspection_pdf(path: str, report_date: date, room_no: str, ite
             y -= 14
 
             c.setFont("Helvetica", 9)
-            for area, item in _grouped_items():
+            for area, item in _grouped_items(items):
                 if area:
                     c.setFont("Helvetica-Bold", 9)
                     c.drawString(col_x[0], y, area)
@@ -367,37 +811,38 @@ def export_airbnb_inspection_pdf(path: str, report_date: date, room_no: str, ite
                 c.drawString(x_offset, y, line)
                 y -= 10
 
-        draw_copy(margin)
-        draw_copy(margin + copy_width + gap)
+        for room_no, items in rooms:
+            draw_copy(margin, room_no, items)
+            draw_copy(margin + copy_width + gap, room_no, items)
+            c.showPage()
         c.save()
     except Exception:
-        base_lines = [
-            title,
-            f"Date: {report_date.strftime('%Y-%m-%d')}",
-            f"Room No.: {room_no}",
-            "",
-            "Area | Item | Qty | Turn-over",
-        ]
-        for item in items:
-            area = item.get("brand") or ""
-            name = item.get("name") or ""
-            qty = item.get("quantity") or ""
-            base_lines.append(f"{area} | {name} | {qty} | ")
-        base_lines.extend(
-            [
-                "",
-                "Received by:",
-                "Name & Signature",
+        pages = []
+        for room_no, items in rooms:
+            base_lines = [
+                title,
+                f"Date: {report_date.strftime('%Y-%m-%d')}",
+                f"Room No.: {room_no}",
                 "",
-                "Turn-over accepted by:",
-                "Name & Signature",
-                "",
-                note,
+                "Area | Item | Qty | Turn-over",
             ]
-        )
-        lines = list(base_lines)
-        lines.append("")
-        lines.append("---- COPY 2 ----")
-        lines.extend(base_lines)
+            for item in items:
+                area = item.get("brand") or ""
+                name = item.get("name") or ""
+                qty = item.get("quantity") or ""
+                base_lines.append(f"{area} | {name} | {qty} | ")
+            base_lines.extend(
+                [
+                    "",
+                    "Received by:",
+                    "Name & Signature",
+                    "",
+                    "Turn-over accepted by:",
+                    "Name & Signature",
+                    "",
+                    note,
+                ]
+            )
+            pages.append([*base_lines, "", "---- COPY 2 ----", *base_lines])
         with open(path, "wb") as f:
-            f.write(_simple_pdf(lines))
+            f.write(_simple_pdf_pages(pages))
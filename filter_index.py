@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+from array import array
+from typing import Any, Sequence
+
+# Gram length of the inverted index; shorter tokens are checked by scanning.
+GRAM_SIZE = 3
+# Posting lists intersected per token before the remaining candidates are
+# verified with a substring check.
+MAX_POSTINGS_PER_TOKEN = 3
+
+
+def _grams(text: str) -> set[str]:
+    return {text[i : i + GRAM_SIZE] for i in range(len(text) - GRAM_SIZE + 1)}
+
+
+class FilterIndex:
+    # A tab's full result set held column-wise, with an inverted n-gram index
+    # over the searchable text and exact-match facets, so search and
+    # type/category narrowing run in-process. Results keep the load order.
+
+    def __init__(
+        self,
+        rows: Sequence[dict],
+        text_columns: Sequence[str],
+        facet_column: str | None = None,
+    ) -> None:
+        self.columns: list[str] = list(rows[0].keys()) if rows else []
+        self._data: dict[str, list[Any]] = {col: [row.get(col) for row in rows] for col in self.columns}
+        self._size = len(rows)
+        self._texts: list[str] = []
+        postings: dict[str, array] = {}
+        for pos, row in enumerate(rows):
+            text = " ".join(str(row.get(col) or "") for col in ("id", *text_columns)).lower()
+            self._texts.append(text)
+            for gram in _grams(text):
+                posting = postings.get(gram)
+                if posting is None:
+                    posting = postings[gram] = array("I")
+                posting.append(pos)
+        self._postings = postings
+        self._facets: dict[Any, array] = {}
+        if facet_column:
+            for pos, value in enumerate(self._data.get(facet_column, [])):
+                self._facets.setdefault(value, array("I")).append(pos)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def column(self, name: str) -> list[Any]:
+        return self._data[name]
+
+    def rows(self, positions: Sequence[int]) -> list[dict]:
+        columns = [(col, self._data[col]) for col in self.columns]
+        return [{col: values[pos] for col, values in columns} for pos in positions]
+
+    def filter(self, search: str | None = None, facet: Any = None) -> list[int]:
+        tokens = (search or "").lower().split()
+        candidates: set[int] | None = None
+        if facet is not None:
+            candidates = set(self._facets.get(facet, ()))
+        for token in tokens:
+            grams = _grams(token)
+            if not grams:
+                continue
+            lists = sorted((self._postings.get(gram, ()) for gram in grams), key=len)
+            for posting in lists[:MAX_POSTINGS_PER_TOKEN]:
+                candidates = set(posting) if candidates is None else candidates.intersection(posting)
+                if not candidates:
+                    return []
+        if candidates is None:
+            positions: Sequence[int] = range(self._size)
+        else:
+            positions = sorted(candidates)
+        if not tokens:
+            return list(positions)
+        texts = self._texts
+        return [pos for pos in positions if all(token in texts[pos] for token in tokens)]
@@ -0,0 +1,547 @@
+from __future__ import annotations
+
+from typing import Callable
+
+from psycopg2 import errors
+
+from constants import DEFAULT_LOW_STOCK_LEVEL
+
+# Arbitrary key for pg_advisory_lock so two app instances never migrate at once.
+_MIGRATION_LOCK_KEY = 4206001
+
+
+class MigrationError(Exception):
+    pass
+
+
+def _require_extension(cur, name: str) -> None:
+    # CREATE EXTENSION needs a privileged role; report what to do instead of
+    # failing startup with a bare permission error.
+    cur.execute(
+        """
+        SELECT current_user as role, current_database() as dbname,
+            EXISTS (SELECT 1 FROM pg_extension WHERE extname = %s) as installed
+        """,
+        (name,),
+    )
+    who = cur.fetchone()
+    if who["installed"]:
+        return
+    try:
+        cur.execute(f"CREATE EXTENSION IF NOT EXISTS {name}")
+    except (errors.InsufficientPrivilege, errors.UndefinedFile) as exc:
+        raise MigrationError(
+            f'The database needs the PostgreSQL extension "{name}", and role "{who["role"]}" cannot create it '
+            f"({exc.pgerror.strip() if exc.pgerror else exc}). Ask a database administrator to run "
+            f'CREATE EXTENSION {name}; in database "{who["dbname"]}", then start the app again.'
+        ) from exc
+
+
+def _create_base_schema(cur) -> None:
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS users (
+            id SERIAL PRIMARY KEY,
+            username TEXT UNIQUE NOT NULL,
+            password_hash TEXT NOT NULL,
+            business TEXT NOT NULL,
+            is_admin BOOLEAN NOT NULL DEFAULT FALSE
+        )
+        """
+    )
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS user_businesses (
+            user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+            business TEXT NOT NULL,
+            PRIMARY KEY (user_id, business)
+        )
+        """
+    )
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS products (
+            id SERIAL PRIMARY KEY,
+            name TEXT NOT NULL,
+            category TEXT NOT NULL,
+            unit TEXT NOT NULL,
+            photo_path TEXT,
+            opening_stock NUMERIC NOT NULL DEFAULT 0,
+            low_stock_level NUMERIC NOT NULL DEFAULT %s,
+            business TEXT NOT NULL
+        )
+        """,
+        (DEFAULT_LOW_STOCK_LEVEL,),
+    )
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS perishable_in (
+            id SERIAL PRIMARY KEY,
+            product_id INTEGER NOT NULL REFERENCES products(id) ON DELETE CASCADE,
+            delivery_date DATE NOT NULL,
+            expiry_date DATE,
+            quantity NUMERIC NOT NULL
+        )
+        """
+    )
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS perishable_in_breakdown (
+            id SERIAL PRIMARY KEY,
+            in_id INTEGER NOT NULL REFERENCES perishable_in(id) ON DELETE CASCADE,
+            expiry_date DATE,
+            quantity NUMERIC NOT NULL
+        )
+        """
+    )
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS perishable_out (
+            id SERIAL PRIMARY KEY,
+            product_id INTEGER NOT NULL REFERENCES products(id) ON DELETE CASCADE,
+            out_date DATE NOT NULL,
+            out_time TEXT NOT NULL,
+            quantity NUMERIC NOT NULL
+        )
+        """
+    )
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS assets (
+            id SERIAL PRIMARY KEY,
+            picture_path TEXT,
+            name TEXT NOT NULL,
+            brand TEXT,
+            model TEXT,
+            specifications TEXT,
+            series_number TEXT,
+            acquisition_date DATE,
+            acquisition_cost NUMERIC,
+            delivery_cost NUMERIC,
+            quantity NUMERIC NOT NULL,
+            location TEXT,
+            status TEXT,
+            business TEXT NOT NULL,
+            shop_link TEXT,
+            type TEXT NOT NULL,
+            inventory_type TEXT NOT NULL
+        )
+        """
+    )
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS asset_statuses (
+            id SERIAL PRIMARY KEY,
+            asset_id INTEGER NOT NULL REFERENCES assets(id) ON DELETE CASCADE,
+            status TEXT NOT NULL,
+            quantity NUMERIC NOT NULL
+        )
+        """
+    )
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS asset_acquisitions (
+            id SERIAL PRIMARY KEY,
+            asset_id INTEGER NOT NULL REFERENCES assets(id) ON DELETE CASCADE,
+            acquisition_date DATE NOT NULL,
+            acquisition_cost NUMERIC NOT NULL,
+            delivery_cost NUMERIC,
+            quantity NUMERIC NOT NULL,
+            shop_link TEXT
+        )
+        """
+    )
+    # Bring databases created by older releases up to the same shape.
+    cur.execute("ALTER TABLE perishable_in ALTER COLUMN expiry_date DROP NOT NULL")
+    cur.execute("ALTER TABLE assets ALTER COLUMN acquisition_date DROP NOT NULL")
+    cur.execute("ALTER TABLE assets ALTER COLUMN acquisition_cost DROP NOT NULL")
+    cur.execute("ALTER TABLE assets ADD COLUMN IF NOT EXISTS specifications TEXT")
+    cur.execute("ALTER TABLE asset_acquisitions ADD COLUMN IF NOT EXISTS shop_link TEXT")
+
+
+def _create_stock_balance(cur) -> None:
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS product_stock_balance (
+            product_id INTEGER PRIMARY KEY REFERENCES products(id) ON DELETE CASCADE,
+            in_qty NUMERIC NOT NULL DEFAULT 0,
+            out_qty NUMERIC NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP NOT NULL DEFAULT NOW()
+        )
+        """
+    )
+    cur.execute(
+        """
+        INSERT INTO product_stock_balance (product_id, in_qty, out_qty)
+        SELECT
+            p.id,
+            COALESCE((SELECT SUM(quantity) FROM perishable_in i WHERE i.product_id = p.id), 0),
+            COALESCE((SELECT SUM(quantity) FROM perishable_out o WHERE o.product_id = p.id), 0)
+        FROM products p
+        ON CONFLICT (product_id) DO NOTHING
+        """
+    )
+
+
+def _create_report_indexes(cur) -> None:
+    statements = [
+        # Foreign keys and ledger date ranges, covering the summed quantity.
+        "CREATE INDEX IF NOT EXISTS perishable_in_product_date_idx"
+        " ON perishable_in (product_id, delivery_date) INCLUDE (quantity)",
+        "CREATE INDEX IF NOT EXISTS perishable_in_delivery_date_idx ON perishable_in (delivery_date)",
+        "CREATE INDEX IF NOT EXISTS perishable_out_product_date_idx"
+        " ON perishable_out (product_id, out_date) INCLUDE (quantity)",
+        "CREATE INDEX IF NOT EXISTS perishable_out_out_date_idx ON perishable_out (out_date)",
+        "CREATE INDEX IF NOT EXISTS perishable_in_breakdown_in_id_idx"
+        " ON perishable_in_breakdown (in_id) INCLUDE (expiry_date, quantity)",
+        "CREATE INDEX IF NOT EXISTS perishable_in_breakdown_expiry_date_idx ON perishable_in_breakdown (expiry_date)",
+        "CREATE INDEX IF NOT EXISTS asset_statuses_asset_id_idx"
+        " ON asset_statuses (asset_id) INCLUDE (status, quantity)",
+        "CREATE INDEX IF NOT EXISTS asset_acquisitions_asset_date_idx"
+        " ON asset_acquisitions (asset_id, acquisition_date) INCLUDE (acquisition_cost, quantity)",
+        "CREATE INDEX IF NOT EXISTS asset_acquisitions_date_idx ON asset_acquisitions (acquisition_date)",
+        # Tab and report filters.
+        "CREATE INDEX IF NOT EXISTS products_business_name_idx ON products (business, name)",
+        "CREATE INDEX IF NOT EXISTS products_business_category_idx ON products (business, category)",
+        "CREATE INDEX IF NOT EXISTS assets_business_inventory_type_idx"
+        " ON assets (business, inventory_type, type, name)",
+    ]
+    for statement in statements:
+        cur.execute(statement)
+
+
+def _create_keyset_indexes(cur) -> None:
+    # Match the (sort key, id) orders the paged tab queries walk.
+    for statement in (
+        "CREATE INDEX IF NOT EXISTS products_business_name_id_idx ON products (business, name, id)",
+        "CREATE INDEX IF NOT EXISTS assets_listing_lower_name_idx"
+        " ON assets (business, inventory_type, lower(name), id)",
+        "CREATE INDEX IF NOT EXISTS assets_listing_id_idx ON assets (business, inventory_type, id)",
+        "CREATE INDEX IF NOT EXISTS assets_listing_quantity_idx ON assets (business, inventory_type, quantity, id)",
+    ):
+        cur.execute(statement)
+
+
+def _create_search_documents(cur) -> None:
+    # Maintained search columns for search.py, with trigram indexes for
+    # substring matches.
+    _require_extension(cur, "pg_trgm")
+    cur.execute(
+        """
+        ALTER TABLE products
+            ADD COLUMN IF NOT EXISTS search_text TEXT GENERATED ALWAYS AS (
+                lower(id::text || ' ' || name || ' ' || category || ' ' || unit)
+            ) STORED,
+            ADD COLUMN IF NOT EXISTS search_document tsvector GENERATED ALWAYS AS (
+                setweight(to_tsvector('simple', name), 'A')
+                || setweight(to_tsvector('simple', category), 'B')
+                || setweight(to_tsvector('simple', unit), 'C')
+            ) STORED
+        """
+    )
+    cur.execute(
+        """
+        ALTER TABLE assets
+            ADD COLUMN IF NOT EXISTS search_text TEXT GENERATED ALWAYS AS (
+                lower(
+                    id::text || ' ' || name
+                    || ' ' || COALESCE(brand, '') || ' ' || COALESCE(model, '')
+                    || ' ' || COALESCE(specifications, '') || ' ' || COALESCE(series_number, '')
+                    || ' ' || COALESCE(location, '') || ' ' || COALESCE(shop_link, '')
+                )
+            ) STORED,
+            ADD COLUMN IF NOT EXISTS search_document tsvector GENERATED ALWAYS AS (
+                setweight(to_tsvector('simple', name), 'A')
+                || setweight(to_tsvector('simple', COALESCE(brand, '') || ' ' || COALESCE(model, '')), 'B')
+                || setweight(
+                    to_tsvector('simple', COALESCE(specifications, '') || ' ' || COALESCE(series_number, '')), 'C'
+                )
+                || setweight(to_tsvector('simple', COALESCE(location, '') || ' ' || COALESCE(shop_link, '')), 'D')
+            ) STORED
+        """
+    )
+    for table in ("products", "assets"):
+        cur.execute(f"CREATE INDEX IF NOT EXISTS {table}_search_document_idx ON {table} USING gin (search_document)")
+        cur.execute(
+            f"CREATE INDEX IF NOT EXISTS {table}_search_text_trgm_idx ON {table} USING gin (search_text gin_trgm_ops)"
+        )
+    # Per-column trigram indexes created by pre-release builds of migration 3.
+    for table, column in (
+        ("products", "name"),
+        ("products", "category"),
+        ("products", "unit"),
+        ("assets", "name"),
+        ("assets", "brand"),
+        ("assets", "model"),
+        ("assets", "specifications"),
+        ("assets", "series_number"),
+        ("assets", "location"),
+        ("assets", "shop_link"),
+    ):
+        cur.execute(f"DROP INDEX IF EXISTS {table}_{column}_trgm_idx")
+
+
+INSIGHTS_SOURCE_TABLES = (
+    "assets",
+    "asset_acquisitions",
+    "asset_statuses",
+    "products",
+    "perishable_in",
+    "perishable_in_breakdown",
+    "perishable_out",
+)
+
+
+def _create_insights_snapshots(cur) -> None:
+    # One stored Insights result per (business, inventory type). Any write to
+    # a source table marks every snapshot stale and bumps its version; the
+    # next read recomputes it (see db.get_insights_snapshot).
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS insights_snapshot (
+            business TEXT NOT NULL,
+            inventory_type TEXT NOT NULL,
+            data JSONB,
+            as_of DATE,
+            computed_at TIMESTAMP,
+            stale BOOLEAN NOT NULL DEFAULT TRUE,
+            version BIGINT NOT NULL DEFAULT 0,
+            PRIMARY KEY (business, inventory_type)
+        )
+        """
+    )
+    # Rows exist up front so a write racing the first refresh still finds
+    # a row to mark. Pairs that already have a row are skipped: once
+    # migration 8 has run, the Unica row is keyed by its perishable business.
+    cur.execute(
+        """
+        INSERT INTO insights_snapshot (business, inventory_type)
+        SELECT v.business, v.inventory_type
+        FROM (
+            VALUES ('Unica', 'Unica Non-Perishable'), ('HDN Integrated Farm', 'HDN Warehouse'), ('Airbnb', 'Airbnb')
+        ) v(business, inventory_type)
+        WHERE NOT EXISTS (
+            SELECT 1 FROM insights_snapshot s WHERE s.business = v.business AND s.inventory_type = v.inventory_type
+        )
+        ON CONFLICT DO NOTHING
+        """
+    )
+    cur.execute(
+        """
+        CREATE OR REPLACE FUNCTION mark_insights_stale() RETURNS trigger AS $$
+        BEGIN
+            UPDATE insights_snapshot SET stale = TRUE, version = version + 1;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    for table in INSIGHTS_SOURCE_TABLES:
+        cur.execute(f"DROP TRIGGER IF EXISTS {table}_insights_stale ON {table}")
+        cur.execute(
+            f"""
+            CREATE TRIGGER {table}_insights_stale
+            AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table}
+            FOR EACH STATEMENT EXECUTE FUNCTION mark_insights_stale()
+            """
+        )
+
+
+def _create_perishable_rollups(cur) -> None:
+    # IN/OUT quantities per product per day and per month, kept current by
+    # the db.py ledger writers; range reports sum these instead of the logs.
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS perishable_daily_rollup (
+            product_id INTEGER NOT NULL REFERENCES products(id) ON DELETE CASCADE,
+            day DATE NOT NULL,
+            in_qty NUMERIC NOT NULL DEFAULT 0,
+            out_qty NUMERIC NOT NULL DEFAULT 0,
+            PRIMARY KEY (product_id, day)
+        )
+        """
+    )
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS perishable_monthly_rollup (
+            product_id INTEGER NOT NULL REFERENCES products(id) ON DELETE CASCADE,
+            month DATE NOT NULL,
+            in_qty NUMERIC NOT NULL DEFAULT 0,
+            out_qty NUMERIC NOT NULL DEFAULT 0,
+            PRIMARY KEY (product_id, month)
+        )
+        """
+    )
+    cur.execute(
+        """
+        INSERT INTO perishable_daily_rollup (product_id, day, in_qty, out_qty)
+        SELECT product_id, day, SUM(in_qty), SUM(out_qty)
+        FROM (
+            SELECT product_id, delivery_date as day, quantity as in_qty, 0 as out_qty FROM perishable_in
+            UNION ALL
+            SELECT product_id, out_date, 0, quantity FROM perishable_out
+        ) ledger
+        GROUP BY product_id, day
+        ON CONFLICT (product_id, day) DO NOTHING
+        """
+    )
+    cur.execute(
+        """
+        INSERT INTO perishable_monthly_rollup (product_id, month, in_qty, out_qty)
+        SELECT product_id, date_trunc('month', day)::date, SUM(in_qty), SUM(out_qty)
+        FROM perishable_daily_rollup
+        GROUP BY product_id, date_trunc('month', day)
+        ON CONFLICT (product_id, month) DO NOTHING
+        """
+    )
+
+
+# Per source table: which snapshot column a change is scoped by, and the
+# businesses touched by the changed rows (the trigger's transition table).
+_INSIGHTS_SCOPES = {
+    "assets": ("business", "SELECT business FROM changed"),
+    "asset_acquisitions": ("business", "SELECT a.business FROM changed c JOIN assets a ON a.id = c.asset_id"),
+    "asset_statuses": ("business", "SELECT a.business FROM changed c JOIN assets a ON a.id = c.asset_id"),
+    "products": ("perishable_business", "SELECT business FROM changed"),
+    "perishable_in": (
+        "perishable_business",
+        "SELECT p.business FROM changed c JOIN products p ON p.id = c.product_id",
+    ),
+    "perishable_out": (
+        "perishable_business",
+        "SELECT p.business FROM changed c JOIN products p ON p.id = c.product_id",
+    ),
+    "perishable_in_breakdown": (
+        "perishable_business",
+        "SELECT p.business FROM changed c JOIN perishable_in i ON i.id = c.in_id"
+        " JOIN products p ON p.id = i.product_id",
+    ),
+}
+
+
+def _scope_insights_invalidation(cur) -> None:
+    # Migration 6 marked every snapshot stale on any write, locking all
+    # snapshot rows until commit. Writes now only touch the snapshots of the
+    # businesses their rows belong to. The perishable business is part of the
+    # key ('' when the snapshot has no perishable figures).
+    cur.execute("ALTER TABLE insights_snapshot ADD COLUMN IF NOT EXISTS perishable_business TEXT NOT NULL DEFAULT ''")
+    cur.execute("ALTER TABLE insights_snapshot DROP CONSTRAINT IF EXISTS insights_snapshot_pkey")
+    cur.execute("ALTER TABLE insights_snapshot ADD PRIMARY KEY (business, inventory_type, perishable_business)")
+    cur.execute(
+        """
+        UPDATE insights_snapshot SET perishable_business = 'Unica', stale = TRUE, version = version + 1
+        WHERE business = 'Unica' AND inventory_type = 'Unica Non-Perishable' AND perishable_business = ''
+            AND NOT EXISTS (
+                SELECT 1 FROM insights_snapshot s
+                WHERE s.business = 'Unica' AND s.inventory_type = 'Unica Non-Perishable'
+                    AND s.perishable_business = 'Unica'
+            )
+        """
+    )
+    cur.execute(
+        """
+        CREATE OR REPLACE FUNCTION mark_insights_stale() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'TRUNCATE' THEN
+                UPDATE insights_snapshot SET stale = TRUE, version = version + 1;
+            ELSE
+                EXECUTE format(
+                    'UPDATE insights_snapshot SET stale = TRUE, version = version + 1 WHERE %I IN (%s)',
+                    TG_ARGV[0],
+                    TG_ARGV[1]
+                );
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    # A trigger with a transition table handles a single event, so each
+    # table gets one per event (UPDATE twice: old and new rows).
+    events = (
+        ("insert", "INSERT", "NEW"),
+        ("update_old", "UPDATE", "OLD"),
+        ("update_new", "UPDATE", "NEW"),
+        ("delete", "DELETE", "OLD"),
+    )
+    for table, (column, businesses) in _INSIGHTS_SCOPES.items():
+        cur.execute(f"DROP TRIGGER IF EXISTS {table}_insights_stale ON {table}")
+        for suffix, event, transition in events:
+            cur.execute(f"DROP TRIGGER IF EXISTS {table}_insights_stale_{suffix} ON {table}")
+            cur.execute(
+                f"""
+                CREATE TRIGGER {table}_insights_stale_{suffix}
+                AFTER {event} ON {table}
+                REFERENCING {transition} TABLE AS changed
+                FOR EACH STATEMENT EXECUTE FUNCTION mark_insights_stale(%s, %s)
+                """,
+                (column, businesses),
+            )
+        cur.execute(f"DROP TRIGGER IF EXISTS {table}_insights_stale_truncate ON {table}")
+        cur.execute(
+            f"""
+            CREATE TRIGGER {table}_insights_stale_truncate
+            AFTER TRUNCATE ON {table}
+            FOR EACH STATEMENT EXECUTE FUNCTION mark_insights_stale()
+            """
+        )
+
+
+MIGRATIONS: list[tuple[int, str, Callable[[object], None]]] = [
+    (1, "base schema", _create_base_schema),
+    (2, "product stock balances", _create_stock_balance),
+    (3, "report and search indexes", _create_report_indexes),
+    (4, "keyset pagination indexes", _create_keyset_indexes),
+    (5, "search documents", _create_search_documents),
+    (6, "insights snapshots", _create_insights_snapshots),
+    (7, "perishable IN/OUT rollups", _create_perishable_rollups),
+    (8, "per-business insights invalidation", _scope_insights_invalidation),
+]
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def current_version(conn) -> int:
+    # One round trip on an up-to-date database; a missing table means version 0.
+    cur = conn.cursor()
+    try:
+        cur.execute("SELECT COALESCE(MAX(version), 0) as version FROM schema_version")
+    except errors.UndefinedTable:
+        conn.rollback()
+        return 0
+    return int(cur.fetchone()["version"])
+
+
+def apply_migrations(conn, seed: Callable[[object], None] | None = None) -> list[int]:
+    cur = conn.cursor()
+    cur.execute("SELECT pg_advisory_lock(%s)", (_MIGRATION_LOCK_KEY,))
+    try:
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS schema_version (
+                version INTEGER PRIMARY KEY,
+                name TEXT NOT NULL,
+                applied_at TIMESTAMP NOT NULL DEFAULT NOW()
+            )
+            """
+        )
+        conn.commit()
+        applied: list[int] = []
+        start = current_version(conn)
+        pending = [step for step in MIGRATIONS if step[0] > start]
+        for version, name, migrate in pending:
+            # Each step commits together with its version row, or not at all.
+            migrate(cur)
+            if seed is not None and version == pending[-1][0]:
+                # Default data goes in with the last step, so the schema is
+                # never recorded as current without it.
+                seed(cur)
+            cur.execute("INSERT INTO schema_version (version, name) VALUES (%s, %s)", (version, name))
+            conn.commit()
+            applied.append(version)
+        return applied
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.execute("SELECT pg_advisory_unlock(%s)", (_MIGRATION_LOCK_KEY,))
+        conn.commit()
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+from operator import itemgetter
+from typing import Any, Iterable, Iterator, Sequence
+
+# Compact rows for high-volume reads. Each query shape (tuple of column names)
+# gets one tuple subclass with no per-instance dict; rows still answer
+# row["col"] and row.get("col") like the RealDictCursor rows they replace.
+
+_record_types: dict[tuple[str, ...], type] = {}
+
+
+class Record(tuple):
+    __slots__ = ()
+    _fields: tuple[str, ...] = ()
+    _index: dict[str, int] = {}
+
+    def __getitem__(self, key: Any) -> Any:
+        if isinstance(key, str):
+            return tuple.__getitem__(self, self._index[key])
+        return tuple.__getitem__(self, key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        idx = self._index.get(key)
+        return default if idx is None else tuple.__getitem__(self, idx)
+
+    def keys(self) -> tuple[str, ...]:
+        return self._fields
+
+    def as_dict(self) -> dict[str, Any]:
+        return dict(zip(self._fields, self))
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({', '.join(f'{k}={v!r}' for k, v in zip(self._fields, self))})"
+
+
+def record_type(fields: Sequence[str]) -> type:
+    fields = tuple(fields)
+    cls = _record_types.get(fields)
+    if cls is None:
+        namespace: dict[str, Any] = {
+            "__slots__": (),
+            "_fields": fields,
+            "_index": {name: idx for idx, name in enumerate(fields)},
+        }
+        for idx, name in enumerate(fields):
+            if name.isidentifier() and not hasattr(Record, name):
+                namespace[name] = property(itemgetter(idx))
+        cls = type("Record", (Record,), namespace)
+        _record_types[fields] = cls
+    return cls
+
+
+def fetch_records(cur) -> list[Record]:
+    # cur must be a plain (tuple) cursor.
+    cls = record_type([col.name for col in cur.description])
+    return list(map(cls, cur.fetchall()))
+
+
+def iter_records(cur) -> Iterator[Record]:
+    # For named (server-side) cursors, whose description is known only after
+    # the first fetch.
+    cls = None
+    for row in cur:
+        if cls is None:
+            cls = record_type([col.name for col in cur.description])
+        yield cls(row)
+
+
+def _benchmark(count: int = 1_000_000) -> None:
+    # Memory of a list_out_logs_report-shaped result held as dicts vs records.
+    import tracemalloc
+    from datetime import date, timedelta
+    from decimal import Decimal
+
+    # Column values come from small shared pools, so only the per-row
+    # container is measured.
+    start = date(2024, 1, 1)
+    names = [f"Product {n}" for n in range(500)]
+    quantities = [Decimal(n) for n in range(1, 50)]
+    dates = [start + timedelta(days=n) for n in range(365)]
+    times = [f"{n // 60:02d}:{n % 60:02d}" for n in range(1440)]
+
+    def _rows() -> Iterable[tuple]:
+        for n in range(count):
+            yield (n % 500, names[n % 500], dates[n % 365], times[n % 1440], quantities[n % 49])
+
+    fields = ("product_id", "name", "out_date", "out_time", "quantity")
+    cls = record_type(fields)
+    for label, build in (
+        ("dict rows", lambda: [dict(zip(fields, row)) for row in _rows()]),
+        ("records", lambda: [cls(row) for row in _rows()]),
+    ):
+        tracemalloc.start()
+        rows = build()
+        size, _peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{label}: {size / count:.0f} bytes/row ({size / 1024 / 1024:.1f} MiB for {count:,} rows)")
+        del rows
+
+
+if __name__ == "__main__":
+    _benchmark()
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import re
+
+# Builds the WHERE and ranking SQL for the tab search boxes. products and
+# assets carry two generated columns (migration 5): search_document, a
+# weighted 'simple' tsvector, and search_text, the lower-cased concatenation
+# of the id and searchable columns. Both are GIN indexed.
+
+MAX_TOKENS = 8
+# Below this length trigram similarity matches almost anything.
+FUZZY_MIN_LENGTH = 3
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def tokenize(search: str | None) -> list[str]:
+    if not search:
+        return []
+    return search.lower().split()[:MAX_TOKENS]
+
+
+def _like_pattern(token: str) -> str:
+    escaped = token.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def _prefix_query(words: list[str]) -> str:
+    return " & ".join(f"{word}:*" for word in words)
+
+
+def search_clause(alias: str, search: str | None) -> tuple[str, list[object]]:
+    # Every token must match: as a word prefix, as a substring (which also
+    # covers ids), or, for longer tokens, as a close trigram match.
+    sql = ""
+    params: list[object] = []
+    for token in tokenize(search):
+        conditions = [f"{alias}.search_text LIKE %s"]
+        token_params: list[object] = [_like_pattern(token)]
+        words = _WORD_RE.findall(token)
+        if words:
+            conditions.insert(0, f"{alias}.search_document @@ to_tsquery('simple', %s)")
+            token_params.insert(0, _prefix_query(words))
+        if len(token) >= FUZZY_MIN_LENGTH:
+            conditions.append(f"%s <%% {alias}.search_text")
+            token_params.append(token)
+        sql += " AND (" + " OR ".join(conditions) + ")"
+        params.extend(token_params)
+    return sql, params
+
+
+def rank_expression(alias: str, search: str | None) -> tuple[str, list[object]]:
+    # Higher is better: weighted prefix rank plus fuzzy word similarity.
+    tokens = tokenize(search)
+    if not tokens:
+        return "0", []
+    words = [word for token in tokens for word in _WORD_RE.findall(token)]
+    sql = f"word_similarity(%s, {alias}.search_text)"
+    params: list[object] = [" ".join(tokens)]
+    if words:
+        sql = f"ts_rank({alias}.search_document, to_tsquery('simple', %s)) + " + sql
+        params.insert(0, _prefix_query(words))
+    return sql, params
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Any
+
+try:
+    from PIL import Image, ImageTk  # type: ignore
+except Exception:
+    Image = None
+    ImageTk = None
+
+
+def default_cache_dir() -> str:
+    override = os.getenv("AMAN_THUMBNAIL_DIR")
+    if override:
+        return override
+    base = os.getenv("LOCALAPPDATA") or os.getenv("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "AmanInventory", "thumbnails")
+
+
+class ThumbnailCache:
+    # Scaled thumbnails keyed by (path, mtime, file size, target size).
+    # PhotoImages live in a bounded in-memory LRU (Tk objects, main thread
+    # only); the pre-scaled PNGs are kept on disk so restarts skip decoding.
+
+    def __init__(self, size: tuple[int, int], max_items: int = 512, cache_dir: str | None = None) -> None:
+        self.size = size
+        self.max_items = max_items
+        self.cache_dir = cache_dir or default_cache_dir()
+        self._photos: OrderedDict[tuple, Any] = OrderedDict()
+
+    def key(self, path: str | None) -> tuple | None:
+        if not path:
+            return None
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return (os.path.abspath(path), stat.st_mtime_ns, stat.st_size, self.size)
+
+    def cached_photo(self, path: str | None) -> Any:
+        key = self.key(path)
+        if key is None:
+            return None
+        photo = self._photos.get(key)
+        if photo is not None:
+            self._photos.move_to_end(key)
+        return photo
+
+    def get_photo(self, path: str | None) -> Any:
+        if ImageTk is None:
+            return None
+        key = self.key(path)
+        if key is None:
+            return None
+        photo = self._photos.get(key)
+        if photo is not None:
+            self._photos.move_to_end(key)
+            return photo
+        img = self._load(key)
+        if img is None:
+            return None
+        return self._remember(key, ImageTk.PhotoImage(img))
+
+    def put_pil(self, path: str | None, img: Any) -> Any:
+        # Turn an image produced by load_pil on a worker into a PhotoImage.
+        if ImageTk is None or img is None:
+            return None
+        key = self.key(path)
+        if key is None:
+            return None
+        return self._remember(key, ImageTk.PhotoImage(img))
+
+    def load_pil(self, path: str | None) -> Any:
+        # Safe to call from worker threads: touches only PIL and the disk cache.
+        key = self.key(path)
+        if key is None:
+            return None
+        return self._load(key)
+
+    def clear(self) -> None:
+        self._photos.clear()
+
+    def _remember(self, key: tuple, photo: Any) -> Any:
+        self._photos[key] = photo
+        self._photos.move_to_end(key)
+        while len(self._photos) > self.max_items:
+            self._photos.popitem(last=False)
+        return photo
+
+    def _disk_path(self, key: tuple) -> str:
+        path, mtime_ns, file_size, (width, height) = key
+        digest = hashlib.sha1(f"{path}|{mtime_ns}|{file_size}|{width}x{height}".encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, digest[:2], f"{digest}.png")
+
+    def _load(self, key: tuple) -> Any:
+        if Image is None:
+            return None
+        disk_path = self._disk_path(key)
+        try:
+            with Image.open(disk_path) as cached:
+                cached.load()
+                return cached.copy()
+        except Exception:
+            pass
+        try:
+            with Image.open(key[0]) as src:
+                # Let the JPEG decoder scale down while decoding.
+                src.draft("RGB", self.size)
+                img = src.copy()
+        except Exception:
+            return None
+        img.thumbnail(self.size)
+        if img.mode not in ("RGB", "RGBA"):
+            img = img.convert("RGBA")
+        self._store(disk_path, img)
+        return img
+
+    def _store(self, disk_path: str, img: Any) -> None:
+        tmp_path = f"{disk_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(disk_path), exist_ok=True)
+            img.save(tmp_path, format="PNG")
+            os.replace(tmp_path, disk_path)
+        except Exception:
+            # The disk cache is best effort; a read-only profile still works.
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass